@@ -1,6 +1,10 @@
 # app/controllers/base_controller.py
 
+import json
+import os
+import time
 from app.database.db_connection import get_db_connection
+from app.database.write_journal import get_write_journal
 
 class BaseController:
     """
@@ -15,4 +19,45 @@ class BaseController:
         Este método será llamado al cerrar la aplicación para asegurar una desconexión limpia.
         """
         self.db_connection.disconnect()
-        print("Controlador base: Conexión a la BD cerrada al salir.")
\ No newline at end of file
+        print("Controlador base: Conexión a la BD cerrada al salir.")
+
+    def _save_offline(self, kind, data, key):
+        """
+        Guarda una escritura en el diario local cuando el servidor no está disponible; se
+        aplicará al volver la conexión. Retorna True si quedó guardada en disco.
+        """
+        try:
+            get_write_journal().append(kind, data, key)
+            return True
+        except OSError as e:
+            print(f"Error al guardar la operación '{kind}' en el diario sin conexión: {e}")
+            return False
+
+    def get_db_metrics(self):
+        """
+        Reúne las métricas de la base de datos: pool de conexiones, caché de sentencias
+        preparadas y estadísticas por consulta.
+        """
+        return {
+            'pool': self.db_connection.get_pool_stats(),
+            'sentencias_preparadas': self.db_connection.get_statement_cache_stats(),
+            'consultas': self.db_connection.get_query_stats(),
+        }
+
+    def reset_db_metrics(self):
+        """Pone a cero las estadísticas por consulta (p. ej. antes de medir un cambio)."""
+        self.db_connection.reset_query_stats()
+
+    def dump_db_metrics(self, directory="logs"):
+        """
+        Guarda las métricas actuales en un archivo JSON con fecha y hora en el nombre,
+        para comparar entre días o tras un cambio. Retorna (bool, ruta o mensaje de error).
+        """
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"metricas_bd_{time.strftime('%Y%m%d_%H%M%S')}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.get_db_metrics(), f, ensure_ascii=False, indent=2, default=str)
+            return True, path
+        except OSError as e:
+            return False, f"No se pudieron guardar las métricas: {e}"
@@ -15,10 +15,22 @@ class CategoryController(BaseController):
         """Obtiene todas las categorías para mostrarlas en la vista."""
         return self.category_model.get_all_categories()
 
+    def refresh_categories(self):
+        """Recarga el directorio de categorías para reflejar cambios de otras terminales."""
+        return self.category_model.refresh_categories()
+
+    def sync_categories(self):
+        """Trae solo las categorías modificadas en otras terminales desde la última sincronización."""
+        return self.category_model.sync_categories()
+
     def get_category_by_id(self, category_id):
         """Busca una categoría por su ID."""
         return self.category_model.get_category_by_id(category_id)
 
+    def get_category_by_name(self, name):
+        """Busca una categoría por su nombre."""
+        return self.category_model.get_category_by_name(name)
+
     def add_category(self, name, description=""):
         """
         Añade una nueva categoría. Retorna (bool, mensaje).
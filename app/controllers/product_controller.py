@@ -1,9 +1,16 @@
 # app/controllers/product_controller.py
 
+import csv
+import uuid
 from app.models.product_model import ProductModel
 from app.models.category_model import CategoryModel
+from app.models.operation_model import OperationModel
 from app.controllers.base_controller import BaseController
 
+# Columnas que debe traer el CSV de importación (primera fila = cabecera)
+CSV_IMPORT_COLUMNS = ("codigo_barras", "nombre_producto", "descripcion", "categoria",
+                      "precio_venta", "costo_unitario", "stock_actual", "stock_minimo", "unidad_medida")
+
 class ProductController(BaseController):
     """
     Controlador para gestionar la lógica de negocio de productos e inventario.
@@ -12,6 +19,7 @@ class ProductController(BaseController):
         super().__init__()
         self.product_model = ProductModel()
         self.category_model = CategoryModel()
+        self.operation_model = OperationModel()
 
     def get_product_by_id(self, product_id):
         """Obtiene los datos de un producto por su ID."""
@@ -24,22 +32,35 @@ class ProductController(BaseController):
         if not all([barcode, name, category_name, price, cost, stock, min_stock, unit]):
             return False, "Todos los campos son obligatorios."
             
-        category = self.category_model.get_category_by_name(category_name)
-        if not category:
-            self.category_model.create_category(category_name)
-            category = self.category_model.get_category_by_name(category_name)
-            if not category:
-                return False, "Error crítico al crear/obtener la categoría."
-        
-        category_id = category['id']
-
         if self.product_model.get_product_by_barcode(barcode):
             return False, f"El código de barras '{barcode}' ya existe."
-            
-        if self.product_model.create_product(barcode, name, description, category_id, price, cost, stock, min_stock, unit):
-            return True, f"Producto '{name}' añadido exitosamente."
-        else:
-            return False, "Error desconocido al añadir el producto."
+
+        # Fuera de una transacción la categoría se resuelve desde el directorio en memoria,
+        # sin consultar al servidor. Si ya existe, el producto es un único INSERT.
+        category = self.category_model.get_category_by_name(category_name)
+        if category:
+            if self.product_model.create_product(barcode, name, description, category['id'], price, cost, stock, min_stock, unit):
+                return True, f"Producto '{name}' añadido exitosamente."
+            return False, "Error al añadir el producto. No se guardó ningún cambio."
+
+        # La categoría nueva y el producto se guardan en una única transacción:
+        # si el producto falla, tampoco queda creada la categoría.
+        try:
+            with self.db_connection.transaction():
+                category = self.category_model.get_category_by_name(category_name) # Otra terminal pudo crearla
+                if not category:
+                    self.category_model.create_category(category_name)
+                    category = self.category_model.get_category_by_name(category_name)
+                    if not category:
+                        raise RuntimeError(f"No se pudo crear/obtener la categoría '{category_name}'.")
+
+                if not self.product_model.create_product(barcode, name, description, category['id'], price, cost, stock, min_stock, unit):
+                    raise RuntimeError(f"No se pudo insertar el producto '{barcode}'.")
+        except Exception as e:
+            print(f"Error al añadir producto: {e}")
+            return False, "Error al añadir el producto. No se guardó ningún cambio."
+
+        return True, f"Producto '{name}' añadido exitosamente."
 
     def update_product_details(self, product_id, barcode, name, description, category_name, price, cost, stock, min_stock, unit, active):
         """
@@ -64,23 +85,91 @@ class ProductController(BaseController):
         """
         Obtiene todos los productos para la vista.
         """
-        products_raw = self.product_model.get_all_products()
-        products_display = []
-        for prod in products_raw:
-            products_display.append({
-                'id': prod['id'],
-                'codigo_barras': prod['codigo_barras'],
-                'nombre_producto': prod['nombre_producto'],
-                'descripcion': prod['descripcion'],
-                'categoria': prod.get('nombre_categoria', "Desconocida"),
-                'precio_venta': prod['precio_venta'],
-                'costo_unitario': prod['costo_unitario'],
-                'stock_actual': prod['stock_actual'],
-                'stock_minimo': prod['stock_minimo'],
-                'unidad_medida': prod['unidad_medida'],
-                'activo': prod['activo']
-            })
-        return products_display
+        return [self._format_for_display(prod) for prod in self.product_model.get_all_products()]
+
+    def get_products_page_for_display(self, cursor=None, page_size=200, active=None, category_id=None, order_by="id"):
+        """
+        Obtiene una página de productos para la vista.
+        Retorna (productos, siguiente_cursor); siguiente_cursor es None cuando no hay más páginas.
+        """
+        products = self.product_model.get_products_page(cursor, page_size, active, category_id, order_by)
+        next_cursor = None
+        if len(products) == page_size:
+            last = products[-1]
+            next_cursor = (last['nombre_producto'], last['id']) if order_by == "nombre" else last['id']
+        return [self._format_for_display(prod) for prod in products], next_cursor
+
+    def search_products_for_display(self, term, limit=100):
+        """Busca productos por nombre, descripción o prefijo del código de barras, para la vista."""
+        return [self._format_for_display(prod) for prod in self.product_model.search_products(term, limit)]
+
+    def get_product_for_display(self, product_id):
+        """Obtiene un solo producto en el formato de la vista (para refrescar su fila tras guardarlo)."""
+        product = self.product_model.get_product_by_id(product_id)
+        return self._format_for_display(product) if product else None
+
+    def get_product_for_display_by_barcode(self, barcode):
+        """Igual que get_product_for_display, buscando por código de barras (p. ej. tras crearlo)."""
+        product = self.product_model.get_product_by_barcode(barcode)
+        return self._format_for_display(product) if product else None
+
+    def get_product_changes_for_display(self, since=None):
+        """
+        Cambios para refrescar la vista sin recargarla: retorna (productos, marca_de_agua) con los
+        productos modificados desde `since`. Con since=None no trae filas, solo la marca actual.
+        """
+        if since is None:
+            return [], self.product_model.get_products_high_water()
+        changed, high_water = self.product_model.get_products_changed_since(since)
+        return [self._format_for_display(prod) for prod in changed], high_water
+
+    def get_category_names(self):
+        """Nombres de las categorías para elegir en el formulario de productos (desde el directorio en memoria)."""
+        return [cat['nombre_categoria'] for cat in self.category_model.get_all_categories()
+                if cat and cat.get('nombre_categoria')]
+
+    def estimate_product_count(self, active=None, category_id=None):
+        """Total (aproximado si no hay filtros) de productos, para mostrar en la vista."""
+        return self.product_model.estimate_product_count(active, category_id)
+
+    @staticmethod
+    def _format_for_display(prod):
+        """Adapta una fila de ProductModel al formato de la vista (sin copiarla)."""
+        prod['categoria'] = prod.get('nombre_categoria', "Desconocida")
+        return prod
+
+    def adjust_stock(self, deltas):
+        """
+        Suma (o resta, si la cantidad es negativa) unidades al stock de varios productos,
+        p. ej. al recibir mercadería o registrar mermas. `deltas` es un dict {id_producto: cantidad}.
+        Si el servidor no está disponible el ajuste se guarda en el diario sin conexión y se
+        aplica al volver la conexión. Retorna (bool, mensaje).
+        """
+        deltas = {int(product_id): int(quantity) for product_id, quantity in deltas.items() if int(quantity)}
+        if not deltas:
+            return False, "No hay cantidades para ajustar."
+        key = str(uuid.uuid4()) # Clave de idempotencia: el ajuste nunca se aplica dos veces
+        try:
+            with self.db_connection.transaction():
+                self._apply_stock_adjustment(deltas)
+                self.operation_model.mark_applied([(key, 'ajuste_stock')])
+        except Exception as e:
+            if self.db_connection.is_connection_error(e):
+                data = {'ajustes': {str(product_id): quantity for product_id, quantity in deltas.items()}}
+                if self._save_offline('ajuste_stock', data, key):
+                    return True, "Sin conexión con el servidor: el ajuste se guardó y se aplicará al volver la conexión."
+                return False, "Sin conexión con el servidor y no se pudo guardar el ajuste. No se aplicó."
+            print(f"Error al ajustar el stock: {e}")
+            return False, "Error al ajustar el stock. No se guardó ningún cambio."
+        return True, f"Stock ajustado en {len(deltas)} productos."
+
+    def _apply_stock_adjustment(self, deltas):
+        if self.product_model.bulk_adjust_stock(deltas) is None:
+            raise RuntimeError("No se pudo ajustar el stock.")
+
+    def apply_offline_stock_adjustment(self, data):
+        """Aplica un ajuste de stock del diario sin conexión (la llama SyncController dentro de su transacción)."""
+        self._apply_stock_adjustment({int(product_id): int(quantity) for product_id, quantity in data['ajustes'].items()})
 
     def remove_product(self, product_id):
         """Desactiva un producto (soft delete)."""
@@ -88,4 +177,132 @@ class ProductController(BaseController):
         
     def activate_product(self, product_id):
         """Activa un producto."""
-        return self.product_model.activate_product(product_id)
\ No newline at end of file
+        return self.product_model.activate_product(product_id)
+
+    def import_products_from_csv(self, file_path, chunk_size=1000):
+        """
+        Importa productos desde un archivo CSV (catálogo de proveedor) leyéndolo por bloques,
+        sin cargarlo completo en memoria. Cada bloque resuelve sus categorías en una sola
+        consulta (creando las que falten) y se inserta con un INSERT multi-fila dentro de
+        una transacción.
+        Las filas inválidas o con código de barras duplicado se rechazan sin detener la importación.
+        Retorna (bool, mensaje, rechazos) donde rechazos es una lista de diccionarios
+        {'linea', 'codigo_barras', 'motivo'}.
+        """
+        rejected = []
+        imported = 0
+        category_ids = {}    # nombre de categoría (casefold) -> id, compartido entre bloques
+        seen_barcodes = set() # códigos ya vistos en el archivo (casefold)
+
+        try:
+            with open(file_path, newline="", encoding="utf-8-sig") as csv_file:
+                sample = csv_file.read(4096)
+                csv_file.seek(0)
+                try:
+                    dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+                except csv.Error:
+                    dialect = csv.excel
+                reader = csv.DictReader(csv_file, dialect=dialect)
+
+                missing_columns = [col for col in CSV_IMPORT_COLUMNS if col not in (reader.fieldnames or [])]
+                if missing_columns:
+                    return False, f"Faltan columnas en el CSV: {', '.join(missing_columns)}.", rejected
+
+                chunk = []
+                for raw_row in reader:
+                    line_number = reader.line_num
+                    row, reason = self._parse_csv_row(raw_row)
+                    if reason is None:
+                        barcode_key = row[0].casefold()
+                        if barcode_key in seen_barcodes:
+                            reason = "Código de barras repetido en el archivo."
+                        else:
+                            seen_barcodes.add(barcode_key)
+                    if reason is not None:
+                        rejected.append({'linea': line_number, 'codigo_barras': raw_row.get('codigo_barras'), 'motivo': reason})
+                        continue
+
+                    chunk.append((line_number, row))
+                    if len(chunk) >= chunk_size:
+                        imported += self._import_chunk(chunk, category_ids, rejected)
+                        chunk = []
+                if chunk:
+                    imported += self._import_chunk(chunk, category_ids, rejected)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Error al leer el CSV '{file_path}': {e}")
+            return False, f"No se pudo leer el archivo: {e}", rejected
+
+        message = f"{imported} productos importados, {len(rejected)} filas rechazadas."
+        return imported > 0 or not rejected, message, rejected
+
+    @staticmethod
+    def _parse_csv_row(raw_row):
+        """
+        Valida y convierte una fila del CSV.
+        Retorna (tupla_de_parámetros, None) o (None, motivo_del_rechazo).
+        """
+        values = {col: (raw_row.get(col) or "").strip() for col in CSV_IMPORT_COLUMNS}
+        required = ("codigo_barras", "nombre_producto", "categoria", "precio_venta",
+                    "costo_unitario", "stock_actual", "stock_minimo", "unidad_medida")
+        empty = [col for col in required if not values[col]]
+        if empty:
+            return None, f"Campos obligatorios vacíos: {', '.join(empty)}."
+        try:
+            price = float(values['precio_venta'].replace(",", "."))
+            cost = float(values['costo_unitario'].replace(",", "."))
+            stock = int(values['stock_actual'])
+            min_stock = int(values['stock_minimo'])
+        except ValueError:
+            return None, "Precio, costo y stock deben ser números válidos."
+
+        return (values['codigo_barras'], values['nombre_producto'], values['descripcion'], values['categoria'],
+                price, cost, stock, min_stock, values['unidad_medida']), None
+
+    def _import_chunk(self, chunk, category_ids, rejected):
+        """
+        Inserta un bloque de filas ya validadas. Retorna cuántos productos se insertaron.
+        """
+        # 1. Descartar códigos de barras que ya existen en la base de datos (una sola consulta)
+        existing = {code.casefold() for code in self.product_model.get_existing_barcodes(row[0] for _, row in chunk)}
+        pending = []
+        for line_number, row in chunk:
+            if row[0].casefold() in existing:
+                rejected.append({'linea': line_number, 'codigo_barras': row[0], 'motivo': "El código de barras ya existe."})
+            else:
+                pending.append((line_number, row))
+        if not pending:
+            return 0
+
+        try:
+            with self.db_connection.transaction():
+                # 2. Resolver las categorías del bloque que aún no conocemos, creando las que falten
+                unknown = {row[3] for _, row in pending if row[3].casefold() not in category_ids}
+                if unknown:
+                    found = self.category_model.get_categories_by_names(unknown)
+                    category_ids.update({cat['nombre_categoria'].casefold(): cat['id'] for cat in found})
+                    missing = [name for name in unknown if name.casefold() not in category_ids]
+                    if missing:
+                        self.category_model.create_categories(missing)
+                        created = self.category_model.get_categories_by_names(missing)
+                        category_ids.update({cat['nombre_categoria'].casefold(): cat['id'] for cat in created})
+
+                # 3. Insertar el bloque completo con un INSERT multi-fila
+                products = []
+                unresolved = []
+                for line_number, row in pending:
+                    category_id = category_ids.get(row[3].casefold())
+                    if category_id is None:
+                        unresolved.append({'linea': line_number, 'codigo_barras': row[0], 'motivo': f"No se pudo resolver la categoría '{row[3]}'."})
+                    else:
+                        products.append(row[:3] + (category_id,) + row[4:])
+                inserted = self.product_model.create_products_bulk(products) if products else 0
+            rejected.extend(unresolved)
+            return inserted or 0
+        except Exception as e:
+            print(f"Error al importar bloque de productos: {e}")
+            # Las categorías creadas en este bloque se revirtieron con la transacción
+            for name in {row[3] for _, row in pending}:
+                category_ids.pop(name.casefold(), None)
+            for line_number, row in pending:
+                rejected.append({'linea': line_number, 'codigo_barras': row[0], 'motivo': f"Error al guardar el bloque: {e}"})
+            return 0
\ No newline at end of file
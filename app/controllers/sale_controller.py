@@ -0,0 +1,206 @@
+# app/controllers/sale_controller.py
+
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from app.models.sale_model import SaleModel
+from app.models.product_model import ProductModel, InsufficientStockError
+from app.models.cart_model import CartModel
+from app.models.operation_model import OperationModel
+from app.controllers.base_controller import BaseController
+
+class SaleController(BaseController):
+    """
+    Controlador del punto de venta: carrito en curso y cobro de la venta.
+    """
+    def __init__(self):
+        super().__init__()
+        self.sale_model = SaleModel()
+        self.product_model = ProductModel()
+        self.operation_model = OperationModel()
+        self.cart = CartModel()
+
+    def find_product_for_sale(self, barcode, cache_only=False):
+        """
+        Busca un producto vendible por su código de barras (se puede llamar desde un hilo de trabajo).
+        Retorna (producto, None) o (None, mensaje_de_error).
+        Con cache_only=True solo mira la caché en memoria y retorna (None, None) si no está,
+        lo que permite resolver el escaneo al instante en el hilo de la interfaz.
+        """
+        if not barcode:
+            return None, "Ingrese un código de barras."
+        if cache_only:
+            product = self.product_model.get_cached_product_by_barcode(barcode)
+            if product is None:
+                return None, None
+        else:
+            product = self.product_model.get_product_by_barcode(barcode)
+        if not product:
+            return None, f"No existe un producto con código '{barcode}'."
+        if not product.get('activo'):
+            return None, f"El producto '{product['nombre_producto']}' está inactivo."
+        return product, None
+
+    def suggest_products(self, text, limit=8):
+        """Sugerencias para autocompletar mientras se escribe (en memoria, se puede llamar en cada tecla)."""
+        if not text or not text.strip():
+            return []
+        return self.product_model.lookup_products(text, limit)
+
+    # --- Cachés del punto de venta (las usa el escaneo y el autocompletado) ---
+
+    def preload_product_cache(self):
+        """Precarga la caché de códigos de barras (pensado para ejecutarse en segundo plano al iniciar)."""
+        return self.product_model.preload_barcode_cache()
+
+    def refresh_product_cache(self):
+        """Incorpora a la caché los cambios hechos en productos por otras terminales."""
+        return self.product_model.refresh_barcode_cache()
+
+    def build_product_index(self):
+        """Construye el índice de autocompletado (pensado para ejecutarse en segundo plano)."""
+        return self.product_model.build_product_index()
+
+    def refresh_product_index(self):
+        """Aplica al índice de autocompletado los cambios de otras terminales."""
+        return self.product_model.refresh_product_index()
+
+    def add_to_cart(self, product, quantity=1):
+        """
+        Añade un producto al carrito (debe llamarse desde el hilo de la interfaz).
+        Retorna (bool, mensaje). El stock se valida aquí de forma orientativa;
+        la comprobación definitiva la hace el descuento atómico al cobrar.
+        """
+        if quantity <= 0:
+            return False, "La cantidad debe ser mayor que cero."
+        in_cart = self.cart.get_quantity(product['codigo_barras'])
+        if in_cart + quantity > product['stock_actual']:
+            return False, f"Stock insuficiente para '{product['nombre_producto']}' (disponible: {product['stock_actual']})."
+        self.cart.add_product(product, quantity)
+        return True, f"'{product['nombre_producto']}' añadido."
+
+    def scan_barcode(self, barcode, quantity=1):
+        """Busca un producto y lo añade al carrito en una sola llamada. Retorna (bool, mensaje)."""
+        product, error = self.find_product_for_sale(barcode)
+        if error:
+            return False, error
+        return self.add_to_cart(product, quantity)
+
+    def update_cart_quantity(self, barcode, quantity):
+        return self.cart.set_quantity(barcode, quantity)
+
+    def remove_from_cart(self, barcode):
+        return self.cart.remove_line(barcode)
+
+    def get_cart_lines(self):
+        return self.cart.get_lines()
+
+    def get_cart_total(self):
+        return self.cart.get_total()
+
+    def clear_cart(self):
+        self.cart.clear()
+
+    def checkout(self, user_id, payment_method="Efectivo", lines=None):
+        """
+        Cobra la venta en curso: cabecera, todas las líneas (un INSERT multi-fila), el
+        descuento de stock y los resúmenes del día se guardan en una única transacción con un solo COMMIT.
+        Retorna (bool, mensaje, id_venta). Si algún producto no tiene stock no se guarda nada.
+        Si el servidor no está disponible la venta se guarda en el diario sin conexión y se
+        registra al volver la conexión (id_venta es None).
+        `lines` es la copia del carrito (get_cart_lines()) tomada en el hilo de Tk: el cobro corre
+        en un hilo de trabajo y no toca el carrito. Si es None se usan las líneas actuales.
+        El carrito no se vacía aquí: quien cobra llama a clear_cart() si la venta se registró.
+        """
+        if lines is None:
+            lines = self.cart.get_lines()
+        if not lines:
+            return False, "El carrito está vacío.", None
+
+        total = sum((line['subtotal'] for line in lines), Decimal("0.00"))
+        key = str(uuid.uuid4()) # Clave de idempotencia: la venta nunca se registra dos veces
+        start = time.perf_counter()
+        try:
+            with self.db_connection.transaction():
+                sale_id = self._save_sale(user_id, total, payment_method, lines)
+                ok, short_ids = self.product_model.decrement_stock_batch(
+                    (line['id_producto'], line['cantidad']) for line in lines)
+                if not ok:
+                    raise InsufficientStockError(short_ids)
+                self.operation_model.mark_applied([(key, 'venta')])
+        except InsufficientStockError as e:
+            names = [line['nombre_producto'] for line in lines if line['id_producto'] in e.product_ids]
+            if names:
+                return False, f"Stock insuficiente: {', '.join(names)}.", None
+            return False, "Error al descontar el stock. La venta no se registró.", None
+        except Exception as e:
+            if self.db_connection.is_connection_error(e):
+                # El COMMIT pudo llegar o no: si llegó, la clave hace que la reproducción la omita
+                return self._checkout_offline(user_id, payment_method, lines, total, key)
+            print(f"Error al registrar la venta: {e}")
+            return False, "Error al registrar la venta. No se guardó ningún cambio.", None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Venta {sale_id} registrada en {elapsed_ms:.1f} ms ({len(lines)} líneas).")
+        return True, f"Venta N° {sale_id} registrada. Total: S/ {total:.2f}", sale_id
+
+    def _save_sale(self, user_id, total, payment_method, lines, sold_at=None):
+        """Guarda cabecera, líneas y resúmenes del día de una venta (dentro de una transacción abierta)."""
+        sale_id = self.sale_model.create_sale(user_id, total, payment_method, sold_at)
+        if not sale_id:
+            raise RuntimeError("No se pudo registrar la cabecera de la venta.")
+        self.sale_model.add_sale_lines(sale_id, lines)
+        self.sale_model.add_to_daily_summary(sale_id, user_id, total, sold_at[:10] if sold_at else None)
+        return sale_id
+
+    def _checkout_offline(self, user_id, payment_method, lines, total, key):
+        data = {
+            'id_usuario': user_id,
+            'metodo_pago': payment_method,
+            'total': str(total),
+            'vendida_en': datetime.now().isoformat(" ", timespec="seconds"),
+            'lineas': [{
+                'id_producto': line['id_producto'],
+                'cantidad': line['cantidad'],
+                'precio_unitario': str(line['precio_unitario']),
+                'subtotal': str(line['subtotal']),
+            } for line in lines],
+        }
+        if not self._save_offline('venta', data, key):
+            return False, "Sin conexión con el servidor y no se pudo guardar la venta en esta caja. No se registró.", None
+        print(f"Venta guardada sin conexión ({len(lines)} líneas); se registrará al volver la conexión.")
+        return True, (f"Sin conexión con el servidor: la venta se guardó en esta caja y se registrará "
+                      f"al volver la conexión. Total: S/ {total:.2f}"), None
+
+    def apply_offline_sale(self, data):
+        """
+        Registra una venta del diario sin conexión (la llama SyncController dentro de su transacción).
+        La venta ya ocurrió, así que el stock se descuenta aunque quede negativo.
+        """
+        lines = [{
+            'id_producto': int(line['id_producto']),
+            'cantidad': int(line['cantidad']),
+            'precio_unitario': Decimal(line['precio_unitario']),
+            'subtotal': Decimal(line['subtotal']),
+        } for line in data['lineas']]
+        self._save_sale(data['id_usuario'], Decimal(data['total']), data['metodo_pago'], lines, data['vendida_en'])
+        if self.product_model.bulk_adjust_stock((line['id_producto'], -line['cantidad']) for line in lines) is None:
+            raise RuntimeError("No se pudo descontar el stock de la venta.")
+
+    def get_dashboard_summary(self, top_limit=5):
+        """
+        Indicadores de hoy para el dashboard (recaudación, tickets, ticket promedio y categorías
+        más vendidas). Se leen de las tablas de resumen, no del detalle de ventas.
+        """
+        summary = self.sale_model.get_daily_summary()
+        summary['top_categorias'] = self.sale_model.get_top_categories(limit=top_limit)
+        return summary
+
+    def get_low_stock_report(self, limit=20):
+        """
+        Reporte de stock bajo para el dashboard. Retorna (total, productos): cuántos productos
+        están en o bajo su mínimo y los `limit` más faltantes. Vive aquí y no en
+        ProductController para que el dashboard no cargue los módulos de administración.
+        """
+        return self.product_model.count_low_stock_products(), self.product_model.get_low_stock_products(limit)
@@ -0,0 +1,89 @@
+# app/controllers/sync_controller.py
+
+import threading
+from config.db_config import JOURNAL_CONFIG
+from app.database.write_journal import get_write_journal
+from app.models.operation_model import OperationModel
+from app.controllers.base_controller import BaseController
+
+class SyncController(BaseController):
+    """
+    Aplica en la base de datos las escrituras guardadas en el diario sin conexión
+    (ventas y ajustes de stock hechos mientras el servidor no respondía).
+    `handlers` asocia cada tipo de operación con la función que la aplica a partir de sus
+    datos; esa función se llama dentro de una transacción abierta y lanza una excepción si falla.
+    """
+    def __init__(self, handlers):
+        super().__init__()
+        self.journal = get_write_journal()
+        self.operation_model = OperationModel()
+        self.handlers = handlers
+        self._replay_lock = threading.Lock()
+
+    def pending_count(self):
+        """Operaciones guardadas sin conexión que aún no llegaron a la base de datos."""
+        return self.journal.pending_count()
+
+    def replay_pending(self, batch_size=None):
+        """
+        Aplica las operaciones pendientes en transacciones de hasta `batch_size` operaciones.
+        Las que ya estaban aplicadas (según su clave de idempotencia) se omiten; las que la base
+        de datos rechaza se apartan para revisarlas a mano y no bloquean a las demás.
+        Si la conexión vuelve a cortarse se detiene y lo pendiente se reintenta la próxima vez.
+        Retorna (bool, mensaje): True si el diario quedó vacío.
+        """
+        if not self.journal.pending_count():
+            return True, "No hay operaciones pendientes."
+        if not self._replay_lock.acquire(blocking=False):
+            return False, "El diario sin conexión ya se está aplicando."
+        try:
+            entries = self.journal.take_pending()
+            batch_size = batch_size or JOURNAL_CONFIG['replay_batch_size']
+            applied = skipped = rejected = 0
+            for start in range(0, len(entries), batch_size):
+                batch = entries[start:start + batch_size]
+                try:
+                    done, repeated = self._apply_batch(batch)
+                except Exception as e:
+                    if self.db_connection.is_connection_error(e):
+                        return False, f"Sin conexión con el servidor: quedan {len(entries) - start} operaciones por aplicar."
+                    # Alguna operación del bloque no se puede aplicar: se reintentan de a una para apartar solo esas
+                    done = repeated = 0
+                    for entry in batch:
+                        try:
+                            one_done, one_repeated = self._apply_batch([entry])
+                        except Exception as entry_error:
+                            if self.db_connection.is_connection_error(entry_error):
+                                return False, "Sin conexión con el servidor: se reintentará más tarde."
+                            print(f"Operación '{entry.get('tipo')}' {entry.get('clave')} rechazada: {entry_error}")
+                            self.journal.reject(entry, entry_error)
+                            rejected += 1
+                        else:
+                            done += one_done
+                            repeated += one_repeated
+                applied += done
+                skipped += repeated
+            self.journal.finish_replay()
+        finally:
+            self._replay_lock.release()
+        message = (f"Diario sin conexión aplicado: {applied} operaciones registradas, "
+                   f"{skipped} ya estaban registradas, {rejected} rechazadas.")
+        print(message)
+        return True, message
+
+    def _apply_batch(self, batch):
+        """Aplica un bloque de operaciones en una sola transacción. Retorna (aplicadas, omitidas)."""
+        with self.db_connection.transaction():
+            seen = self.operation_model.get_applied_keys(entry['clave'] for entry in batch)
+            new = []
+            for entry in batch:
+                if entry['clave'] in seen:
+                    continue
+                seen.add(entry['clave'])
+                handler = self.handlers.get(entry['tipo'])
+                if handler is None:
+                    raise ValueError(f"Tipo de operación desconocido: '{entry['tipo']}'.")
+                handler(entry['datos'])
+                new.append((entry['clave'], entry['tipo']))
+            self.operation_model.mark_applied(new)
+        return len(new), len(batch) - len(new)
@@ -63,18 +63,29 @@ class UserController(BaseController):
         if not user_data:
             return False, "Usuario no encontrado para actualizar."
 
-        if new_username and new_username != user_data['nombre_usuario']:
+        change_username = new_username and new_username != user_data['nombre_usuario']
+        if change_username:
             existing_user = self.user_model.get_user_by_username(new_username)
             if existing_user and existing_user['id'] != user_id:
                 return False, f"El nombre de usuario '{new_username}' ya está en uso."
-            self.user_model.update_user_username(user_id, new_username)
 
+        # El hash se calcula antes de abrir la transacción para no retener la conexión durante bcrypt
+        hashed_password = None
         if new_password:
             hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            self.user_model.update_user_password(user_id, hashed_password)
 
-        if new_role and new_role != user_data['rol']:
-            self.user_model.update_user_role(user_id, new_role)
+        # Todos los cambios se confirman juntos (un solo COMMIT) o no se aplica ninguno
+        try:
+            with self.db_connection.transaction():
+                if change_username:
+                    self.user_model.update_user_username(user_id, new_username)
+                if hashed_password:
+                    self.user_model.update_user_password(user_id, hashed_password)
+                if new_role and new_role != user_data['rol']:
+                    self.user_model.update_user_role(user_id, new_role)
+        except Exception as e:
+            print(f"Error al actualizar usuario {user_id}: {e}")
+            return False, "Error al actualizar el usuario. No se guardó ningún cambio."
 
         return True, "Usuario actualizado exitosamente."
 
@@ -83,17 +94,27 @@ class UserController(BaseController):
         Obtiene una lista de todos los usuarios registrados, formateada para la visualización.
         """
         users = self.user_model.get_all_users()
-        formatted_users = []
-        if users:
-            for user in users:
-                formatted_user = {
-                    'id': user.get('id'),
-                    'nombre_usuario': user.get('nombre_usuario'),
-                    'rol': user.get('rol'),
-                    'activo': "Sí" if user.get('activo') == 1 else "No"
-                }
-                formatted_users.append(formatted_user)
-        return formatted_users
+        return [self._format_user_for_display(user) for user in users] if users else []
+
+    def get_user_for_display(self, user_id=None, username=None):
+        """
+        Obtiene un solo usuario (por ID o por nombre) formateado para la visualización,
+        para refrescar únicamente su fila tras crearlo o editarlo.
+        """
+        if user_id is not None:
+            user = self.user_model.get_user_by_id(user_id)
+        else:
+            user = self.user_model.get_user_by_username(username)
+        return self._format_user_for_display(user) if user else None
+
+    @staticmethod
+    def _format_user_for_display(user):
+        return {
+            'id': user.get('id'),
+            'nombre_usuario': user.get('nombre_usuario'),
+            'rol': user.get('rol'),
+            'activo': "Sí" if user.get('activo') == 1 else "No"
+        }
 
     def set_user_active_status(self, user_id, is_active):
         """
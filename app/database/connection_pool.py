@@ -0,0 +1,194 @@
+# app/database/connection_pool.py
+
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no se obtiene una conexión libre dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones seguro entre hilos.
+    Las conexiones se abren bajo demanda hasta `pool_size` y se reutilizan en orden LIFO
+    (la última devuelta es la primera en salir), de modo que pocas conexiones "calientes"
+    atienden la mayor parte del trabajo. Si todas están ocupadas se espera hasta `timeout`
+    segundos a que alguna quede libre.
+    """
+    def __init__(self, connection_factory, pool_size=5, timeout=10, validator=None):
+        self._factory = connection_factory # Función que abre una conexión nueva
+        self._validator = validator        # Función opcional que comprueba una conexión reutilizada
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self._idle = deque()    # Conexiones libres, de la más antigua a la más reciente
+        self._idle_since = {}   # id(conexión) -> momento en que quedó libre
+        self._opened = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Estadísticas de uso
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._checkout_total = 0.0
+        self._checkout_max = 0.0
+
+    def acquire(self):
+        """
+        Obtiene una conexión del pool (o abre una nueva si aún hay cupo).
+        Lanza PoolTimeoutError si no hay ninguna libre dentro del tiempo de espera.
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        waited = False
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("El pool de conexiones está cerrado.")
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._idle_since.pop(id(conn), None)
+                    break
+                if self._opened < self.pool_size:
+                    # Reservamos el cupo ahora y abrimos la conexión fuera del lock
+                    self._opened += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No hay conexiones libres en el pool tras esperar {self.timeout} s.")
+                waited = True
+                self._cond.wait(remaining)
+        wait_time = time.perf_counter() - start
+
+        try:
+            if conn is not None and self._validator and not self._validator(conn):
+                # La conexión reutilizada ya no sirve: se cierra y se abre otra en su mismo cupo
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+
+        self._record_checkout(wait_time, time.perf_counter() - start, waited)
+        return conn
+
+    def release(self, conn):
+        """Devuelve una conexión al pool para que otro hilo pueda usarla."""
+        with self._cond:
+            if self._closed:
+                self._opened -= 1
+                self._close_quietly(conn)
+                return
+            self._idle.append(conn)
+            self._idle_since[id(conn)] = time.monotonic()
+            self._cond.notify()
+
+    def discard(self, conn):
+        """Cierra una conexión defectuosa y libera su cupo en el pool."""
+        self._close_quietly(conn)
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def discard_idle(self):
+        """
+        Cierra todas las conexiones libres (p. ej. tras detectar que el servidor se reinició,
+        cuando todas quedaron inservibles). Las siguientes se abren bajo demanda.
+        """
+        with self._cond:
+            stale = list(self._idle)
+            self._idle.clear()
+            self._idle_since.clear()
+            self._opened -= len(stale)
+            self._cond.notify_all()
+        for conn in stale:
+            self._close_quietly(conn)
+
+    def ping_idle(self, max_idle_seconds, ping):
+        """
+        Mantiene vivas las conexiones libres: a las que llevan más de `max_idle_seconds` sin
+        usarse les aplica `ping(conn)` fuera del lock. Las que fallan se cierran y liberan su cupo.
+        Retorna cuántas conexiones se comprobaron.
+        """
+        now = time.monotonic()
+        with self._cond:
+            stale = [conn for conn in self._idle if now - self._idle_since.get(id(conn), now) >= max_idle_seconds]
+            for conn in stale:
+                self._idle.remove(conn)
+                self._idle_since.pop(id(conn), None)
+        for conn in stale:
+            try:
+                ping(conn)
+            except Exception:
+                self.discard(conn)
+                continue
+            # Vuelve al fondo de la pila LIFO para no desplazar a las conexiones "calientes"
+            with self._cond:
+                if self._closed:
+                    self._opened -= 1
+                    self._close_quietly(conn)
+                    continue
+                self._idle.appendleft(conn)
+                self._idle_since[id(conn)] = time.monotonic()
+                self._cond.notify()
+        return len(stale)
+
+    def close(self):
+        """
+        Cierra todas las conexiones libres. Las que estén en uso se cierran
+        al ser devueltas.
+        """
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._close_quietly(self._idle.pop())
+                self._opened -= 1
+            self._idle_since.clear()
+            self._cond.notify_all()
+
+    def stats(self):
+        """Retorna un diccionario con el tamaño del pool, esperas y latencias de checkout."""
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                'pool_size': self.pool_size,
+                'open': self._opened,
+                'idle': len(self._idle),
+                'in_use': self._opened - len(self._idle),
+                'checkouts': checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': (self._wait_total / checkouts * 1000) if checkouts else 0.0,
+                'max_wait_ms': self._wait_max * 1000,
+                'avg_checkout_ms': (self._checkout_total / checkouts * 1000) if checkouts else 0.0,
+                'max_checkout_ms': self._checkout_max * 1000,
+            }
+
+    def _record_checkout(self, wait_time, checkout_time, waited):
+        with self._cond:
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+            self._wait_total += wait_time
+            self._wait_max = max(self._wait_max, wait_time)
+            self._checkout_total += checkout_time
+            self._checkout_max = max(self._checkout_max, checkout_time)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
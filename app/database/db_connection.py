@@ -1,17 +1,42 @@
 # app/database/db_connection.py
 
-import mysql.connector
-from mysql.connector import Error
-from config.db_config import DB_CONFIG
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from config.db_config import DB_BACKEND, POOL_CONFIG, QUERY_LOG_CONFIG
+from app.database.connection_pool import ConnectionPool, PoolTimeoutError
+from app.database.query_stats import QueryStats
 
 class DBConnection:
     """
-    Clase para manejar la conexión y operaciones con la base de datos MySQL/MariaDB.
-    Implementa un patrón Singleton para asegurar una única instancia de conexión.
+    Interfaz común de acceso a la base de datos, con una implementación por motor:
+    MySQLConnection (servidor MySQL/MariaDB) y SQLiteConnection (archivo local).
+    Implementa un patrón Singleton: toda la aplicación comparte una única instancia,
+    que a su vez reparte conexiones de un pool. Cada consulta toma una conexión y un
+    cursor propios, por lo que varios hilos pueden consultar la base de datos a la vez.
+    Dentro de `with db.transaction():` todas las consultas del hilo usan la misma conexión
+    y se confirman juntas al final.
+
+    Los modelos escriben SQL en dialecto MySQL (placeholders %s); cada motor lo adapta en
+    translate(). Las subclases implementan los métodos que lanzan NotImplementedError.
     """
+    dialect = None   # 'mysql' o 'sqlite'
+    Error = Exception # Clase base de los errores del conector del motor
+
     _instance = None # Para el patrón Singleton
-    _connection = None
-    _cursor = None
+    _pool = None
+    _pool_lock = threading.Lock()
+    _local = threading.local() # Conexión de la transacción abierta en cada hilo
+
+    # Sentencias preparadas (en el servidor) que se conservan por conexión del pool
+    STATEMENT_CACHE_SIZE = 64
+    _stmt_lock = threading.Lock()
+    _stmt_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    # Latencia y filas por sentencia normalizada, y log de consultas lentas
+    query_stats = QueryStats(**QUERY_LOG_CONFIG)
 
     def __new__(cls):
         """
@@ -22,119 +47,538 @@ class DBConnection:
             cls._instance = super(DBConnection, cls).__new__(cls)
         return cls._instance
 
+    # --- Métodos que implementa cada motor ---
+
+    def _open_connection(self):
+        """Abre una conexión nueva para el pool, en modo autocommit."""
+        raise NotImplementedError
+
+    def _describe(self):
+        """Texto que identifica la base de datos en los mensajes (p. ej. "'pos_minimarket_db'")."""
+        raise NotImplementedError
+
+    def _new_cursor(self, conn):
+        """Cursor que devuelve las filas como diccionarios."""
+        raise NotImplementedError
+
+    def _new_prepared_cursor(self, conn):
+        """Cursor para una sentencia preparada reutilizable (puede devolver tuplas)."""
+        raise NotImplementedError
+
+    def _statement_cursor(self, conn):
+        """Cursor con el que se ejecuta una sentencia. Por defecto uno nuevo por sentencia."""
+        return self._new_cursor(conn)
+
+    def _release_cursor(self, conn, cursor, failed):
+        """Se llama al terminar la sentencia (failed=True si lanzó una excepción)."""
+        self._close_cursor_quietly(cursor)
+
+    def _begin(self, conn):
+        """Inicia una transacción explícita en la conexión."""
+        raise NotImplementedError
+
+    def _ping(self, conn):
+        """Comprueba una conexión inactiva; lanza una excepción si ya no sirve."""
+        raise NotImplementedError
+
+    def _is_connection_lost(self, error):
+        """Indica si el error se debe a que la conexión con el servidor se cortó."""
+        return False
+
+    def translate(self, query):
+        """Adapta una sentencia escrita en dialecto MySQL al motor. MySQL la usa tal cual."""
+        return query
+
+    def estimate_row_count(self, table):
+        """Número aproximado de filas de una tabla, sin recorrerla si el motor lo permite."""
+        raise NotImplementedError
+
+    # --- Pool y ciclo de vida ---
+
     def connect(self):
         """
-        Establece la conexión a la base de datos si no está ya establecida.
+        Crea el pool de conexiones si no existe y verifica que se pueda abrir una conexión.
+        Retorna el pool, o None si no fue posible conectar.
         """
-        if self._connection is None or not self._connection.is_connected():
-            try:
-                self._connection = mysql.connector.connect(
-                    host=DB_CONFIG['host'],
-                    user=DB_CONFIG['user'],
-                    password=DB_CONFIG['password'],
-                    database=DB_CONFIG['database'],
-                    port=DB_CONFIG['port']
-                )
-                if self._connection.is_connected():
-                    # Usamos dictionary=True para que el cursor devuelva diccionarios en lugar de tuplas
-                    # Esto simplifica el acceso a los datos por nombre de columna en los modelos
-                    self._cursor = self._connection.cursor(dictionary=True, buffered=True) 
-                    print(f"Conexión a la base de datos '{DB_CONFIG['database']}' establecida con éxito.")
-                else:
-                    print("No se pudo establecer la conexión a la base de datos.")
-            except Error as e:
-                print(f"Error al conectar a la base de datos: {e}")
-                self._connection = None # Asegurar que la conexión es None si falla
-                self._cursor = None
-        return self._connection
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # Sin validador: is_connected() hace un ping al servidor y costaría un viaje
+                    # extra por consulta. Las conexiones cortadas se detectan al usarlas (_run)
+                    # y el keepalive evita que las inactivas caduquen.
+                    pool = ConnectionPool(
+                        self._open_connection,
+                        pool_size=POOL_CONFIG['pool_size'],
+                        timeout=POOL_CONFIG['pool_timeout']
+                    )
+                    try:
+                        # La primera conexión valida las credenciales y queda lista en el pool
+                        pool.release(pool.acquire())
+                    except (self.Error, PoolTimeoutError, OSError) as e:
+                        print(f"Error al conectar a la base de datos: {e}")
+                        return None
+                    self._pool = pool
+                    self._start_keepalive(pool)
+                    print(f"Conexión a la base de datos {self._describe()} establecida con éxito "
+                          f"(pool de {POOL_CONFIG['pool_size']} conexiones).")
+        return self._pool
+
+    def _start_keepalive(self, pool):
+        """
+        Inicia un hilo que, en los periodos sin actividad, hace ping a las conexiones que
+        llevan más de `keepalive_interval` segundos inactivas. Así no las cierra el servidor
+        (wait_timeout) ni un router/firewall, y las consultas no necesitan comprobarlas antes.
+        """
+        interval = POOL_CONFIG.get('keepalive_interval', 0)
+        if not interval:
+            return
+        stop = threading.Event()
+        def keepalive():
+            while not stop.wait(interval):
+                pool.ping_idle(interval, self._ping)
+        self._keepalive_stop = stop
+        threading.Thread(target=keepalive, name="db-keepalive", daemon=True).start()
 
     def disconnect(self):
         """
-        Cierra la conexión a la base de datos si está abierta.
+        Cierra todas las conexiones del pool.
         """
-        if self._connection and self._connection.is_connected():
-            self._cursor.close()
-            self._connection.close()
+        stop = getattr(self, '_keepalive_stop', None)
+        if stop is not None:
+            stop.set()
+            self._keepalive_stop = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None # Limpiar la referencia
             print("Conexión a la base de datos cerrada.")
-            self._connection = None # Limpiar la referencia
-            self._cursor = None
 
-    def execute_query(self, query, params=None):
+    def get_pool_stats(self):
+        """
+        Retorna las estadísticas del pool: tamaño, conexiones en uso, esperas
+        y latencia de obtención de conexiones. Diccionario vacío si no hay pool.
+        """
+        return self._pool.stats() if self._pool is not None else {}
+
+    def get_statement_cache_stats(self):
+        """
+        Retorna los aciertos y fallos de la caché de sentencias preparadas: un acierto es una
+        ejecución que reutilizó una sentencia ya preparada en esa conexión (el servidor no
+        vuelve a analizar el SQL).
+        """
+        with self._stmt_lock:
+            stats = dict(self._stmt_stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['hits'] / lookups) if lookups else 0.0
+        return stats
+
+    def get_query_stats(self):
+        """
+        Retorna las métricas por sentencia (ejecuciones, errores, filas, latencia media,
+        p50/p95/p99 y máxima), de la que más tiempo total consumió a la que menos.
+        """
+        return self.query_stats.snapshot()
+
+    def reset_query_stats(self):
+        self.query_stats.reset()
+
+    def _count_statement(self, key):
+        with self._stmt_lock:
+            self._stmt_stats[key] += 1
+
+    def in_transaction(self):
+        """Indica si el hilo actual tiene una transacción abierta."""
+        return getattr(self._local, 'conn', None) is not None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa varias sentencias en una unidad de trabajo:
+
+            with db.transaction():
+                modelo_a.metodo_que_escribe(...)
+                modelo_b.otro_metodo(...)
+
+        Todas las consultas que el hilo ejecute dentro del bloque (incluidas las de los modelos)
+        usan la misma conexión y se confirman con un único COMMIT al salir. Ante cualquier
+        excepción se hace ROLLBACK y la excepción se propaga. Dentro de una transacción los
+        errores de base de datos se lanzan en lugar de retornar None, para que el bloque se
+        revierta completo. Los bloques anidados se unen a la transacción exterior.
+        """
+        local = self._local
+        if self.in_transaction():
+            local.depth += 1
+            try:
+                yield
+            finally:
+                local.depth -= 1
+            return
+
+        if not self.connect():
+            raise self.Error("No hay conexión activa a la base de datos para iniciar una transacción.")
+        pool = self._pool
+        conn = self._begin_on_pooled_connection(pool)
+        local.conn = conn
+        local.depth = 1
+        local.after_commit = []
+        broken = False
+        try:
+            yield
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback() # Revertir todos los cambios de la unidad de trabajo
+            except self.Error:
+                broken = True # Si ni el ROLLBACK funciona, la conexión ya no sirve
+            raise
+        finally:
+            callbacks = local.after_commit
+            local.conn = None
+            local.depth = 0
+            local.after_commit = []
+            if broken:
+                self._handle_lost_connection(pool, conn)
+            else:
+                pool.release(conn)
+        self._run_callbacks(callbacks)
+
+    def after_commit(self, callback):
+        """
+        Programa `callback()` para cuando se confirme la transacción en curso del hilo
+        (se descarta si la transacción se revierte). Sin transacción abierta se ejecuta de inmediato.
+        Útil para mantener cachés en memoria coherentes con lo realmente guardado.
+        """
+        if self.in_transaction():
+            self._local.after_commit.append(callback)
+        else:
+            self._run_callbacks([callback])
+
+    def _begin_on_pooled_connection(self, pool):
+        """
+        Toma una conexión del pool e inicia la transacción en ella.
+        Como no se comprueba la conexión antes de usarla, una conexión inactiva que el servidor
+        cerró (p. ej. tras reiniciarse) se detecta aquí. Todavía no se ha ejecutado ninguna
+        sentencia de la unidad de trabajo, así que se reintenta una vez con otra conexión.
+        """
+        for attempt in range(2):
+            conn = pool.acquire()
+            try:
+                self._begin(conn)
+                return conn
+            except self.Error as e:
+                if self._is_connection_lost(e):
+                    self._handle_lost_connection(pool, conn)
+                    if attempt == 0:
+                        print(f"Se perdió la conexión con la base de datos ({e}). Reintentando...")
+                        continue
+                else:
+                    try:
+                        conn.rollback()
+                        pool.release(conn)
+                    except self.Error:
+                        self._handle_lost_connection(pool, conn)
+                raise
+
+    @staticmethod
+    def _run_callbacks(callbacks):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error en callback posterior al commit: {e}")
+
+    def is_connection_error(self, error):
+        """
+        Indica si `error` se debe a que la base de datos no está disponible (no se pudo
+        conectar o la conexión se cortó), a diferencia de un error de la propia sentencia.
+        Los controladores lo usan para guardar la escritura en el diario sin conexión.
+        """
+        return self._pool is None or self._is_connection_lost(error)
+
+    def _handle_lost_connection(self, pool, conn):
+        """
+        Descarta una conexión que perdió contacto con el servidor y también las que esperan
+        en el pool: si el servidor se reinició o la red se cortó, ninguna de ellas sirve ya.
+        """
+        pool.discard(conn)
+        pool.discard_idle()
+
+    @contextmanager
+    def _cursor(self):
+        """
+        Abre un cursor nuevo sobre la conexión de la transacción en curso o, si no hay
+        ninguna, sobre una conexión tomada del pool.
+        El cursor devuelve diccionarios en lugar de tuplas; esto simplifica el acceso
+        a los datos por nombre de columna en los modelos.
+        """
+        tx_conn = getattr(self._local, 'conn', None)
+        if tx_conn is not None:
+            cursor = self._statement_cursor(tx_conn)
+            failed = True
+            try:
+                yield tx_conn, cursor
+                failed = False
+            finally:
+                self._release_cursor(tx_conn, cursor, failed)
+            return
+
+        pool = self._pool
+        conn = pool.acquire()
+        try:
+            cursor = self._statement_cursor(conn)
+            failed = True
+            try:
+                yield conn, cursor
+                failed = False
+            finally:
+                self._release_cursor(conn, cursor, failed)
+        except self.Error as e:
+            if self._is_connection_lost(e):
+                self._handle_lost_connection(pool, conn)
+            else:
+                pool.release(conn)
+            raise
+        except BaseException:
+            pool.release(conn)
+            raise
+        pool.release(conn)
+
+    @contextmanager
+    def _prepared_cursor(self, query):
+        """
+        Igual que _cursor(), pero entrega un cursor con la sentencia preparada en el servidor.
+        Cada conexión guarda sus cursores preparados por texto SQL (LRU de STATEMENT_CACHE_SIZE),
+        así que la misma consulta solo se prepara una vez por conexión. Estos cursores
+        pueden devolver tuplas; quien los usa las convierte a diccionarios con _rows_as_dicts().
+        """
+        tx_conn = getattr(self._local, 'conn', None)
+        pool = None
+        if tx_conn is not None:
+            conn = tx_conn
+        else:
+            pool = self._pool
+            conn = pool.acquire()
+        try:
+            cache = getattr(conn, 'prepared_statements', None)
+            if cache is None:
+                cache = conn.prepared_statements = OrderedDict()
+            cursor = cache.get(query)
+            if cursor is not None:
+                cache.move_to_end(query)
+                self._count_statement('hits')
+            else:
+                cursor = self._new_prepared_cursor(conn)
+                cache[query] = cursor
+                self._count_statement('misses')
+                while len(cache) > self.STATEMENT_CACHE_SIZE:
+                    _, evicted = cache.popitem(last=False)
+                    self._close_cursor_quietly(evicted)
+                    self._count_statement('evictions')
+            try:
+                yield conn, cursor
+            except BaseException:
+                # Tras un error el cursor puede quedar en un estado inconsistente: se vuelve a preparar
+                cache.pop(query, None)
+                self._close_cursor_quietly(cursor)
+                raise
+        except self.Error as e:
+            if pool is not None:
+                if self._is_connection_lost(e):
+                    self._handle_lost_connection(pool, conn)
+                else:
+                    pool.release(conn)
+            raise
+        except BaseException:
+            if pool is not None:
+                pool.release(conn)
+            raise
+        if pool is not None:
+            pool.release(conn)
+
+    @staticmethod
+    def _rows_as_dicts(cursor, rows):
+        if not rows or isinstance(rows[0], dict):
+            return rows
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    @staticmethod
+    def _close_cursor_quietly(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def _run(self, query, params, prepared, idempotent, handle_result, count_rows=None):
+        """
+        Ejecuta la sentencia y retorna handle_result(cursor).
+        Las estadísticas registran count_rows(resultado) filas (lecturas) o, si es None,
+        cursor.rowcount (filas afectadas por DML; en SQLite vale -1 para un SELECT).
+        No se comprueba la conexión antes de cada sentencia (eso costaría un viaje extra al
+        servidor): se ejecuta directamente y, solo si falla porque la conexión se perdió,
+        se reintenta una vez con otra conexión, siempre que la sentencia sea idempotente y no
+        haya una transacción abierta (una transacción cortada no se puede continuar).
+        """
+        sql = self.translate(query)
+        attempts = 2 if idempotent and not self.in_transaction() else 1
+        for attempt in range(attempts):
+            start = None
+            try:
+                with (self._prepared_cursor(sql) if prepared else self._cursor()) as (conn, cursor):
+                    start = time.perf_counter()
+                    if params or prepared:
+                        cursor.execute(sql, params or ())
+                    else:
+                        cursor.execute(sql)
+                    result = handle_result(cursor)
+                    rows = count_rows(result) if count_rows else max(cursor.rowcount, 0)
+                self.query_stats.record(query, params, (time.perf_counter() - start) * 1000, rows)
+                return result
+            except self.Error as e:
+                if start is not None:
+                    self.query_stats.record(query, params, (time.perf_counter() - start) * 1000, 0, e)
+                if attempt + 1 < attempts and self._is_connection_lost(e):
+                    print(f"Se perdió la conexión con la base de datos ({e}). Reintentando...")
+                    continue
+                raise
+
+    def execute_query(self, query, params=None, prepared=False, idempotent=False):
         """
         Ejecuta una consulta SQL (INSERT, UPDATE, DELETE, CREATE TABLE).
-        Retorna el número de filas afectadas.
+        Retorna el número de filas afectadas. Fuera de una transacción la sentencia
+        se confirma de inmediato; dentro de db.transaction() se confirma al cerrar el bloque.
+        Con prepared=True se usa una sentencia preparada reutilizable (para DML frecuente).
+        Con idempotent=True (p. ej. "SET activo = FALSE", pero no "stock = stock - 1") se
+        reintenta una vez si la conexión se cortó.
         No usar para SELECT, usar fetch_one o fetch_all.
         """
-        if not self._connection or not self._connection.is_connected():
-            print("No hay conexión activa a la base de datos para ejecutar una consulta DML. Intentando reconectar...")
-            if not self.connect():
-                return None
+        if not self.in_transaction() and not self.connect():
+            print("No hay conexión activa a la base de datos para ejecutar una consulta DML.")
+            return None
 
         try:
-            if params:
-                self._cursor.execute(query, params)
-            else:
-                self._cursor.execute(query)
-            self._connection.commit() # Confirmar cambios para DML
-            return self._cursor.rowcount # Retorna el número de filas afectadas
-        except Error as e:
+            return self._run(query, params, prepared, idempotent, lambda cursor: cursor.rowcount)
+        except (self.Error, PoolTimeoutError) as e:
             print(f"Error al ejecutar la consulta DML: {e}")
-            if self._connection:
-                self._connection.rollback() # Revertir cambios en caso de error
+            if self.in_transaction():
+                raise
+            return None
+
+    def execute_insert(self, query, params=None):
+        """
+        Ejecuta un INSERT y retorna el id autogenerado de la fila insertada,
+        o None si hubo un error.
+        """
+        if not self.in_transaction() and not self.connect():
+            print("No hay conexión activa a la base de datos para ejecutar un INSERT.")
+            return None
+
+        try:
+            return self._run(query, params, False, False, lambda cursor: cursor.lastrowid)
+        except (self.Error, PoolTimeoutError) as e:
+            print(f"Error al ejecutar el INSERT: {e}")
+            if self.in_transaction():
+                raise
+            return None
+
+    def execute_many(self, query, params_seq):
+        """
+        Ejecuta una misma sentencia DML con varios juegos de parámetros.
+        Para INSERT ... VALUES mysql.connector los envía como un único INSERT multi-fila,
+        en lugar de un viaje de ida y vuelta por fila (SQLite las ejecuta en proceso).
+        Retorna el número total de filas afectadas, o None si hubo un error.
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return 0
+        if not self.in_transaction() and not self.connect():
+            print("No hay conexión activa a la base de datos para ejecutar una consulta masiva.")
             return None
 
-    def fetch_one(self, query, params=None):
+        start = None
+        try:
+            with self._cursor() as (conn, cursor):
+                start = time.perf_counter()
+                cursor.executemany(self.translate(query), params_seq)
+                rows = cursor.rowcount
+            self.query_stats.record(query, params_seq[0], (time.perf_counter() - start) * 1000, max(rows, 0))
+            return rows
+        except (self.Error, PoolTimeoutError) as e:
+            if start is not None:
+                self.query_stats.record(query, params_seq[0], (time.perf_counter() - start) * 1000, 0, e)
+            print(f"Error al ejecutar la consulta masiva: {e}")
+            if self.in_transaction():
+                raise
+            return None
+
+    def fetch_one(self, query, params=None, prepared=False):
         """
         Ejecuta una consulta SELECT y retorna una única fila como diccionario.
         Retorna None si no se encuentra ninguna fila o hay un error.
+        Con prepared=True se usa una sentencia preparada reutilizable (para consultas frecuentes).
+        Al ser una lectura, se reintenta una vez si la conexión se cortó.
         """
-        if not self._connection or not self._connection.is_connected():
-            print("No hay conexión activa a la base de datos para fetch_one. Intentando reconectar...")
-            if not self.connect():
-                return None
+        if not self.in_transaction() and not self.connect():
+            print("No hay conexión activa a la base de datos para fetch_one.")
+            return None
+
+        def first_row(cursor):
+            if not prepared:
+                return cursor.fetchone() # Retorna una fila como diccionario
+            # Se leen todas las filas para dejar el cursor preparado listo para la próxima ejecución
+            rows = self._rows_as_dicts(cursor, cursor.fetchall())
+            return rows[0] if rows else None
+
         try:
-            if params:
-                self._cursor.execute(query, params)
-            else:
-                self._cursor.execute(query)
-            return self._cursor.fetchone() # Retorna una fila como diccionario (gracias a dictionary=True)
-        except Error as e:
+            return self._run(query, params, prepared, True, first_row, lambda row: 0 if row is None else 1)
+        except (self.Error, PoolTimeoutError) as e:
             print(f"Error al ejecutar fetch_one: {e}")
+            if self.in_transaction():
+                raise
             return None
 
-    def fetch_all(self, query, params=None):
+    def fetch_all(self, query, params=None, prepared=False):
         """
         Ejecuta una consulta SELECT y retorna todas las filas como una lista de diccionarios.
         Retorna una lista vacía si no se encuentran filas o hay un error.
+        Con prepared=True se usa una sentencia preparada reutilizable (para consultas frecuentes).
+        Al ser una lectura, se reintenta una vez si la conexión se cortó.
         """
-        if not self._connection or not self._connection.is_connected():
-            print("No hay conexión activa a la base de datos para fetch_all. Intentando reconectar...")
-            if not self.connect():
-                return []
+        if not self.in_transaction() and not self.connect():
+            print("No hay conexión activa a la base de datos para fetch_all.")
+            return []
+
+        def all_rows(cursor):
+            if not prepared:
+                return cursor.fetchall() # Retorna todas las filas como lista de diccionarios
+            return self._rows_as_dicts(cursor, cursor.fetchall())
+
         try:
-            if params:
-                self._cursor.execute(query, params)
-            else:
-                self._cursor.execute(query)
-            return self._cursor.fetchall() # Retorna todas las filas como lista de diccionarios
-        except Error as e:
+            return self._run(query, params, prepared, True, all_rows, len)
+        except (self.Error, PoolTimeoutError) as e:
             print(f"Error al ejecutar fetch_all: {e}")
+            if self.in_transaction():
+                raise
             return []
 
     def __del__(self):
         """
-        Asegura que la conexión se cierre cuando el objeto es destruido.
+        Asegura que las conexiones se cierren cuando el objeto es destruido.
         """
         self.disconnect()
 
-# Función para obtener una instancia global de la conexión
+# Función para obtener una instancia global de la conexión, del motor elegido en config/db_config.py
 def get_db_connection():
-    return DBConnection()
+    if DB_BACKEND == 'sqlite':
+        from app.database.sqlite_connection import SQLiteConnection
+        return SQLiteConnection()
+    from app.database.mysql_connection import MySQLConnection
+    return MySQLConnection()
 
 # Ejemplo de uso (esto es solo para probar y se puede eliminar o comentar después)
 if __name__ == "__main__":
     db = get_db_connection()
     if db.connect():
-        
+        print(db.get_pool_stats())
+        print(db.get_statement_cache_stats())
 
-        db.disconnect()
\ No newline at end of file
+        db.disconnect()
@@ -0,0 +1,383 @@
+# app/database/migrations.py
+
+import re
+from app.database.db_connection import get_db_connection
+
+# Migraciones del esquema, en orden. Cada una es (versión, descripción, [sentencias SQL]).
+# Nunca se modifica una migración ya publicada: cualquier cambio de tablas, columnas o
+# índices se agrega como una migración nueva al final de la lista.
+MIGRATIONS = [
+    (1, "Tabla Categorias", [
+        '''
+        CREATE TABLE IF NOT EXISTS Categorias (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            nombre_categoria VARCHAR(255) UNIQUE NOT NULL,
+            descripcion TEXT
+        )
+        ''',
+    ]),
+    (2, "Tabla Productos", [
+        '''
+        CREATE TABLE IF NOT EXISTS Productos (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            codigo_barras VARCHAR(255) UNIQUE NOT NULL,
+            nombre_producto VARCHAR(255) NOT NULL,
+            descripcion TEXT,
+            id_categoria INT NOT NULL,
+            precio_venta DECIMAL(10, 2) NOT NULL,
+            costo_unitario DECIMAL(10, 2) NOT NULL,
+            stock_actual INT NOT NULL,
+            stock_minimo INT NOT NULL,
+            unidad_medida VARCHAR(50) NOT NULL,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            activo BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (id_categoria) REFERENCES Categorias(id)
+        )
+        ''',
+    ]),
+    (3, "Tabla Usuarios", [
+        '''
+        CREATE TABLE IF NOT EXISTS Usuarios (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            nombre_usuario VARCHAR(255) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            rol VARCHAR(50) NOT NULL,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultima_sesion TIMESTAMP NULL,
+            activo BOOLEAN DEFAULT TRUE
+        )
+        ''',
+    ]),
+    (4, "Tablas Ventas y DetalleVentas", [
+        '''
+        CREATE TABLE IF NOT EXISTS Ventas (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            id_usuario INT NOT NULL,
+            fecha_venta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            total DECIMAL(10, 2) NOT NULL,
+            metodo_pago VARCHAR(50) NOT NULL,
+            INDEX idx_ventas_fecha (fecha_venta),
+            FOREIGN KEY (id_usuario) REFERENCES Usuarios(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS DetalleVentas (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            id_venta INT NOT NULL,
+            id_producto INT NOT NULL,
+            cantidad INT NOT NULL,
+            precio_unitario DECIMAL(10, 2) NOT NULL,
+            subtotal DECIMAL(10, 2) NOT NULL,
+            FOREIGN KEY (id_venta) REFERENCES Ventas(id),
+            FOREIGN KEY (id_producto) REFERENCES Productos(id)
+        )
+        ''',
+    ]),
+    (5, "Índice por nombre para el listado paginado de productos", [
+        "CREATE INDEX idx_productos_nombre ON Productos (nombre_producto, id)",
+    ]),
+    (6, "Índice FULLTEXT para la búsqueda de productos", [
+        "CREATE FULLTEXT INDEX ft_productos_busqueda ON Productos (nombre_producto, descripcion)",
+    ]),
+    (7, "Índice por fecha de actualización de productos (sincronización incremental)", [
+        "CREATE INDEX idx_productos_actualizacion ON Productos (ultima_actualizacion)",
+    ]),
+    (8, "Fecha de actualización de categorías", [
+        """
+        ALTER TABLE Categorias
+            ADD COLUMN ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD INDEX idx_categorias_actualizacion (ultima_actualizacion)
+        """,
+    ]),
+    (9, "Fecha de actualización de usuarios", [
+        """
+        ALTER TABLE Usuarios
+            ADD COLUMN ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD INDEX idx_usuarios_actualizacion (ultima_actualizacion)
+        """,
+    ]),
+    (10, "Columna generada margen_stock para el reporte de stock bajo", [
+        # Columna almacenada (se recalcula sola al cambiar el stock) e indexada junto con activo:
+        # el reporte "margen_stock <= 0" recorre solo el rango del índice
+        """
+        ALTER TABLE Productos
+            ADD COLUMN margen_stock INT AS (stock_actual - stock_minimo) STORED,
+            ADD INDEX idx_productos_margen_stock (activo, margen_stock)
+        """,
+    ]),
+    (11, "Tablas de resumen diario de ventas (por cajero y por categoría)", [
+        """
+        CREATE TABLE IF NOT EXISTS ResumenVentasCajero (
+            fecha DATE NOT NULL,
+            id_usuario INT NOT NULL,
+            tickets INT NOT NULL DEFAULT 0,
+            total DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (fecha, id_usuario)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ResumenVentasCategoria (
+            fecha DATE NOT NULL,
+            id_categoria INT NOT NULL,
+            id_usuario INT NOT NULL,
+            unidades INT NOT NULL DEFAULT 0,
+            total DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (fecha, id_categoria, id_usuario)
+        )
+        """,
+        # Se completan con las ventas que ya existían
+        """
+        INSERT IGNORE INTO ResumenVentasCajero (fecha, id_usuario, tickets, total)
+        SELECT DATE(fecha_venta), id_usuario, COUNT(*), SUM(total)
+        FROM Ventas
+        GROUP BY DATE(fecha_venta), id_usuario
+        """,
+        """
+        INSERT IGNORE INTO ResumenVentasCategoria (fecha, id_categoria, id_usuario, unidades, total)
+        SELECT DATE(v.fecha_venta), p.id_categoria, v.id_usuario, SUM(d.cantidad), SUM(d.subtotal)
+        FROM DetalleVentas d
+        JOIN Ventas v ON d.id_venta = v.id
+        JOIN Productos p ON d.id_producto = p.id
+        GROUP BY DATE(v.fecha_venta), p.id_categoria, v.id_usuario
+        """,
+    ]),
+    (12, "Claves de idempotencia de las operaciones aplicadas (diario sin conexión)", [
+        """
+        CREATE TABLE IF NOT EXISTS OperacionesAplicadas (
+            clave VARCHAR(36) PRIMARY KEY,
+            tipo VARCHAR(30) NOT NULL,
+            fecha_aplicacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+]
+
+# Sentencias de SQLite para las migraciones cuyo DDL es propio de MySQL (las demás se aplican
+# igual en ambos motores, con la traducción de SQLiteConnection). SQLite siempre parte de un
+# archivo vacío, así que las columnas ultima_actualizacion se crean junto con su tabla (ALTER TABLE
+# no admite un DEFAULT calculado) y las migraciones 8 y 9 solo agregan su índice.
+# "ON UPDATE CURRENT_TIMESTAMP" se reemplaza por triggers que fechan la fila al cambiar sus datos.
+SQLITE_MIGRATIONS = {
+    1: [
+        '''
+        CREATE TABLE IF NOT EXISTS Categorias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_categoria VARCHAR(255) COLLATE NOCASE UNIQUE NOT NULL,
+            descripcion TEXT,
+            ultima_actualizacion TEXT DEFAULT (datetime('now', 'localtime'))
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_categorias_actualizacion
+        AFTER UPDATE OF nombre_categoria, descripcion ON Categorias
+        WHEN NEW.ultima_actualizacion IS OLD.ultima_actualizacion
+        BEGIN
+            UPDATE Categorias SET ultima_actualizacion = datetime('now', 'localtime') WHERE id = NEW.id;
+        END
+        ''',
+    ],
+    2: [
+        '''
+        CREATE TABLE IF NOT EXISTS Productos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codigo_barras VARCHAR(255) COLLATE NOCASE UNIQUE NOT NULL,
+            nombre_producto VARCHAR(255) COLLATE NOCASE NOT NULL,
+            descripcion TEXT,
+            id_categoria INT NOT NULL,
+            precio_venta DECIMAL(10, 2) NOT NULL,
+            costo_unitario DECIMAL(10, 2) NOT NULL,
+            stock_actual INT NOT NULL,
+            stock_minimo INT NOT NULL,
+            unidad_medida VARCHAR(50) NOT NULL,
+            fecha_creacion TEXT DEFAULT (datetime('now', 'localtime')),
+            ultima_actualizacion TEXT DEFAULT (datetime('now', 'localtime')),
+            activo BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (id_categoria) REFERENCES Categorias(id)
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_productos_actualizacion
+        AFTER UPDATE OF codigo_barras, nombre_producto, descripcion, id_categoria, precio_venta,
+                        costo_unitario, stock_actual, stock_minimo, unidad_medida, activo ON Productos
+        WHEN NEW.ultima_actualizacion IS OLD.ultima_actualizacion
+        BEGIN
+            UPDATE Productos SET ultima_actualizacion = datetime('now', 'localtime') WHERE id = NEW.id;
+        END
+        ''',
+    ],
+    3: [
+        '''
+        CREATE TABLE IF NOT EXISTS Usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_usuario VARCHAR(255) COLLATE NOCASE UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            rol VARCHAR(50) NOT NULL,
+            fecha_creacion TEXT DEFAULT (datetime('now', 'localtime')),
+            ultima_sesion TEXT NULL,
+            activo BOOLEAN DEFAULT TRUE,
+            ultima_actualizacion TEXT DEFAULT (datetime('now', 'localtime'))
+        )
+        ''',
+        # ultima_sesion no cuenta como cambio del usuario (igual que en MySQL, donde el login
+        # asigna ultima_actualizacion explícitamente para no moverla)
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_usuarios_actualizacion
+        AFTER UPDATE OF nombre_usuario, password_hash, rol, activo ON Usuarios
+        WHEN NEW.ultima_actualizacion IS OLD.ultima_actualizacion
+        BEGIN
+            UPDATE Usuarios SET ultima_actualizacion = datetime('now', 'localtime') WHERE id = NEW.id;
+        END
+        ''',
+    ],
+    4: [
+        '''
+        CREATE TABLE IF NOT EXISTS Ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_usuario INT NOT NULL,
+            fecha_venta TEXT DEFAULT (datetime('now', 'localtime')),
+            total DECIMAL(10, 2) NOT NULL,
+            metodo_pago VARCHAR(50) NOT NULL,
+            FOREIGN KEY (id_usuario) REFERENCES Usuarios(id)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON Ventas (fecha_venta)",
+        '''
+        CREATE TABLE IF NOT EXISTS DetalleVentas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_venta INT NOT NULL,
+            id_producto INT NOT NULL,
+            cantidad INT NOT NULL,
+            precio_unitario DECIMAL(10, 2) NOT NULL,
+            subtotal DECIMAL(10, 2) NOT NULL,
+            FOREIGN KEY (id_venta) REFERENCES Ventas(id),
+            FOREIGN KEY (id_producto) REFERENCES Productos(id)
+        )
+        ''',
+        # MySQL/InnoDB indexa solo las claves foráneas; SQLite no
+        "CREATE INDEX IF NOT EXISTS idx_detalleventas_venta ON DetalleVentas (id_venta)",
+        "CREATE INDEX IF NOT EXISTS idx_detalleventas_producto ON DetalleVentas (id_producto)",
+    ],
+    # Índice de texto completo FTS5, mantenido por triggers a partir de Productos
+    6: [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS ProductosBusqueda USING fts5(
+            nombre_producto, descripcion,
+            content='Productos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_productos_busqueda_alta AFTER INSERT ON Productos
+        BEGIN
+            INSERT INTO ProductosBusqueda (rowid, nombre_producto, descripcion)
+            VALUES (NEW.id, NEW.nombre_producto, NEW.descripcion);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_productos_busqueda_baja AFTER DELETE ON Productos
+        BEGIN
+            INSERT INTO ProductosBusqueda (ProductosBusqueda, rowid, nombre_producto, descripcion)
+            VALUES ('delete', OLD.id, OLD.nombre_producto, OLD.descripcion);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_productos_busqueda_cambio
+        AFTER UPDATE OF nombre_producto, descripcion ON Productos
+        BEGIN
+            INSERT INTO ProductosBusqueda (ProductosBusqueda, rowid, nombre_producto, descripcion)
+            VALUES ('delete', OLD.id, OLD.nombre_producto, OLD.descripcion);
+            INSERT INTO ProductosBusqueda (rowid, nombre_producto, descripcion)
+            VALUES (NEW.id, NEW.nombre_producto, NEW.descripcion);
+        END
+        ''',
+        "INSERT INTO ProductosBusqueda (ProductosBusqueda) VALUES ('rebuild')",
+    ],
+    8: [
+        "CREATE INDEX IF NOT EXISTS idx_categorias_actualizacion ON Categorias (ultima_actualizacion)",
+    ],
+    9: [
+        "CREATE INDEX IF NOT EXISTS idx_usuarios_actualizacion ON Usuarios (ultima_actualizacion)",
+    ],
+    # SQLite solo permite agregar columnas generadas VIRTUAL; el índice guarda el valor calculado
+    10: [
+        "ALTER TABLE Productos ADD COLUMN margen_stock INT GENERATED ALWAYS AS (stock_actual - stock_minimo) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS idx_productos_margen_stock ON Productos (activo, margen_stock)",
+    ],
+}
+
+def get_schema_version(db=None):
+    """Retorna la versión de esquema aplicada (0 si la base de datos está vacía)."""
+    db = db or get_db_connection()
+    row = db.fetch_one("SELECT MAX(version) AS version FROM schema_version")
+    return row['version'] if row and row['version'] is not None else 0
+
+_CREATE_INDEX = re.compile(r"^\s*CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)", re.IGNORECASE)
+_ADD_COLUMN = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(\w+)", re.IGNORECASE)
+
+def _already_applied(db, statement):
+    """
+    En MySQL, CREATE INDEX y ADD COLUMN no admiten IF NOT EXISTS: si una ejecución anterior
+    quedó a medias o otra terminal aplicó la migración al mismo tiempo, repetirlos falla
+    ("Duplicate key name" / "Duplicate column name"). Se consulta information_schema antes.
+    (Cada ALTER TABLE es atómico: si la columna existe, el índice que la acompaña también.)
+    """
+    if db.dialect != 'mysql':
+        return False # Las migraciones de SQLite usan IF NOT EXISTS
+    match = _CREATE_INDEX.match(statement)
+    if match:
+        index, table = match.groups()
+        row = db.fetch_one("""
+            SELECT COUNT(*) AS total FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (table, index))
+        return bool(row and row['total'])
+    match = _ADD_COLUMN.match(statement)
+    if match:
+        table, column = match.groups()
+        row = db.fetch_one("""
+            SELECT COUNT(*) AS total FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        return bool(row and row['total'])
+    return False
+
+def run_migrations(db=None):
+    """
+    Aplica, en orden, las migraciones que aún no figuran en la tabla schema_version.
+    Se llama una sola vez al iniciar la aplicación; los modelos ya no crean tablas.
+    Retorna True si el esquema quedó al día, False si alguna migración falló
+    (se detiene en ella para no aplicar las siguientes sobre un esquema incompleto).
+    """
+    db = db or get_db_connection()
+    created = db.execute_query('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            descripcion VARCHAR(255) NOT NULL,
+            fecha_aplicacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    if created is None:
+        print("Error: no se pudo verificar la tabla 'schema_version'.")
+        return False
+
+    applied = {row['version'] for row in db.fetch_all("SELECT version FROM schema_version")}
+    pending = [migration for migration in MIGRATIONS if migration[0] not in applied]
+    if not pending:
+        print(f"Esquema de base de datos al día (versión {MIGRATIONS[-1][0]}).")
+        return True
+
+    overrides = SQLITE_MIGRATIONS if db.dialect == 'sqlite' else {}
+    for version, description, statements in pending:
+        # Las sentencias DDL de MySQL se confirman solas, por eso no se agrupan en una transacción
+        for statement in overrides.get(version, statements):
+            if _already_applied(db, statement):
+                continue
+            if db.execute_query(statement) is None:
+                print(f"Error al aplicar la migración {version} ({description}). Se detiene la actualización del esquema.")
+                return False
+        # INSERT IGNORE por si otra terminal aplicó la misma migración al mismo tiempo
+        db.execute_query("INSERT IGNORE INTO schema_version (version, descripcion) VALUES (%s, %s)",
+                         (version, description))
+        print(f"Migración {version} aplicada: {description}.")
+    return True
@@ -0,0 +1,81 @@
+# app/database/mysql_connection.py
+
+import mysql.connector
+from mysql.connector import errorcode
+from config.db_config import DB_CONFIG
+from app.database.db_connection import DBConnection
+
+# Errores del cliente que indican que la conexión con el servidor se perdió
+CONNECTION_LOST_ERRNOS = {
+    errorcode.CR_SERVER_GONE_ERROR,    # 2006: MySQL server has gone away
+    errorcode.CR_SERVER_LOST,          # 2013: Lost connection to MySQL server during query
+    errorcode.CR_SERVER_LOST_EXTENDED, # 2055
+    errorcode.CR_CONN_HOST_ERROR,      # 2003: el servidor no responde al reconectar
+}
+
+class MySQLConnection(DBConnection):
+    """
+    Motor MySQL/MariaDB: varias terminales comparten un servidor en la red.
+    Es el dialecto nativo de los modelos, así que las sentencias no se traducen.
+    """
+    dialect = 'mysql'
+    Error = mysql.connector.Error
+
+    def _open_connection(self):
+        """Abre una conexión nueva a MySQL/MariaDB para el pool."""
+        return mysql.connector.connect(
+            host=DB_CONFIG['host'],
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            database=DB_CONFIG['database'],
+            port=DB_CONFIG['port'],
+            # Cada sentencia se confirma sola; así una lectura nunca deja abierta una
+            # transacción (y su snapshot) en una conexión que vuelve al pool.
+            autocommit=True
+        )
+
+    def _describe(self):
+        return f"'{DB_CONFIG['database']}'"
+
+    def _new_cursor(self, conn):
+        # buffered=True lee todo el resultado de una vez para poder devolver la conexión al pool
+        return conn.cursor(dictionary=True, buffered=True)
+
+    def _new_prepared_cursor(self, conn):
+        return conn.cursor(prepared=True) # Devuelve tuplas
+
+    def _statement_cursor(self, conn):
+        # conn.cursor() comprueba la conexión con un ping al servidor antes de crear el cursor:
+        # se crea uno solo por conexión del pool y se reutiliza en todas sus sentencias
+        cursor = getattr(conn, 'statement_cursor', None)
+        if cursor is None:
+            cursor = conn.statement_cursor = self._new_cursor(conn)
+        return cursor
+
+    def _release_cursor(self, conn, cursor, failed):
+        if failed:
+            # Tras un error el cursor puede quedar con resultados a medias: la próxima sentencia crea otro
+            conn.statement_cursor = None
+            self._close_cursor_quietly(cursor)
+
+    def _begin(self, conn):
+        conn.start_transaction()
+
+    def _ping(self, conn):
+        conn.ping(reconnect=False)
+
+    def _is_connection_lost(self, error):
+        errno = getattr(error, 'errno', None)
+        if errno in CONNECTION_LOST_ERRNOS:
+            return True
+        # cursor() y ping() lanzan OperationalError("MySQL Connection not available") sin
+        # código del servidor (errno -1) cuando el socket ya no sirve
+        return isinstance(error, mysql.connector.errors.OperationalError) and errno in (None, -1)
+
+    def estimate_row_count(self, table):
+        """Lee la estadística de information_schema: instantáneo pero aproximado."""
+        row = self.fetch_one("""
+            SELECT TABLE_ROWS AS total FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        return int(row['total']) if row and row['total'] is not None else 0
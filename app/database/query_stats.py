@@ -0,0 +1,169 @@
+# app/database/query_stats.py
+
+import bisect
+import logging
+import os
+import re
+import sys
+import threading
+from logging.handlers import RotatingFileHandler
+
+# Límites (ms) de los tramos del histograma de latencias; el último tramo es "más de 10 s"
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)")
+
+def normalize_sql(query):
+    """
+    Reduce una sentencia a su "forma": sin espacios repetidos, con los literales y las listas
+    de parámetros de largo variable reemplazados, para que las mismas consultas con distintos
+    valores (o distinto número de ids en un IN) se cuenten juntas.
+    """
+    sql = _WHITESPACE.sub(" ", query).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(...)", sql)
+
+def redact_params(params):
+    """Describe los parámetros sin mostrar sus valores (pueden ser contraseñas o datos de clientes)."""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: <{type(value).__name__}>" for key, value in params.items()) + "}"
+    return "(" + ", ".join(f"<{type(value).__name__}>" for value in params) + ")"
+
+def find_caller():
+    """Primer método de un modelo o controlador en la pila de llamadas (p. ej. 'ProductModel.get_product_by_id')."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename.replace("\\", "/")
+        if "/app/models/" in filename or "/app/controllers/" in filename:
+            name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+            owner = frame.f_locals.get('self')
+            if owner is not None and "." not in name:
+                name = f"{type(owner).__name__}.{name}"
+            return name
+        frame = frame.f_back
+    return "desconocido"
+
+class StatementStats:
+    """Acumulados de una sentencia normalizada."""
+    __slots__ = ('count', 'errors', 'rows', 'total_ms', 'max_ms', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def percentile(self, fraction):
+        """Percentil aproximado: límite superior del tramo del histograma donde cae."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min(LATENCY_BUCKETS_MS[index], self.max_ms) if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+class QueryStats:
+    """
+    Métricas por sentencia normalizada: número de ejecuciones, errores, filas devueltas o
+    afectadas e histograma de latencias (p50/p95/p99). Las sentencias que superan
+    `slow_query_ms` se escriben en un log rotativo con sus parámetros ocultos y el método
+    del modelo que las lanzó.
+    """
+    def __init__(self, slow_query_ms=200, log_file=None, max_bytes=1_000_000, backup_count=5):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._normalized = {} # Texto SQL original -> forma normalizada (las consultas se repiten mucho)
+        self._log_file = log_file
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._logger = None
+        self._logger_lock = threading.Lock()
+
+    def record(self, query, params, elapsed_ms, rows, error=None):
+        sql = self._normalized.get(query)
+        if sql is None:
+            if len(self._normalized) > 5000:
+                self._normalized.clear() # Consultas armadas con muchas variantes: se evita crecer sin límite
+            sql = self._normalized.setdefault(query, normalize_sql(query))
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            stats = self._stats.get(sql)
+            if stats is None:
+                stats = self._stats[sql] = StatementStats()
+            stats.count += 1
+            if error is not None:
+                stats.errors += 1
+            stats.rows += max(rows or 0, 0)
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.buckets[bucket] += 1
+        if self.slow_query_ms and elapsed_ms >= self.slow_query_ms:
+            self._log_slow(sql, params, elapsed_ms, rows, error)
+
+    def _log_slow(self, sql, params, elapsed_ms, rows, error):
+        logger = self._get_logger()
+        if logger is None:
+            return
+        status = f"ERROR {error}" if error is not None else f"{max(rows or 0, 0)} filas"
+        logger.warning("%.1f ms | %s | %s | %s | params=%s", elapsed_ms, find_caller(), status, sql, redact_params(params))
+
+    def _get_logger(self):
+        with self._logger_lock:
+            if self._logger is None and self._log_file:
+                self._open_log_locked()
+        return self._logger
+
+    def _open_log_locked(self):
+        try:
+            directory = os.path.dirname(self._log_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(self._log_file, maxBytes=self._max_bytes,
+                                          backupCount=self._backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger = logging.getLogger("pos.consultas_lentas")
+            logger.setLevel(logging.WARNING)
+            logger.propagate = False
+            logger.addHandler(handler)
+            self._logger = logger
+        except OSError as e:
+            print(f"No se pudo abrir el log de consultas lentas '{self._log_file}': {e}")
+            self._log_file = None
+
+    def snapshot(self):
+        """
+        Retorna una lista de diccionarios (una por sentencia), de mayor a menor tiempo total,
+        con count, errors, rows, total_ms, avg_ms, p50_ms, p95_ms, p99_ms y max_ms.
+        """
+        with self._lock:
+            items = list(self._stats.items())
+            report = [{
+                'sql': sql,
+                'count': stats.count,
+                'errors': stats.errors,
+                'rows': stats.rows,
+                'total_ms': stats.total_ms,
+                'avg_ms': stats.total_ms / stats.count if stats.count else 0.0,
+                'p50_ms': stats.percentile(0.50),
+                'p95_ms': stats.percentile(0.95),
+                'p99_ms': stats.percentile(0.99),
+                'max_ms': stats.max_ms,
+            } for sql, stats in items]
+        report.sort(key=lambda row: row['total_ms'], reverse=True)
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
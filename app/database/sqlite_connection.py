@@ -0,0 +1,120 @@
+# app/database/sqlite_connection.py
+
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+
+from config.db_config import SQLITE_CONFIG
+from app.database.db_connection import DBConnection
+
+# Los precios se guardan como DECIMAL(10, 2) y se leen como Decimal, igual que con MySQL
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", timespec="seconds"))
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()))
+
+# Reglas para pasar el SQL de los modelos (dialecto MySQL) a SQLite, en orden
+_TRANSLATIONS = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE), "INSERT OR IGNORE"),
+    (re.compile(r"\bCURDATE\(\)", re.IGNORECASE), "date('now', 'localtime')"),
+    # MySQL guarda las fechas en la hora local de la sesión; SQLite usaría UTC
+    (re.compile(r"\bCURRENT_TIMESTAMP\b", re.IGNORECASE), "(datetime('now', 'localtime'))"),
+    (re.compile(r"\?\s*\+\s*INTERVAL\s+(\d+)\s+DAY\b", re.IGNORECASE), r"datetime(?, '+\1 day')"),
+    # Las transacciones empiezan con BEGIN IMMEDIATE: ya tienen el bloqueo de escritura
+    (re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE), ""),
+    (re.compile(r"\bANALYZE\s+TABLE\b", re.IGNORECASE), "ANALYZE"),
+]
+_ON_DUPLICATE_KEY = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+
+def translate_sql(query):
+    """Traduce una sentencia del dialecto MySQL de los modelos a SQLite."""
+    for pattern, replacement in _TRANSLATIONS:
+        query = pattern.sub(replacement, query)
+    parts = _ON_DUPLICATE_KEY.split(query, maxsplit=1)
+    if len(parts) == 2:
+        # "ON DUPLICATE KEY UPDATE x = x + VALUES(x)" -> "ON CONFLICT DO UPDATE SET x = x + excluded.x"
+        query = parts[0] + "ON CONFLICT DO UPDATE SET" + _VALUES_FUNCTION.sub(r"excluded.\1", parts[1])
+    return query
+
+def _dict_row(cursor, row):
+    return dict(zip([column[0] for column in cursor.description], row))
+
+class SQLiteConnection(DBConnection):
+    """
+    Motor SQLite embebido, para tiendas de una sola caja: la base de datos es un archivo
+    local y cada consulta se resuelve dentro del proceso, sin servidor ni red.
+    Usa el modo WAL, en el que las lecturas no esperan a las escrituras, así que el pool
+    puede tener varias conexiones lectoras mientras una transacción escribe.
+    """
+    dialect = 'sqlite'
+    Error = sqlite3.Error
+
+    def __init__(self):
+        if not hasattr(self, '_translated'):
+            self._translated = {} # SQL original -> SQL traducido (las consultas se repiten mucho)
+
+    def _open_connection(self):
+        """Abre una conexión al archivo (lo crea si no existe) con la configuración de rendimiento."""
+        path = SQLITE_CONFIG['path']
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            path,
+            timeout=SQLITE_CONFIG['busy_timeout_ms'] / 1000,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None, # Autocommit: las transacciones se abren explícitamente con _begin
+            check_same_thread=False, # El pool pasa la conexión entre hilos, nunca a dos a la vez
+            cached_statements=self.STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = _dict_row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {SQLITE_CONFIG['synchronous']}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA cache_size = -{int(SQLITE_CONFIG['cache_size_kb'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(SQLITE_CONFIG['mmap_size'])}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _describe(self):
+        return f"SQLite '{SQLITE_CONFIG['path']}'"
+
+    def _start_keepalive(self, pool):
+        """Un archivo local no cierra conexiones inactivas: no hace falta keepalive."""
+
+    def _new_cursor(self, conn):
+        return conn.cursor()
+
+    def _new_prepared_cursor(self, conn):
+        return conn.cursor()
+
+    @contextmanager
+    def _prepared_cursor(self, query):
+        # sqlite3 ya guarda compiladas las últimas sentencias de cada conexión (cached_statements)
+        with self._cursor() as (conn, cursor):
+            yield conn, cursor
+
+    def _begin(self, conn):
+        # IMMEDIATE toma el bloqueo de escritura al empezar: hace las veces de SELECT ... FOR UPDATE
+        conn.execute("BEGIN IMMEDIATE")
+
+    def _ping(self, conn):
+        conn.execute("SELECT 1")
+
+    def translate(self, query):
+        sql = self._translated.get(query)
+        if sql is None:
+            if len(self._translated) > 5000:
+                self._translated.clear() # Consultas armadas con muchas variantes: se evita crecer sin límite
+            sql = self._translated.setdefault(query, translate_sql(query))
+        return sql
+
+    def estimate_row_count(self, table):
+        """En SQLite COUNT(*) recorre el índice más pequeño de la tabla, en el mismo proceso."""
+        row = self.fetch_one(f"SELECT COUNT(*) AS total FROM {table}")
+        return int(row['total']) if row and row['total'] is not None else 0
@@ -0,0 +1,163 @@
+# app/database/write_journal.py
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from config.db_config import JOURNAL_CONFIG
+
+class WriteJournal:
+    """
+    Diario local de escrituras que no pudieron llegar a la base de datos (servidor caído o
+    red cortada). Cada operación es una línea JSON con su clave de idempotencia, su tipo
+    ('venta', 'ajuste_stock'...) y sus datos; el archivo solo crece por el final.
+
+    append() no retorna hasta que la línea está en disco (fsync), pero los fsync se agrupan:
+    si varios hilos escriben a la vez, un solo fsync confirma todas las líneas escritas
+    hasta ese momento ("group commit").
+
+    Para reproducirlo, take_pending() aparta el diario a un archivo ".reproduciendo" (las
+    escrituras nuevas siguen en un diario vacío) y finish_replay() lo borra cuando todo se aplicó.
+    Si la reproducción se corta, el archivo apartado se vuelve a leer completo la próxima vez:
+    las claves de idempotencia evitan aplicar dos veces lo que ya se había confirmado.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.replay_path = path + ".reproduciendo"
+        self.rejected_path = path + ".rechazados"
+        self._lock = threading.Lock()            # Escritura y rotación del archivo
+        self._sync_cond = threading.Condition()  # Coordinación de los fsync agrupados
+        self._file = None
+        self._written = 0   # Número de la última línea escrita
+        self._synced = 0    # Número de la última línea que ya está en disco
+        self._syncing = False
+        self._fsyncs = 0
+        self._replay_lines = 0
+        self._pending = self._count_lines(self.path) + self._count_lines(self.replay_path)
+
+    @staticmethod
+    def _count_lines(path):
+        try:
+            with open(path, "rb") as f:
+                return sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            return 0
+
+    def _open_locked(self):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def append(self, kind, data, key):
+        """
+        Agrega una operación y espera a que esté en disco. Lanza OSError si no se pudo guardar
+        (el llamador debe tratar la operación como perdida y avisar).
+        """
+        entry = {
+            'clave': key,
+            'tipo': kind,
+            'fecha': datetime.now().isoformat(" ", timespec="seconds"),
+            'datos': data,
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            f = self._open_locked()
+            f.write(line)
+            f.flush()
+            self._written += 1
+            self._pending += 1
+            sequence = self._written
+        self._sync(sequence)
+
+    def _sync(self, sequence):
+        with self._sync_cond:
+            # Si otro hilo está haciendo fsync, se espera: puede que ya cubra esta línea
+            while self._synced < sequence and self._syncing:
+                self._sync_cond.wait()
+            if self._synced >= sequence:
+                return
+            self._syncing = True
+        target = sequence
+        try:
+            with self._lock:
+                target = self._written
+                # Se sincroniza un duplicado del descriptor para no bloquear a quienes escriben
+                fd = os.dup(self._file.fileno()) if self._file is not None else None
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self._fsyncs += 1
+        finally:
+            with self._sync_cond:
+                self._syncing = False
+                self._synced = max(self._synced, target)
+                self._sync_cond.notify_all()
+
+    def pending_count(self):
+        """Operaciones guardadas que aún no se aplicaron en la base de datos."""
+        return self._pending
+
+    def take_pending(self):
+        """
+        Retorna la lista de operaciones a reproducir. Si quedó una reproducción a medias se
+        retoma esa; si no, se aparta el diario actual. Una última línea incompleta (corte de
+        luz mientras se escribía) se ignora: esa operación nunca llegó a confirmarse.
+        """
+        with self._lock:
+            if not os.path.exists(self.replay_path):
+                if self._file is not None:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._file.close()
+                    self._file = None
+                if not os.path.exists(self.path):
+                    return []
+                os.replace(self.path, self.replay_path)
+        entries = []
+        self._replay_lines = 0
+        with open(self.replay_path, encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                self._replay_lines += 1
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"Diario sin conexión: se ignora la línea {number} incompleta de '{self.replay_path}'.")
+        return entries
+
+    def finish_replay(self):
+        """Borra el diario apartado una vez que todas sus operaciones se aplicaron o rechazaron."""
+        with self._lock:
+            if os.path.exists(self.replay_path):
+                os.remove(self.replay_path)
+            self._pending = max(0, self._pending - self._replay_lines)
+            self._replay_lines = 0
+
+    def reject(self, entry, error):
+        """Aparta una operación que la base de datos rechaza (no por falta de conexión) para revisarla a mano."""
+        record = dict(entry, error=str(error))
+        with self._lock:
+            with open(self.rejected_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def stats(self):
+        return {
+            'pendientes': self._pending,
+            'escritas': self._written,
+            'fsyncs': self._fsyncs,
+        }
+
+# Instancia global compartida por todos los controladores
+_write_journal = WriteJournal(JOURNAL_CONFIG['path'])
+
+def get_write_journal():
+    return _write_journal
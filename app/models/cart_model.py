@@ -0,0 +1,65 @@
+# app/models/cart_model.py
+
+from decimal import Decimal
+
+class CartModel:
+    """
+    Carrito de compra en memoria para la venta en curso.
+    Escanear varias veces el mismo código de barras suma cantidad a una única línea.
+    No toca la base de datos: la venta se guarda al cobrar (ver SaleController.checkout).
+    """
+    def __init__(self):
+        self._lines = {} # codigo_barras -> línea (los dict conservan el orden de escaneo)
+
+    def add_product(self, product, quantity=1):
+        """
+        Añade un producto (diccionario de ProductModel) al carrito o suma a su línea existente.
+        Retorna la línea resultante.
+        """
+        barcode = product['codigo_barras']
+        line = self._lines.get(barcode)
+        if line is None:
+            line = {
+                'id_producto': product['id'],
+                'codigo_barras': barcode,
+                'nombre_producto': product['nombre_producto'],
+                'precio_unitario': Decimal(str(product['precio_venta'])),
+                'cantidad': 0,
+            }
+            self._lines[barcode] = line
+        line['cantidad'] += quantity
+        line['subtotal'] = line['precio_unitario'] * line['cantidad']
+        return line
+
+    def set_quantity(self, barcode, quantity):
+        """Cambia la cantidad de una línea; con cantidad <= 0 la línea se elimina."""
+        line = self._lines.get(barcode)
+        if line is None:
+            return False
+        if quantity <= 0:
+            del self._lines[barcode]
+        else:
+            line['cantidad'] = quantity
+            line['subtotal'] = line['precio_unitario'] * quantity
+        return True
+
+    def remove_line(self, barcode):
+        """Quita una línea del carrito."""
+        return self._lines.pop(barcode, None) is not None
+
+    def get_quantity(self, barcode):
+        line = self._lines.get(barcode)
+        return line['cantidad'] if line else 0
+
+    def get_lines(self):
+        """Retorna una copia de las líneas en el orden en que se escanearon."""
+        return [dict(line) for line in self._lines.values()]
+
+    def get_total(self):
+        return sum((line['subtotal'] for line in self._lines.values()), Decimal("0.00"))
+
+    def is_empty(self):
+        return not self._lines
+
+    def clear(self):
+        self._lines.clear()
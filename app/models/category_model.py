@@ -1,66 +1,234 @@
 # app/models/category_model.py
 
-import mysql.connector 
+import threading
 from app.database.db_connection import get_db_connection
+from app.models.product_cache import get_barcode_cache
+
+class CategoryDirectory:
+    """
+    Directorio en memoria de categorías (id <-> nombre), compartido por todas las
+    instancias de CategoryModel. La tabla es pequeña, así que se carga completa una vez
+    y luego las búsquedas no necesitan ir a la base de datos.
+    Los nombres se comparan sin distinguir mayúsculas, igual que la collation de MySQL.
+    """
+    def __init__(self):
+        self._by_id = {}
+        self._id_by_name = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.high_water = None # Mayor ultima_actualizacion vista, para sincronizar solo los cambios
+
+    def load(self, categories, high_water=None):
+        with self._lock:
+            self._by_id = {cat['id']: dict(cat) for cat in categories}
+            self._id_by_name = {cat['nombre_categoria'].casefold(): cat['id'] for cat in categories}
+            self.high_water = high_water
+            self.loaded = True
+
+    def apply_changes(self, categories, high_water):
+        """Aplica categorías nuevas o modificadas en otras terminales."""
+        with self._lock:
+            for category in categories:
+                self._remove_locked(category['id'])
+                self._by_id[category['id']] = dict(category)
+                self._id_by_name[category['nombre_categoria'].casefold()] = category['id']
+            if high_water is not None and (self.high_water is None or high_water > self.high_water):
+                self.high_water = high_water
+
+    def size(self):
+        with self._lock:
+            return len(self._by_id)
+
+    def invalidate(self):
+        """Fuerza una recarga completa en el próximo acceso."""
+        with self._lock:
+            self.loaded = False
+
+    def get_by_id(self, category_id):
+        with self._lock:
+            category = self._by_id.get(category_id)
+            return dict(category) if category else None
+
+    def get_by_name(self, name):
+        with self._lock:
+            category_id = self._id_by_name.get(name.casefold())
+            return dict(self._by_id[category_id]) if category_id is not None else None
+
+    def get_all(self):
+        with self._lock:
+            return [dict(self._by_id[category_id]) for category_id in sorted(self._by_id)]
+
+    def put(self, category):
+        with self._lock:
+            self._remove_locked(category['id'])
+            self._by_id[category['id']] = dict(category)
+            self._id_by_name[category['nombre_categoria'].casefold()] = category['id']
+
+    def remove(self, category_id):
+        with self._lock:
+            self._remove_locked(category_id)
+
+    def _remove_locked(self, category_id):
+        old = self._by_id.pop(category_id, None)
+        if old is not None:
+            self._id_by_name.pop(old['nombre_categoria'].casefold(), None)
+
+# Instancia global compartida por todos los CategoryModel
+_category_directory = CategoryDirectory()
 
 class CategoryModel:
     """
     Gestiona las operaciones de base de datos relacionadas con las categorías.
+    Las lecturas se resuelven con el directorio en memoria; las escrituras de este
+    modelo lo mantienen coherente y sync_categories() trae los cambios hechos desde otras
+    terminales.
     """
     def __init__(self):
         self.db = get_db_connection()
-        # === MEJORA: La conexión se establece una vez al inicio de la app, no aquí. ===
-        self.db.connect() 
-        self._create_category_table()
-
-    def _create_category_table(self):
-        """Crea la tabla de categorías si no existe (para MySQL/MariaDB)."""
-        # === MEJORA: No se necesita conectar/desconectar aquí, se asume conexión activa. ===
-        try:
-            query = '''
-                CREATE TABLE IF NOT EXISTS Categorias (
-                    id INT PRIMARY KEY AUTO_INCREMENT, 
-                    nombre_categoria VARCHAR(255) UNIQUE NOT NULL,
-                    descripcion TEXT
-                )
-            '''
-            self.db.execute_query(query)
-            print("Tabla 'Categorias' verificada/creada.")
-        except Exception as e:
-            print(f"Error al verificar/crear tabla 'Categorias': {e}")
+        self.directory = _category_directory
+
+    def refresh_categories(self):
+        """
+        Recarga el directorio en memoria desde la base de datos (p. ej. para ver
+        categorías creadas o editadas desde otra terminal). Retorna cuántas hay.
+        """
+        results, high_water = self.get_categories_changed_since(None)
+        self.directory.load(results, high_water)
+        return len(results)
+
+    def get_categories_changed_since(self, ts=None):
+        """
+        Sincronización incremental: retorna (categorías, marca_de_agua) con las categorías
+        creadas o modificadas desde `ts` (todas si ts=None). Las categorías se borran con DELETE,
+        así que las bajas no aparecen aquí: sync_categories() las detecta comparando el total.
+        """
+        query = "SELECT id, nombre_categoria, descripcion, ultima_actualizacion FROM Categorias"
+        if ts is None:
+            changed = self.db.fetch_all(query)
+        else:
+            changed = self.db.fetch_all(query + " WHERE ultima_actualizacion >= %s", (ts,))
+        changed = changed if changed else []
+        high_water = max((row['ultima_actualizacion'] for row in changed), default=ts)
+        for row in changed:
+            del row['ultima_actualizacion']
+        return changed, high_water
+
+    def sync_categories(self):
+        """
+        Actualiza el directorio en memoria trayendo solo las categorías modificadas desde la
+        última sincronización. Si el total de filas no coincide (hubo borrados) se recarga entero.
+        Retorna cuántas categorías se leyeron.
+        """
+        if not self.directory.loaded or self.directory.high_water is None:
+            return self.refresh_categories()
+        changed, high_water = self.get_categories_changed_since(self.directory.high_water)
+        self.directory.apply_changes(changed, high_water)
+        row = self.db.fetch_one("SELECT COUNT(*) AS total FROM Categorias")
+        if row and row['total'] != self.directory.size():
+            return self.refresh_categories()
+        return len(changed)
+
+    def _directory_ready(self):
+        """
+        Indica si se puede responder desde el directorio. Dentro de una transacción se va
+        a la base de datos para ver también las filas aún no confirmadas.
+        """
+        if self.db.in_transaction():
+            return False
+        if not self.directory.loaded:
+            self.refresh_categories()
+        return self.directory.loaded
 
     def create_category(self, name, description=""):
         """Crea una nueva categoría."""
         query = "INSERT INTO Categorias (nombre_categoria, descripcion) VALUES (%s, %s)"
         params = (name, description)
-        rows_affected = self.db.execute_query(query, params)
-        return rows_affected == 1
+        category_id = self.db.execute_insert(query, params)
+        if category_id:
+            self.db.after_commit(lambda: self.directory.put(
+                {'id': category_id, 'nombre_categoria': name, 'descripcion': description}))
+        return bool(category_id)
 
     def get_all_categories(self):
         """Obtiene todas las categorías."""
+        if self._directory_ready():
+            return self.directory.get_all()
         query = "SELECT id, nombre_categoria, descripcion FROM Categorias"
         results = self.db.fetch_all(query) 
         return results if results else []
 
     def get_category_by_id(self, category_id):
         """Busca una categoría por su ID."""
+        if self._directory_ready():
+            category = self.directory.get_by_id(int(category_id))
+            if category:
+                return category
         query = "SELECT id, nombre_categoria, descripcion FROM Categorias WHERE id = %s"
         params = (category_id,)
         result = self.db.fetch_one(query, params) 
+        if result and not self.db.in_transaction():
+            self.directory.put(result) # Creada desde otra terminal
         return result
 
     def get_category_by_name(self, category_name):
         """Busca una categoría por su nombre."""
+        if self._directory_ready():
+            category = self.directory.get_by_name(category_name)
+            if category:
+                return category
         query = "SELECT id, nombre_categoria, descripcion FROM Categorias WHERE nombre_categoria = %s"
         params = (category_name,)
         result = self.db.fetch_one(query, params) 
+        if result and not self.db.in_transaction():
+            self.directory.put(result) # Creada desde otra terminal
         return result
 
+    def get_categories_by_names(self, category_names):
+        """
+        Busca varias categorías por nombre. Las que están en el directorio no consultan
+        la base de datos; el resto se busca en una sola consulta.
+        Retorna una lista con las categorías encontradas.
+        """
+        names = list(category_names)
+        found = []
+        if self._directory_ready():
+            missing = []
+            for name in names:
+                category = self.directory.get_by_name(name)
+                if category:
+                    found.append(category)
+                else:
+                    missing.append(name)
+            names = missing
+        if not names:
+            return found
+        placeholders = ", ".join(["%s"] * len(names))
+        query = f"SELECT id, nombre_categoria, descripcion FROM Categorias WHERE nombre_categoria IN ({placeholders})"
+        results = self.db.fetch_all(query, tuple(names))
+        return found + (results if results else [])
+
+    def create_categories(self, category_names):
+        """
+        Crea varias categorías (sin descripción) con un único INSERT multi-fila.
+        Las que ya existen se ignoran. Retorna el número de categorías creadas.
+        """
+        query = "INSERT IGNORE INTO Categorias (nombre_categoria, descripcion) VALUES (%s, %s)"
+        rows_affected = self.db.execute_many(query, [(name, "") for name in category_names])
+        if rows_affected:
+            # El INSERT multi-fila no devuelve los ids: el directorio se recarga en el próximo acceso
+            self.db.after_commit(self.directory.invalidate)
+        return rows_affected or 0
+
     def update_category(self, category_id, new_name, new_description):
         """Actualiza una categoría existente."""
         query = "UPDATE Categorias SET nombre_categoria = %s, descripcion = %s WHERE id = %s"
         params = (new_name, new_description, category_id)
         rows_affected = self.db.execute_query(query, params)
+        if rows_affected == 1:
+            self.db.after_commit(lambda: self.directory.put(
+                {'id': int(category_id), 'nombre_categoria': new_name, 'descripcion': new_description}))
+            # Los productos en caché llevan el nombre de su categoría: se descartan para recargarlos
+            self.db.after_commit(lambda: get_barcode_cache().invalidate_category(int(category_id)))
         return rows_affected == 1
 
     def delete_category(self, category_id):
@@ -70,4 +238,6 @@ class CategoryModel:
         query = "DELETE FROM Categorias WHERE id = %s"
         params = (category_id,)
         rows_affected = self.db.execute_query(query, params)
-        return rows_affected == 1
\ No newline at end of file
+        if rows_affected == 1:
+            self.db.after_commit(lambda: self.directory.remove(int(category_id)))
+        return rows_affected == 1
@@ -0,0 +1,32 @@
+# app/models/operation_model.py
+
+from app.database.db_connection import get_db_connection
+
+class OperationModel:
+    """
+    Registro de las claves de idempotencia de las operaciones ya aplicadas (ventas, ajustes
+    de stock). Cada operación guarda su clave en la misma transacción que sus cambios, así
+    que al reproducir el diario sin conexión se sabe con certeza cuáles ya llegaron.
+    """
+    def __init__(self):
+        self.db = get_db_connection()
+
+    def mark_applied(self, operations):
+        """
+        Registra las claves de `operations` (pares (clave, tipo)). Debe llamarse dentro de la
+        transacción de la operación: si la clave ya existe, el INSERT falla y todo se revierte.
+        """
+        query = "INSERT INTO OperacionesAplicadas (clave, tipo) VALUES (%s, %s)"
+        return self.db.execute_many(query, list(operations))
+
+    def get_applied_keys(self, keys, chunk_size=500):
+        """Retorna el conjunto de claves de `keys` que ya fueron aplicadas."""
+        keys = list(keys)
+        applied = set()
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            rows = self.db.fetch_all(f"SELECT clave FROM OperacionesAplicadas WHERE clave IN ({placeholders})",
+                                     tuple(chunk))
+            applied.update(row['clave'] for row in rows)
+        return applied
@@ -0,0 +1,118 @@
+# app/models/product_cache.py
+
+import threading
+from collections import OrderedDict
+from config.db_config import CACHE_CONFIG
+
+class BarcodeCache:
+    """
+    Caché en memoria código de barras -> producto para el escaneo en caja.
+    Tamaño acotado con desalojo LRU (se descarta el producto usado hace más tiempo).
+    Es compartida por todas las instancias de ProductModel y segura entre hilos.
+    Los datos que entrega son copias, así que quien los reciba puede modificarlos libremente.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._by_barcode = OrderedDict() # codigo_barras -> producto, de menos a más reciente
+        self._barcode_by_id = {}         # id -> codigo_barras, para invalidar por id
+        self._lock = threading.Lock()
+        self.high_water = None           # Mayor ultima_actualizacion ya reflejada en la caché
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, barcode):
+        with self._lock:
+            product = self._by_barcode.get(barcode)
+            if product is None:
+                self.misses += 1
+                return None
+            self._by_barcode.move_to_end(barcode)
+            self.hits += 1
+            return dict(product)
+
+    def put(self, product):
+        with self._lock:
+            self._put_locked(product)
+
+    def preload(self, products, high_water):
+        """Carga inicial: reemplaza el contenido por `products` y fija la marca de agua."""
+        with self._lock:
+            self._by_barcode.clear()
+            self._barcode_by_id.clear()
+            for product in products:
+                self._put_locked(product)
+            self.high_water = high_water
+
+    def apply_changes(self, products, high_water):
+        """
+        Aplica productos modificados (por esta u otras terminales) que ya estén en caché.
+        Los que no están en caché se ignoran: se cargarán cuando alguien los escanee.
+        """
+        with self._lock:
+            for product in products:
+                if product['id'] in self._barcode_by_id or product['codigo_barras'] in self._by_barcode:
+                    self._remove_id_locked(product['id'])
+                    self._by_barcode.pop(product['codigo_barras'], None)
+                    self._put_locked(product)
+            if high_water is not None and (self.high_water is None or high_water > self.high_water):
+                self.high_water = high_water
+
+    def adjust_stock(self, product_id, delta):
+        """Actualiza en sitio el stock de un producto en caché tras una venta o devolución."""
+        with self._lock:
+            barcode = self._barcode_by_id.get(product_id)
+            if barcode is not None:
+                self._by_barcode[barcode]['stock_actual'] += delta
+
+    def invalidate_ids(self, product_ids):
+        with self._lock:
+            for product_id in product_ids:
+                self._remove_id_locked(product_id)
+
+    def invalidate_category(self, category_id):
+        """Descarta los productos de una categoría (p. ej. si la categoría cambió de nombre)."""
+        with self._lock:
+            for product_id in [p['id'] for p in self._by_barcode.values() if p.get('id_categoria') == category_id]:
+                self._remove_id_locked(product_id)
+
+    def clear(self):
+        with self._lock:
+            self._by_barcode.clear()
+            self._barcode_by_id.clear()
+            self.high_water = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._by_barcode),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'high_water': self.high_water,
+            }
+
+    def _put_locked(self, product):
+        barcode = product['codigo_barras']
+        self._remove_id_locked(product['id'])
+        self._by_barcode[barcode] = dict(product)
+        self._by_barcode.move_to_end(barcode)
+        self._barcode_by_id[product['id']] = barcode
+        while len(self._by_barcode) > self.max_size:
+            _, evicted = self._by_barcode.popitem(last=False)
+            self._barcode_by_id.pop(evicted['id'], None)
+            self.evictions += 1
+
+    def _remove_id_locked(self, product_id):
+        barcode = self._barcode_by_id.pop(product_id, None)
+        if barcode is not None:
+            self._by_barcode.pop(barcode, None)
+
+# Instancia global compartida por todos los ProductModel
+_barcode_cache = BarcodeCache(CACHE_CONFIG['barcode_cache_size'])
+
+def get_barcode_cache():
+    return _barcode_cache
@@ -0,0 +1,204 @@
+# app/models/product_index.py
+
+import re
+import sys
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+
+_WORD = re.compile(r"\w+")
+
+def normalize_text(text):
+    """Pasa el texto a minúsculas y sin tildes ("Café Ñandú" -> "cafe nandu")."""
+    text = text or ""
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize('NFKD', text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+class ProductPrefixIndex:
+    """
+    Índice en memoria para autocompletar productos en caja sin ir a la base de datos.
+
+    Guarda cada producto en una posición ("slot") de arreglos paralelos en lugar de un
+    diccionario por fila, y una lista ordenada de claves (cada palabra normalizada del nombre
+    y el código de barras) con el slot al que pertenecen. Una búsqueda por prefijo es un
+    bisect sobre esa lista. Las claves se internan porque las palabras se repiten mucho
+    entre productos.
+    """
+    # Candidatos que se comprueban por sus palabras antes de pasar a intersección por slots
+    WORD_CHECKS_BEFORE_SETS = 2000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear_locked()
+        self.high_water = None # Mayor ultima_actualizacion vista, para pedir solo los cambios
+
+    def _clear_locked(self):
+        self._slot_by_id = {}
+        self._ids = array('q')
+        self._barcodes = []
+        self._names = []
+        self._prices = array('q') # En céntimos
+        self._active = bytearray()
+        self._words = [] # Claves normalizadas de cada slot, calculadas una vez (no en cada búsqueda)
+        self._keys = []
+        self._key_slots = array('l')
+        self.loaded = False
+
+    @staticmethod
+    def _keys_for(name, barcode):
+        keys = {sys.intern(word) for word in _WORD.findall(normalize_text(name))}
+        keys.add(normalize_text(barcode))
+        return tuple(keys)
+
+    def build(self, products, high_water):
+        """Reconstruye el índice completo a partir de una lista de productos."""
+        new = ProductPrefixIndex()
+        pairs = []
+        for product in products:
+            slot = new._append_slot(product)
+            pairs.extend((key, slot) for key in new._words[slot])
+        pairs.sort()
+        new._keys = [key for key, _ in pairs]
+        new._key_slots = array('l', (slot for _, slot in pairs))
+        with self._lock:
+            self._slot_by_id, self._ids, self._barcodes = new._slot_by_id, new._ids, new._barcodes
+            self._names, self._prices = new._names, new._prices
+            self._active, self._words = new._active, new._words
+            self._keys, self._key_slots = new._keys, new._key_slots
+            self.high_water = high_water
+            self.loaded = True
+
+    def apply_changes(self, products, high_water):
+        """
+        Aplica productos nuevos o modificados (también los desactivados, que quedan marcados
+        como inactivos). Solo se tocan las claves de esos productos.
+        """
+        with self._lock:
+            for product in products:
+                slot = self._slot_by_id.get(product['id'])
+                if slot is None:
+                    slot = self._append_slot(product)
+                else:
+                    for key in self._words[slot]:
+                        self._remove_key_locked(key, slot)
+                    self._set_slot(slot, product)
+                for key in self._words[slot]:
+                    position = bisect_right(self._keys, key)
+                    self._keys.insert(position, key)
+                    self._key_slots.insert(position, slot)
+            if high_water is not None and (self.high_water is None or high_water > self.high_water):
+                self.high_water = high_water
+
+    def _append_slot(self, product):
+        slot = len(self._ids)
+        self._slot_by_id[product['id']] = slot
+        self._ids.append(product['id'])
+        self._barcodes.append("")
+        self._names.append("")
+        self._prices.append(0)
+        self._active.append(0)
+        self._words.append(())
+        self._set_slot(slot, product)
+        return slot
+
+    def _set_slot(self, slot, product):
+        self._barcodes[slot] = product['codigo_barras']
+        self._names[slot] = product['nombre_producto']
+        self._prices[slot] = int(Decimal(product['precio_venta']) * 100)
+        self._active[slot] = 1 if product['activo'] else 0
+        self._words[slot] = self._keys_for(product['nombre_producto'], product['codigo_barras'])
+
+    def _remove_key_locked(self, key, slot):
+        for position in range(bisect_left(self._keys, key), bisect_right(self._keys, key)):
+            if self._key_slots[position] == slot:
+                del self._keys[position]
+                del self._key_slots[position]
+                return
+
+    def search(self, text, limit=10, active_only=True):
+        """
+        Busca productos cuyo código o alguna palabra del nombre empiece por cada una de las
+        palabras de `text` (sin distinguir mayúsculas ni tildes). Retorna hasta `limit`
+        diccionarios con id, codigo_barras, nombre_producto, precio_venta y activo.
+        """
+        tokens = _WORD.findall(normalize_text(text))
+        if not tokens:
+            return []
+        with self._lock:
+            # Se recorre el rango de la palabra más selectiva y se comprueban las demás en las palabras del slot
+            ranges = []
+            for token in tokens:
+                lo = bisect_left(self._keys, token)
+                hi = bisect_left(self._keys, token + "\U0010ffff", lo)
+                if lo == hi:
+                    return []
+                ranges.append((hi - lo, lo, hi, token))
+            ranges.sort()
+            _, lo, hi, _ = ranges[0]
+            others = [token for _, _, _, token in ranges[1:]]
+
+            results = []
+            seen = set()
+            for position in range(lo, hi):
+                slot = self._key_slots[position]
+                if slot in seen or (active_only and not self._active[slot]):
+                    continue
+                if others and len(seen) >= self.WORD_CHECKS_BEFORE_SETS:
+                    # Palabras frecuentes que casi no coinciden entre sí: el resto del rango se
+                    # resuelve intersecando los slots de cada palabra en lugar de revisarlos uno a uno
+                    self._intersect_rest_locked(ranges, position, hi, seen, results, limit, active_only)
+                    break
+                seen.add(slot)
+                if others:
+                    words = self._words[slot]
+                    if not all(any(word.startswith(token) for word in words) for token in others):
+                        continue
+                results.append(self._row_locked(slot))
+                if len(results) == limit:
+                    break
+            return results
+
+    def _intersect_rest_locked(self, ranges, position, hi, seen, results, limit, active_only):
+        matches = set(self._key_slots[position:hi])
+        for _, other_lo, other_hi, _ in ranges[1:]:
+            matches.intersection_update(self._key_slots[other_lo:other_hi])
+        matches -= seen
+        for slot in sorted(matches):
+            if active_only and not self._active[slot]:
+                continue
+            results.append(self._row_locked(slot))
+            if len(results) == limit:
+                return
+
+    def _row_locked(self, slot):
+        return {
+            'id': self._ids[slot],
+            'codigo_barras': self._barcodes[slot],
+            'nombre_producto': self._names[slot],
+            'precio_venta': Decimal(self._prices[slot]).scaleb(-2),
+            'activo': bool(self._active[slot]),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+            self.high_water = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'products': len(self._ids),
+                'keys': len(self._keys),
+                'loaded': self.loaded,
+                'high_water': self.high_water,
+            }
+
+# Instancia global compartida por todos los ProductModel
+_product_index = ProductPrefixIndex()
+
+def get_product_index():
+    return _product_index
@@ -1,7 +1,15 @@
 # app/models/product_model.py
 
-import mysql.connector 
+import re
 from app.database.db_connection import get_db_connection
+from app.models.product_cache import get_barcode_cache
+from app.models.product_index import get_product_index
+
+class InsufficientStockError(Exception):
+    """Se lanza para revertir un descuento de stock en bloque cuando algún producto no alcanza."""
+    def __init__(self, product_ids):
+        super().__init__(f"Stock insuficiente para los productos: {product_ids}")
+        self.product_ids = product_ids
 
 class ProductModel:
     """
@@ -9,36 +17,8 @@ class ProductModel:
     """
     def __init__(self):
         self.db = get_db_connection()
-        # === MEJORA: La conexión se establece una vez al inicio de la app, no aquí. ===
-        self.db.connect()
-        self._create_product_table() 
-
-    def _create_product_table(self):
-        """Crea la tabla de productos si no existe (para MySQL/MariaDB)."""
-        # === MEJORA: No se necesita conectar/desconectar aquí, se asume conexión activa. ===
-        try:
-            query = '''
-                CREATE TABLE IF NOT EXISTS Productos (
-                    id INT PRIMARY KEY AUTO_INCREMENT, 
-                    codigo_barras VARCHAR(255) UNIQUE NOT NULL, 
-                    nombre_producto VARCHAR(255) NOT NULL,
-                    descripcion TEXT,
-                    id_categoria INT NOT NULL,
-                    precio_venta DECIMAL(10, 2) NOT NULL, 
-                    costo_unitario DECIMAL(10, 2) NOT NULL,
-                    stock_actual INT NOT NULL,
-                    stock_minimo INT NOT NULL,
-                    unidad_medida VARCHAR(50) NOT NULL,
-                    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
-                    ultima_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    activo BOOLEAN DEFAULT TRUE, 
-                    FOREIGN KEY (id_categoria) REFERENCES Categorias(id)
-                )
-            '''
-            self.db.execute_query(query)
-            print("Tabla 'Productos' verificada/creada.")
-        except Exception as e:
-            print(f"Error al verificar/crear tabla 'Productos': {e}")
+        self.barcode_cache = get_barcode_cache() # Compartida por todas las instancias
+        self.product_index = get_product_index() # Índice para autocompletar, también compartido
 
     def create_product(self, barcode, name, description, id_category, price, cost, stock, min_stock, unit):
         """
@@ -55,6 +35,32 @@ class ProductModel:
         rows_affected = self.db.execute_query(query, params)
         return rows_affected == 1
 
+    def create_products_bulk(self, products):
+        """
+        Inserta muchos productos con un único INSERT multi-fila.
+        `products` es una secuencia de tuplas en el mismo orden de parámetros que create_product.
+        Retorna el número de productos insertados, o None si hubo un error.
+        """
+        query = """
+            INSERT INTO Productos (codigo_barras, nombre_producto, descripcion, id_categoria,
+                                   precio_venta, costo_unitario, stock_actual, stock_minimo,
+                                   unidad_medida)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        return self.db.execute_many(query, products)
+
+    def get_existing_barcodes(self, barcodes):
+        """
+        Retorna el conjunto de códigos de barras (de los indicados) que ya existen en la base de datos.
+        """
+        barcodes = list(barcodes)
+        if not barcodes:
+            return set()
+        placeholders = ", ".join(["%s"] * len(barcodes))
+        query = f"SELECT codigo_barras FROM Productos WHERE codigo_barras IN ({placeholders})"
+        results = self.db.fetch_all(query, tuple(barcodes))
+        return {row['codigo_barras'] for row in results} if results else set()
+
     def get_all_products(self):
         """Obtiene todos los productos, incluyendo el nombre de su categoría."""
         query = """
@@ -68,8 +74,193 @@ class ProductModel:
         results = self.db.fetch_all(query) 
         return results if results else []
 
+    def get_products_page(self, after=None, page_size=200, active=None, category_id=None, order_by="id"):
+        """
+        Obtiene una página de productos con paginación por clave (keyset): en lugar de OFFSET
+        se continúa desde la última fila de la página anterior, por lo que cada página cuesta
+        lo mismo sin importar lo lejos que esté.
+        - order_by="id": `after` es el último id recibido.
+        - order_by="nombre": `after` es la tupla (nombre_producto, id) de la última fila.
+        - active / category_id filtran opcionalmente por estado y categoría.
+        """
+        conditions = []
+        params = []
+        if active is not None:
+            conditions.append("p.activo = %s")
+            params.append(bool(active))
+        if category_id is not None:
+            conditions.append("p.id_categoria = %s")
+            params.append(category_id)
+
+        if order_by == "nombre":
+            if after is not None:
+                conditions.append("(p.nombre_producto > %s OR (p.nombre_producto = %s AND p.id > %s))")
+                params.extend((after[0], after[0], after[1]))
+            order_clause = "p.nombre_producto, p.id"
+        else:
+            if after is not None:
+                conditions.append("p.id > %s")
+                params.append(after)
+            order_clause = "p.id"
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT p.id, p.codigo_barras, p.nombre_producto, p.descripcion, 
+                   p.id_categoria, 
+                   c.nombre_categoria, 
+                   p.precio_venta, p.costo_unitario, p.stock_actual, p.stock_minimo, p.unidad_medida, p.activo
+            FROM Productos p
+            LEFT JOIN Categorias c ON p.id_categoria = c.id
+            {where_clause}
+            ORDER BY {order_clause}
+            LIMIT %s
+        """
+        params.append(page_size)
+        results = self.db.fetch_all(query, tuple(params))
+        return results if results else []
+
+    def estimate_product_count(self, active=None, category_id=None):
+        """
+        Estima cuántos productos hay. Sin filtros usa la estimación del motor (en MySQL la
+        estadística de la tabla, instantánea pero aproximada); con filtros hace un COUNT exacto.
+        """
+        if active is None and category_id is None:
+            return self.db.estimate_row_count("Productos")
+        else:
+            conditions = []
+            params = []
+            if active is not None:
+                conditions.append("activo = %s")
+                params.append(bool(active))
+            if category_id is not None:
+                conditions.append("id_categoria = %s")
+                params.append(category_id)
+            row = self.db.fetch_one(f"SELECT COUNT(*) AS total FROM Productos WHERE {' AND '.join(conditions)}",
+                                    tuple(params))
+        return int(row['total']) if row and row['total'] is not None else 0
+
+    # Caracteres con significado especial en MATCH ... AGAINST (IN BOOLEAN MODE)
+    _FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+    # innodb_ft_min_token_size por defecto: las palabras más cortas no están en el índice
+    _FULLTEXT_MIN_WORD = 3
+
+    def search_products(self, term, limit=50):
+        """
+        Busca productos por nombre/descripción (índice FULLTEXT, o FTS5 en SQLite) y por prefijo
+        del código de barras, en una sola consulta. Los que coinciden por código van primero; el
+        resto se ordena por relevancia. Cada palabra se busca como prefijo ("arro" encuentra "arroz").
+        Si ninguna palabra alcanza el largo mínimo del índice se busca por prefijo del nombre.
+        """
+        term = (term or "").strip()
+        if not term:
+            return []
+        columns = """
+            p.id, p.codigo_barras, p.nombre_producto, p.descripcion, 
+            p.id_categoria, 
+            c.nombre_categoria, 
+            p.precio_venta, p.costo_unitario, p.stock_actual, p.stock_minimo, p.unidad_medida, p.activo
+        """
+        # "!" como carácter de escape de LIKE: se escribe igual en MySQL y en SQLite
+        like_prefix = term.replace("!", "!!").replace("%", "!%").replace("_", "!_") + "%"
+        words = [w for w in self._FULLTEXT_OPERATORS.sub(" ", term).split() if len(w) >= self._FULLTEXT_MIN_WORD]
+
+        if words and self.db.dialect == 'sqlite':
+            fts_query = " ".join(f'"{w}"*' for w in words)
+            text_branch = f"""
+                SELECT {columns}, 1 AS grupo, -bm25(ProductosBusqueda) AS relevancia
+                FROM ProductosBusqueda
+                JOIN Productos p ON p.id = ProductosBusqueda.rowid
+                LEFT JOIN Categorias c ON p.id_categoria = c.id
+                WHERE ProductosBusqueda MATCH %s
+                ORDER BY relevancia DESC
+                LIMIT %s
+            """
+            text_params = (fts_query, limit)
+        elif words:
+            boolean_query = " ".join(f"+{w}*" for w in words)
+            text_branch = f"""
+                SELECT {columns}, 1 AS grupo, MATCH(p.nombre_producto, p.descripcion) AGAINST (%s IN BOOLEAN MODE) AS relevancia
+                FROM Productos p
+                LEFT JOIN Categorias c ON p.id_categoria = c.id
+                WHERE MATCH(p.nombre_producto, p.descripcion) AGAINST (%s IN BOOLEAN MODE)
+                ORDER BY relevancia DESC
+                LIMIT %s
+            """
+            text_params = (boolean_query, boolean_query, limit)
+        else:
+            # Usa el índice (nombre_producto, id)
+            text_branch = f"""
+                SELECT {columns}, 1 AS grupo, 0 AS relevancia
+                FROM Productos p
+                LEFT JOIN Categorias c ON p.id_categoria = c.id
+                WHERE p.nombre_producto LIKE %s ESCAPE '!'
+                ORDER BY p.nombre_producto
+                LIMIT %s
+            """
+            text_params = (like_prefix, limit)
+
+        # Cada rama va en una tabla derivada: así se escribe igual en MySQL y en SQLite
+        query = f"""
+            SELECT * FROM (
+                SELECT {columns}, 0 AS grupo, 0 AS relevancia
+                FROM Productos p
+                LEFT JOIN Categorias c ON p.id_categoria = c.id
+                WHERE p.codigo_barras LIKE %s ESCAPE '!'
+                ORDER BY p.codigo_barras
+                LIMIT %s
+            ) AS por_codigo
+            UNION ALL
+            SELECT * FROM ({text_branch}) AS por_texto
+            ORDER BY grupo, relevancia DESC
+        """
+        results = self.db.fetch_all(query, (like_prefix, limit) + text_params)
+
+        # Un producto puede coincidir por código y por nombre: se deja solo la primera aparición
+        products = []
+        seen = set()
+        for row in results or []:
+            if row['id'] in seen:
+                continue
+            seen.add(row['id'])
+            row.pop('grupo', None)
+            row.pop('relevancia', None)
+            products.append(row)
+            if len(products) == limit:
+                break
+        return products
+
+    def get_low_stock_products(self, limit=100):
+        """
+        Reporte de reposición: productos activos cuyo stock está en o por debajo del mínimo,
+        de los más faltantes a los menos. Usa el índice (activo, margen_stock), así que no
+        recorre toda la tabla. Retorna hasta `limit` productos con su margen (negativo = faltan).
+        """
+        query = """
+            SELECT p.id, p.codigo_barras, p.nombre_producto, 
+                   c.nombre_categoria, 
+                   p.stock_actual, p.stock_minimo, p.margen_stock, p.unidad_medida
+            FROM Productos p
+            LEFT JOIN Categorias c ON p.id_categoria = c.id
+            WHERE p.activo = TRUE AND p.margen_stock <= 0
+            ORDER BY p.margen_stock
+            LIMIT %s
+        """
+        results = self.db.fetch_all(query, (limit,))
+        return results if results else []
+
+    def count_low_stock_products(self):
+        """Cuántos productos activos están en o por debajo de su stock mínimo (solo lee el índice)."""
+        row = self.db.fetch_one("SELECT COUNT(*) AS total FROM Productos WHERE activo = TRUE AND margen_stock <= 0")
+        return int(row['total']) if row else 0
+
     def get_product_by_barcode(self, barcode):
-        """Busca un producto por su código de barras."""
+        """
+        Busca un producto por su código de barras.
+        Primero consulta la caché en memoria; solo si no está va a la base de datos.
+        """
+        cached = self.barcode_cache.get(barcode)
+        if cached is not None:
+            return cached
         query = """
             SELECT p.id, p.codigo_barras, p.nombre_producto, p.descripcion, 
                    p.id_categoria, 
@@ -80,9 +271,127 @@ class ProductModel:
             WHERE p.codigo_barras = %s
         """ 
         params = (barcode,)
-        result = self.db.fetch_one(query, params) 
+        result = self.db.fetch_one(query, params, prepared=True) # Consulta más frecuente (cada escaneo)
+        # Dentro de una transacción la fila podría no estar confirmada: no se guarda en caché
+        if result and not self.db.in_transaction():
+            self.barcode_cache.put(result)
         return result
 
+    def get_cached_product_by_barcode(self, barcode):
+        """Busca un producto solo en la caché en memoria (sin ir a la base de datos). None si no está."""
+        return self.barcode_cache.get(barcode)
+
+    def preload_barcode_cache(self):
+        """
+        Carga en la caché los productos activos (hasta su tamaño máximo) para que los
+        escaneos en caja no dependan de la base de datos. Retorna cuántos se cargaron.
+        """
+        # La marca de agua se toma antes de leer para no perder cambios hechos durante la carga
+        high_water = self.get_products_high_water()
+        query = """
+            SELECT p.id, p.codigo_barras, p.nombre_producto, p.descripcion, 
+                   p.id_categoria, 
+                   c.nombre_categoria,
+                   p.precio_venta, p.costo_unitario, p.stock_actual, p.stock_minimo, p.unidad_medida, p.activo
+            FROM Productos p
+            LEFT JOIN Categorias c ON p.id_categoria = c.id
+            WHERE p.activo = TRUE
+            LIMIT %s
+        """
+        products = self.db.fetch_all(query, (self.barcode_cache.max_size,))
+        self.barcode_cache.preload(products, high_water)
+        print(f"Caché de códigos de barras precargada con {len(products)} productos.")
+        return len(products)
+
+    def get_products_high_water(self):
+        """Marca de agua actual (última ultima_actualizacion) para get_products_changed_since, o None si no hay productos."""
+        row = self.db.fetch_one("SELECT MAX(ultima_actualizacion) AS marca FROM Productos")
+        return row['marca'] if row else None
+
+    def refresh_barcode_cache(self):
+        """
+        Trae los productos modificados desde la última consulta (por cualquier terminal)
+        según ultima_actualizacion y los actualiza en la caché. Retorna cuántos cambios se leyeron.
+        """
+        high_water = self.barcode_cache.high_water
+        if high_water is None:
+            return self.preload_barcode_cache()
+        changed, new_high_water = self.get_products_changed_since(high_water)
+        self.barcode_cache.apply_changes(changed, new_high_water)
+        return len(changed)
+
+    def get_products_changed_since(self, ts=None):
+        """
+        Sincronización incremental: retorna (productos, marca_de_agua) con los productos creados
+        o modificados desde `ts` según ultima_actualizacion, incluidos los desactivados
+        (activo = FALSE), que el llamador debe tratar como bajas. Con ts=None trae todo el catálogo.
+        La marca de agua devuelta se pasa como `ts` en la siguiente llamada; si no hubo
+        cambios es la misma `ts`.
+        """
+        # Se usa >= porque la marca tiene resolución de segundos: repetir una fila es inofensivo
+        query = """
+            SELECT p.id, p.codigo_barras, p.nombre_producto, p.descripcion, 
+                   p.id_categoria, 
+                   c.nombre_categoria,
+                   p.precio_venta, p.costo_unitario, p.stock_actual, p.stock_minimo, p.unidad_medida, p.activo,
+                   p.ultima_actualizacion
+            FROM Productos p
+            LEFT JOIN Categorias c ON p.id_categoria = c.id
+        """
+        if ts is None:
+            changed = self.db.fetch_all(query)
+        else:
+            changed = self.db.fetch_all(query + " WHERE p.ultima_actualizacion >= %s", (ts,))
+        changed = changed if changed else []
+        high_water = max((row['ultima_actualizacion'] for row in changed), default=ts)
+        for row in changed:
+            del row['ultima_actualizacion']
+        return changed, high_water
+
+    def build_product_index(self):
+        """
+        Construye el índice en memoria para autocompletar (nombres y códigos de barras de todo
+        el catálogo). Pensado para ejecutarse en segundo plano. Retorna cuántos productos indexó.
+        """
+        # Catálogo y marca de agua salen de la misma lectura, así no se pierde ningún cambio
+        products, high_water = self.get_products_changed_since(None)
+        self.product_index.build(products, high_water)
+        print(f"Índice de autocompletado construido con {len(products)} productos.")
+        return len(products)
+
+    def refresh_product_index(self):
+        """Aplica al índice solo los productos modificados desde la última actualización."""
+        # Sin marca de agua (índice sin construir o catálogo vacío) se construye completo
+        if not self.product_index.loaded or self.product_index.high_water is None:
+            return self.build_product_index()
+        changed, new_high_water = self.get_products_changed_since(self.product_index.high_water)
+        self.product_index.apply_changes(changed, new_high_water)
+        return len(changed)
+
+    def lookup_products(self, text, limit=10):
+        """
+        Autocompletado: productos activos cuyo código o alguna palabra del nombre empieza por
+        cada palabra de `text` (sin tildes ni mayúsculas). Se resuelve en memoria, sin consultar la BD.
+        """
+        return self.product_index.search(text, limit)
+
+    def _invalidate_cached(self, product_ids):
+        """
+        Descarta productos de la caché tras modificarlos. Dentro de una transacción se repite
+        al confirmar, por si otro hilo volvió a cargar la versión antigua antes del COMMIT.
+        """
+        product_ids = [int(product_id) for product_id in product_ids]
+        self.barcode_cache.invalidate_ids(product_ids)
+        if self.db.in_transaction():
+            self.db.after_commit(lambda: self.barcode_cache.invalidate_ids(product_ids))
+
+    def _adjust_cached_stock(self, changes):
+        """Refleja en la caché (al confirmar) un cambio relativo de stock: {id: delta}."""
+        def apply():
+            for product_id, delta in changes.items():
+                self.barcode_cache.adjust_stock(int(product_id), delta)
+        self.db.after_commit(apply)
+
     def get_product_by_id(self, product_id):
         """Busca un producto por su ID."""
         query = """
@@ -95,7 +404,7 @@ class ProductModel:
             WHERE p.id = %s
         """ 
         params = (product_id,)
-        result = self.db.fetch_one(query, params) 
+        result = self.db.fetch_one(query, params, prepared=True)
         return result
 
     def update_product(self, product_id, barcode, name, description, category_id, price, cost, stock, min_stock, unit, active):
@@ -108,26 +417,173 @@ class ProductModel:
             WHERE id = %s
         """ 
         params = (barcode, name, description, category_id, price, cost, stock, min_stock, unit, active, product_id)
-        rows_affected = self.db.execute_query(query, params)
+        rows_affected = self.db.execute_query(query, params, idempotent=True)
+        self._invalidate_cached([product_id])
         return rows_affected == 1
 
     def update_product_stock(self, product_id, new_stock):
         """Actualiza solo el stock de un producto."""
         query = "UPDATE Productos SET stock_actual = %s, ultima_actualizacion = CURRENT_TIMESTAMP WHERE id = %s" 
         params = (new_stock, product_id)
+        rows_affected = self.db.execute_query(query, params, idempotent=True)
+        self._invalidate_cached([product_id])
+        return rows_affected == 1
+
+    def decrement_stock(self, product_id, quantity):
+        """
+        Descuenta unidades del stock directamente en el servidor, sin leer-modificar-escribir,
+        de modo que dos terminales vendiendo el mismo producto nunca se pisan.
+        Retorna True si se descontó, False si el stock no alcanza (o el producto no existe).
+        """
+        query = """
+            UPDATE Productos
+            SET stock_actual = stock_actual - %s, ultima_actualizacion = CURRENT_TIMESTAMP
+            WHERE id = %s AND stock_actual >= %s
+        """
+        params = (quantity, product_id, quantity)
+        rows_affected = self.db.execute_query(query, params)
+        if rows_affected == 1:
+            self._adjust_cached_stock({product_id: -quantity})
+        return rows_affected == 1
+
+    def increment_stock(self, product_id, quantity):
+        """Suma unidades al stock directamente en el servidor (devoluciones, anulaciones)."""
+        query = "UPDATE Productos SET stock_actual = stock_actual + %s, ultima_actualizacion = CURRENT_TIMESTAMP WHERE id = %s"
+        params = (quantity, product_id)
         rows_affected = self.db.execute_query(query, params)
+        if rows_affected == 1:
+            self._adjust_cached_stock({product_id: quantity})
         return rows_affected == 1
 
+    def decrement_stock_batch(self, lines):
+        """
+        Descuenta el stock de todas las líneas de un carrito en una sola transacción.
+        `lines` es un dict {id_producto: cantidad} o una secuencia de pares; los ids repetidos se acumulan.
+        Si algún producto no tiene stock suficiente no se descuenta nada.
+        Retorna (True, []) si todo se descontó, o (False, [ids sin stock suficiente]).
+        Si ocurre un error de base de datos retorna (False, []); dentro de una transacción abierta
+        el error se propaga (igual que en execute_query), y quien la abrió debe revertirla al recibir False.
+        """
+        merged = {}
+        for product_id, quantity in (lines.items() if isinstance(lines, dict) else lines):
+            merged[int(product_id)] = merged.get(int(product_id), 0) + int(quantity)
+
+        query = """
+            UPDATE Productos
+            SET stock_actual = stock_actual - %s, ultima_actualizacion = CURRENT_TIMESTAMP
+            WHERE id = %s AND stock_actual >= %s
+        """
+        try:
+            with self.db.transaction():
+                insufficient = []
+                for product_id in sorted(merged): # Orden fijo de bloqueo para evitar interbloqueos
+                    quantity = merged[product_id]
+                    if self.db.execute_query(query, (quantity, product_id, quantity)) != 1:
+                        insufficient.append(product_id)
+                if insufficient:
+                    raise InsufficientStockError(insufficient)
+                self._adjust_cached_stock({product_id: -quantity for product_id, quantity in merged.items()})
+        except InsufficientStockError as e:
+            return False, e.product_ids
+        except Exception as e:
+            print(f"Error al descontar stock en bloque: {e}")
+            if self.db.in_transaction():
+                raise # Quien abrió la transacción decide (p. ej. guardar la venta sin conexión)
+            return False, []
+        return True, []
+
+    def bulk_adjust_stock(self, deltas, chunk_size=500):
+        """
+        Suma (o resta, si la cantidad es negativa) unidades al stock de muchos productos
+        a la vez, p. ej. al recibir un pedido. `deltas` es un dict {id_producto: cantidad}
+        o una secuencia de pares (id_producto, cantidad); los ids repetidos se acumulan.
+        Todo se aplica en una sola transacción, con un UPDATE por cada bloque de `chunk_size` productos.
+        Retorna una lista de diccionarios {'id', 'stock_anterior', 'stock_nuevo'} (stock_anterior
+        None si el producto no existe), o None si hubo un error y no se aplicó nada (dentro de
+        una transacción abierta el error se propaga).
+        """
+        merged = {}
+        for product_id, delta in (deltas.items() if isinstance(deltas, dict) else deltas):
+            merged[int(product_id)] = merged.get(int(product_id), 0) + int(delta)
+        return self._bulk_update_stock(merged, "stock_actual + %s", lambda before, delta: before + delta, chunk_size)
+
+    def bulk_set_stock(self, counts, chunk_size=500):
+        """
+        Fija el stock absoluto de muchos productos a la vez, p. ej. tras un inventario físico.
+        `counts` es un dict {id_producto: stock} o una secuencia de pares (id_producto, stock);
+        si un id se repite, gana el último conteo.
+        Mismo formato de retorno que bulk_adjust_stock.
+        """
+        merged = {}
+        for product_id, count in (counts.items() if isinstance(counts, dict) else counts):
+            merged[int(product_id)] = int(count)
+        return self._bulk_update_stock(merged, "%s", lambda before, count: count, chunk_size)
+
+    def _bulk_update_stock(self, changes, value_expression, compute_new, chunk_size):
+        """
+        Aplica `changes` {id: valor} con UPDATE ... SET stock_actual = CASE id WHEN ... END.
+        Las filas se bloquean (FOR UPDATE) antes de modificarlas para devolver el stock
+        anterior y el nuevo de forma consistente.
+        """
+        results = {}
+        product_ids = sorted(changes) # Orden fijo de bloqueo para evitar interbloqueos entre terminales
+        try:
+            with self.db.transaction():
+                for start in range(0, len(product_ids), chunk_size):
+                    chunk = product_ids[start:start + chunk_size]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+
+                    current = self.db.fetch_all(
+                        f"SELECT id, stock_actual FROM Productos WHERE id IN ({placeholders}) FOR UPDATE",
+                        tuple(chunk))
+                    before = {row['id']: row['stock_actual'] for row in current}
+                    found = [product_id for product_id in chunk if product_id in before]
+                    for product_id in chunk:
+                        if product_id not in before:
+                            results[product_id] = {'id': product_id, 'stock_anterior': None, 'stock_nuevo': None}
+                    if not found:
+                        continue
+
+                    cases = " ".join([f"WHEN %s THEN {value_expression}"] * len(found))
+                    found_placeholders = ", ".join(["%s"] * len(found))
+                    query = f"""
+                        UPDATE Productos
+                        SET stock_actual = CASE id {cases} END,
+                            ultima_actualizacion = CURRENT_TIMESTAMP
+                        WHERE id IN ({found_placeholders})
+                    """
+                    params = []
+                    for product_id in found:
+                        params.extend((product_id, changes[product_id]))
+                    params.extend(found)
+                    self.db.execute_query(query, tuple(params))
+                    self._invalidate_cached(found)
+
+                    for product_id in found:
+                        results[product_id] = {
+                            'id': product_id,
+                            'stock_anterior': before[product_id],
+                            'stock_nuevo': compute_new(before[product_id], changes[product_id])
+                        }
+        except Exception as e:
+            print(f"Error al actualizar el stock en bloque: {e}")
+            if self.db.in_transaction():
+                raise
+            return None
+        return [results[product_id] for product_id in changes]
+
     def deactivate_product(self, product_id): # === MEJORA: Renombrado de 'delete_product' a 'deactivate_product' ===
         """Desactiva (no elimina físicamente) un producto, marcándolo como inactivo."""
         query = "UPDATE Productos SET activo = FALSE, ultima_actualizacion = CURRENT_TIMESTAMP WHERE id = %s" 
         params = (product_id,)
-        rows_affected = self.db.execute_query(query, params)
+        rows_affected = self.db.execute_query(query, params, idempotent=True)
+        self._invalidate_cached([product_id])
         return rows_affected == 1
 
     def activate_product(self, product_id):
         """Marca un producto como activo."""
         query = "UPDATE Productos SET activo = TRUE, ultima_actualizacion = CURRENT_TIMESTAMP WHERE id = %s" 
         params = (product_id,)
-        rows_affected = self.db.execute_query(query, params)
+        rows_affected = self.db.execute_query(query, params, idempotent=True)
+        self._invalidate_cached([product_id])
         return rows_affected == 1
\ No newline at end of file
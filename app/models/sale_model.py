@@ -0,0 +1,145 @@
+# app/models/sale_model.py
+
+from app.database.db_connection import get_db_connection
+
+class SaleModel:
+    """
+    Gestiona las operaciones de base de datos relacionadas con las ventas y su detalle.
+    """
+    def __init__(self):
+        self.db = get_db_connection()
+
+    def create_sale(self, user_id, total, payment_method, sold_at=None):
+        """
+        Inserta la cabecera de una venta. `sold_at` fija la fecha de la venta (p. ej. una venta
+        hecha sin conexión que se registra después); si es None se usa la hora actual.
+        Retorna el id de la venta creada, o None si hubo un error.
+        """
+        if sold_at is None:
+            query = "INSERT INTO Ventas (id_usuario, total, metodo_pago) VALUES (%s, %s, %s)"
+            params = (user_id, total, payment_method)
+        else:
+            query = "INSERT INTO Ventas (id_usuario, total, metodo_pago, fecha_venta) VALUES (%s, %s, %s, %s)"
+            params = (user_id, total, payment_method, sold_at)
+        return self.db.execute_insert(query, params)
+
+    def add_sale_lines(self, sale_id, lines):
+        """
+        Inserta todas las líneas de una venta con un único INSERT multi-fila.
+        `lines` es una lista de diccionarios con id_producto, cantidad, precio_unitario y subtotal.
+        Retorna el número de líneas insertadas.
+        """
+        query = """
+            INSERT INTO DetalleVentas (id_venta, id_producto, cantidad, precio_unitario, subtotal)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        params = [(sale_id, line['id_producto'], line['cantidad'], line['precio_unitario'], line['subtotal'])
+                  for line in lines]
+        return self.db.execute_many(query, params)
+
+    def get_sale_by_id(self, sale_id):
+        """Busca la cabecera de una venta por su ID."""
+        query = "SELECT id, id_usuario, fecha_venta, total, metodo_pago FROM Ventas WHERE id = %s"
+        params = (sale_id,)
+        return self.db.fetch_one(query, params)
+
+    def get_sale_lines(self, sale_id):
+        """Obtiene las líneas de una venta, con el nombre de cada producto."""
+        query = """
+            SELECT d.id, d.id_producto, p.codigo_barras, p.nombre_producto,
+                   d.cantidad, d.precio_unitario, d.subtotal
+            FROM DetalleVentas d
+            LEFT JOIN Productos p ON d.id_producto = p.id
+            WHERE d.id_venta = %s
+        """
+        params = (sale_id,)
+        results = self.db.fetch_all(query, params)
+        return results if results else []
+
+    def add_to_daily_summary(self, sale_id, user_id, total, day=None):
+        """
+        Suma una venta recién registrada a los resúmenes del día (por cajero y por categoría),
+        para que el dashboard no tenga que agrupar el detalle de ventas. Debe llamarse dentro de
+        la misma transacción que la venta. Cada cajero actualiza sus propias filas, así que
+        las cajas no compiten por el mismo registro. `day` es el día de la venta (hoy si es None).
+        """
+        fecha = "CURDATE()" if day is None else "%s"
+        day_params = () if day is None else (day,)
+        self.db.execute_query(f"""
+            INSERT INTO ResumenVentasCajero (fecha, id_usuario, tickets, total)
+            VALUES ({fecha}, %s, 1, %s)
+            ON DUPLICATE KEY UPDATE tickets = tickets + 1, total = total + VALUES(total)
+        """, day_params + (user_id, total))
+        self.db.execute_query(f"""
+            INSERT INTO ResumenVentasCategoria (fecha, id_categoria, id_usuario, unidades, total)
+            SELECT {fecha}, p.id_categoria, %s, SUM(d.cantidad), SUM(d.subtotal)
+            FROM DetalleVentas d
+            JOIN Productos p ON d.id_producto = p.id
+            WHERE d.id_venta = %s
+            GROUP BY p.id_categoria
+            ON DUPLICATE KEY UPDATE unidades = unidades + VALUES(unidades), total = total + VALUES(total)
+        """, day_params + (user_id, sale_id))
+
+    def rebuild_daily_summary(self, day):
+        """
+        Recalcula desde el detalle de ventas los resúmenes de un solo día (p. ej. tras corregir
+        ventas a mano). Retorna True si se completó.
+        """
+        try:
+            with self.db.transaction():
+                self.db.execute_query("DELETE FROM ResumenVentasCajero WHERE fecha = %s", (day,))
+                self.db.execute_query("DELETE FROM ResumenVentasCategoria WHERE fecha = %s", (day,))
+                self.db.execute_query("""
+                    INSERT INTO ResumenVentasCajero (fecha, id_usuario, tickets, total)
+                    SELECT DATE(fecha_venta), id_usuario, COUNT(*), SUM(total)
+                    FROM Ventas
+                    WHERE fecha_venta >= %s AND fecha_venta < %s + INTERVAL 1 DAY
+                    GROUP BY DATE(fecha_venta), id_usuario
+                """, (day, day))
+                self.db.execute_query("""
+                    INSERT INTO ResumenVentasCategoria (fecha, id_categoria, id_usuario, unidades, total)
+                    SELECT DATE(v.fecha_venta), p.id_categoria, v.id_usuario, SUM(d.cantidad), SUM(d.subtotal)
+                    FROM Ventas v
+                    JOIN DetalleVentas d ON d.id_venta = v.id
+                    JOIN Productos p ON d.id_producto = p.id
+                    WHERE v.fecha_venta >= %s AND v.fecha_venta < %s + INTERVAL 1 DAY
+                    GROUP BY DATE(v.fecha_venta), p.id_categoria, v.id_usuario
+                """, (day, day))
+        except Exception as e:
+            print(f"Error al recalcular el resumen de ventas del {day}: {e}")
+            return False
+        return True
+
+    def get_daily_summary(self, day=None):
+        """
+        Totales de un día (hoy si day=None) leídos del resumen por cajero:
+        recaudación, número de tickets y ticket promedio.
+        """
+        if day is None:
+            row = self.db.fetch_one("SELECT SUM(tickets) AS tickets, SUM(total) AS total FROM ResumenVentasCajero WHERE fecha = CURDATE()")
+        else:
+            row = self.db.fetch_one("SELECT SUM(tickets) AS tickets, SUM(total) AS total FROM ResumenVentasCajero WHERE fecha = %s", (day,))
+        tickets = int(row['tickets']) if row and row['tickets'] is not None else 0
+        total = row['total'] if row and row['total'] is not None else 0
+        return {
+            'tickets': tickets,
+            'total': total,
+            'ticket_promedio': (total / tickets) if tickets else 0,
+        }
+
+    def get_top_categories(self, day=None, limit=5):
+        """Categorías con más ventas en un día (hoy si day=None), desde el resumen por categoría."""
+        query = """
+            SELECT r.id_categoria, c.nombre_categoria, SUM(r.unidades) AS unidades, SUM(r.total) AS total
+            FROM ResumenVentasCategoria r
+            LEFT JOIN Categorias c ON r.id_categoria = c.id
+            WHERE r.fecha = {fecha}
+            GROUP BY r.id_categoria, c.nombre_categoria
+            ORDER BY total DESC
+            LIMIT %s
+        """
+        if day is None:
+            results = self.db.fetch_all(query.format(fecha="CURDATE()"), (limit,))
+        else:
+            results = self.db.fetch_all(query.format(fecha="%s"), (day, limit))
+        return results if results else []
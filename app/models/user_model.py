@@ -9,29 +9,6 @@ class UserModel:
     """
     def __init__(self):
         self.db = get_db_connection()
-        # === MEJORA: La conexión se establece una vez al inicio de la app, no aquí. ===
-        self.db.connect()
-        self._create_user_table()
-
-    def _create_user_table(self):
-        """Crea la tabla de usuarios si no existe."""
-        # === MEJORA: No se necesita conectar/desconectar aquí, se asume conexión activa. ===
-        try:
-            query = '''
-                CREATE TABLE IF NOT EXISTS Usuarios (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    nombre_usuario VARCHAR(255) UNIQUE NOT NULL,
-                    password_hash VARCHAR(255) NOT NULL,
-                    rol VARCHAR(50) NOT NULL,
-                    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    ultima_sesion TIMESTAMP NULL,
-                    activo BOOLEAN DEFAULT TRUE
-                )
-            '''
-            self.db.execute_query(query)
-            print("Tabla 'Usuarios' verificada/creada.")
-        except Exception as e:
-            print(f"Error al verificar/crear tabla 'Usuarios': {e}")
 
     def create_user(self, username, password, role="cajero"):
         """
@@ -52,13 +29,13 @@ class UserModel:
         """Busca un usuario por su nombre de usuario."""
         query = "SELECT id, nombre_usuario, password_hash, rol, activo FROM Usuarios WHERE nombre_usuario = %s" 
         params = (username,)
-        return self.db.fetch_one(query, params)
+        return self.db.fetch_one(query, params, prepared=True)
 
     def get_user_by_id(self, user_id):
         """Busca un usuario por su ID."""
         query = "SELECT id, nombre_usuario, password_hash, rol, activo FROM Usuarios WHERE id = %s" 
         params = (user_id,)
-        return self.db.fetch_one(query, params)
+        return self.db.fetch_one(query, params, prepared=True)
 
     def verify_password(self, username, password):
         """Verifica la contraseña de un usuario."""
@@ -70,9 +47,10 @@ class UserModel:
 
     def update_user_last_login(self, user_id):
         """Actualiza la marca de tiempo de la última sesión de un usuario."""
-        query = "UPDATE Usuarios SET ultima_sesion = CURRENT_TIMESTAMP WHERE id = %s"
+        # Iniciar sesión no cuenta como cambio del usuario: se conserva ultima_actualizacion
+        query = "UPDATE Usuarios SET ultima_sesion = CURRENT_TIMESTAMP, ultima_actualizacion = ultima_actualizacion WHERE id = %s"
         params = (user_id,)
-        rows_affected = self.db.execute_query(query, params)
+        rows_affected = self.db.execute_query(query, params, idempotent=True)
         return rows_affected == 1
 
     def update_user_username(self, user_id, new_username):
@@ -100,11 +78,28 @@ class UserModel:
         """Establece el estado activo/inactivo de un usuario."""
         query = "UPDATE Usuarios SET activo = %s WHERE id = %s"
         params = (is_active, user_id)
-        rows_affected = self.db.execute_query(query, params)
+        rows_affected = self.db.execute_query(query, params, idempotent=True)
         return rows_affected == 1
 
     def get_all_users(self):
         """Obtiene todos los usuarios (activos e inactivos)."""
         query = "SELECT id, nombre_usuario, rol, activo, fecha_creacion, ultima_sesion FROM Usuarios"
         users_data = self.db.fetch_all(query)
-        return users_data if users_data else []
\ No newline at end of file
+        return users_data if users_data else []
+
+    def get_users_changed_since(self, ts=None):
+        """
+        Sincronización incremental: retorna (usuarios, marca_de_agua) con los usuarios creados
+        o modificados desde `ts` (todos si ts=None), incluidos los desactivados. No incluye
+        el hash de la contraseña.
+        """
+        query = "SELECT id, nombre_usuario, rol, activo, fecha_creacion, ultima_sesion, ultima_actualizacion FROM Usuarios"
+        if ts is None:
+            changed = self.db.fetch_all(query)
+        else:
+            changed = self.db.fetch_all(query + " WHERE ultima_actualizacion >= %s", (ts,))
+        changed = changed if changed else []
+        high_water = max((row['ultima_actualizacion'] for row in changed), default=ts)
+        for row in changed:
+            del row['ultima_actualizacion']
+        return changed, high_water
@@ -1,6 +1,7 @@
 # app/views/admin_panel_view.py
 
 import customtkinter as ctk
+from CTkMessagebox import CTkMessagebox
 from app.views.base_view import BaseView
 
 # === MEJORA: Hereda de BaseView para estandarizar ===
@@ -36,6 +37,9 @@ class AdminPanelView(BaseView):
         manage_categories_button = ctk.CTkButton(button_container, text="Gestionar Categorías", command=self._open_category_management, width=200, height=40)
         manage_categories_button.pack(pady=10)
 
+        db_metrics_button = ctk.CTkButton(button_container, text="Métricas de Base de Datos", command=self._open_db_metrics, width=200, height=40)
+        db_metrics_button.pack(pady=10)
+
         back_button = ctk.CTkButton(button_container, text="Volver al Dashboard", command=self._go_back_to_dashboard, width=200, height=40)
         back_button.pack(pady=(40, 10))
 
@@ -54,6 +58,61 @@ class AdminPanelView(BaseView):
         # === MEJORA: Pasa la instancia existente del category_controller ===
         self.master.show_frame(CategoryManagementView, self.category_controller, self.controller, self.user_info)
 
+    def _open_db_metrics(self):
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Métricas de Base de Datos")
+        dialog.geometry("1000x600")
+        dialog.transient(self)
+        dialog.grid_rowconfigure(0, weight=1)
+        dialog.grid_columnconfigure(0, weight=1)
+
+        textbox = ctk.CTkTextbox(dialog, font=("Courier New", 12), wrap="none")
+        textbox.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+
+        def refresh():
+            textbox.configure(state="normal")
+            textbox.delete("1.0", "end")
+            textbox.insert("1.0", self._format_db_metrics(self.controller.get_db_metrics()))
+            textbox.configure(state="disabled")
+
+        def export():
+            success, result = self.controller.dump_db_metrics()
+            if success:
+                CTkMessagebox(title="Métricas", message=f"Métricas guardadas en {result}", icon="check")
+            else:
+                CTkMessagebox(title="Error", message=result, icon="cancel")
+
+        def reset():
+            self.controller.reset_db_metrics()
+            refresh()
+
+        button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        button_frame.grid(row=1, column=0, pady=10)
+        ctk.CTkButton(button_frame, text="Actualizar", command=refresh).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Exportar JSON", command=export).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Reiniciar contadores", command=reset).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Cerrar", command=dialog.destroy).pack(side="left", padx=5)
+        refresh()
+
+    @staticmethod
+    def _format_db_metrics(metrics, max_statements=50):
+        pool = metrics['pool']
+        statements = metrics['sentencias_preparadas']
+        lines = [
+            f"Pool: {pool.get('in_use', 0)} en uso / {pool.get('open', 0)} abiertas (máx. {pool.get('pool_size', 0)}), "
+            f"esperas: {pool.get('waits', 0)}, timeouts: {pool.get('timeouts', 0)}, "
+            f"espera media: {pool.get('avg_wait_ms', 0.0):.2f} ms",
+            f"Sentencias preparadas: {statements['hits']} aciertos, {statements['misses']} fallos "
+            f"({statements['hit_ratio']:.0%}), {statements['evictions']} descartadas",
+            "",
+            f"{'Ejec.':>7} {'Err.':>5} {'Filas':>8} {'Total ms':>10} {'Media':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'Máx.':>8}  Sentencia",
+        ]
+        for row in metrics['consultas'][:max_statements]:
+            lines.append(
+                f"{row['count']:>7} {row['errors']:>5} {row['rows']:>8} {row['total_ms']:>10.1f} {row['avg_ms']:>8.2f} "
+                f"{row['p50_ms']:>7.2f} {row['p95_ms']:>7.2f} {row['p99_ms']:>7.2f} {row['max_ms']:>8.1f}  {row['sql'][:200]}")
+        return "\n".join(lines)
+
     def _go_back_to_dashboard(self):
         from app.views.dashboard_view import DashboardView
         # Para volver al dashboard, solo necesitamos el user_controller y la info
@@ -0,0 +1,129 @@
+# app/views/background_executor.py
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+class BackgroundTask:
+    """
+    Referencia a un trabajo enviado al BackgroundExecutor.
+    Permite cancelarlo: si aún no empezó no se ejecuta, y si ya está en curso
+    su resultado se descarta sin llamar a los callbacks.
+    """
+    def __init__(self, owner, on_success=None, on_error=None):
+        self.owner = owner           # Vista (frame) que pidió el trabajo, o None
+        self.on_success = on_success
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+class BackgroundExecutor:
+    """
+    Ejecuta llamadas a controladores fuera del hilo de Tk para que la ventana no se congele
+    mientras se espera a la base de datos.
+
+    Los hilos de trabajo nunca tocan widgets: dejan su resultado en una cola y el hilo de Tk
+    la vacía mediante callbacks programados con after(), que son quienes invocan
+    on_success/on_error. Solo se sondea la cola mientras hay trabajos pendientes.
+    """
+    def __init__(self, root, max_workers=4, poll_interval_ms=20):
+        self.root = root
+        self._workers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pos-worker")
+        self._results = queue.SimpleQueue()
+        self._tasks = {}        # owner -> set de BackgroundTask (solo se usa desde el hilo de Tk)
+        self._in_flight = set() # Tareas cuyo resultado aún no se ha entregado
+        self._poll_interval_ms = poll_interval_ms
+        self._poll_job = None
+        self._closed = False
+
+    def submit(self, owner, func, *args, on_success=None, on_error=None, **kwargs):
+        """
+        Programa func(*args, **kwargs) en un hilo de trabajo.
+        on_success(resultado) u on_error(excepción) se llaman luego en el hilo de Tk,
+        solo si la tarea no fue cancelada y el widget `owner` sigue existiendo.
+        Debe llamarse desde el hilo de Tk.
+        """
+        task = BackgroundTask(owner, on_success, on_error)
+        if self._closed:
+            task.cancelled = True
+            return task
+        self._tasks.setdefault(owner, set()).add(task)
+        self._in_flight.add(task)
+        task.future = self._workers.submit(self._run, task, func, args, kwargs)
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self._poll_interval_ms, self._poll_results)
+        return task
+
+    def cancel_owner(self, owner):
+        """Cancela todos los trabajos pedidos por una vista (p. ej. al destruirla)."""
+        for task in self._tasks.pop(owner, set()):
+            task.cancel()
+
+    def shutdown(self):
+        """Cancela todo lo pendiente y detiene los hilos de trabajo sin esperar."""
+        self._closed = True
+        for owner in list(self._tasks):
+            self.cancel_owner(owner)
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+        self._workers.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task, func, args, kwargs):
+        # Se ejecuta en un hilo de trabajo: no debe tocar ningún widget
+        if task.cancelled:
+            self._results.put((task, None, None))
+            return
+        try:
+            self._results.put((task, func(*args, **kwargs), None))
+        except Exception as e:
+            self._results.put((task, None, e))
+
+    def _poll_results(self):
+        self._poll_job = None
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._in_flight.discard(task)
+            self._deliver(task, result, error)
+
+        # Las tareas canceladas antes de empezar nunca llegan a la cola
+        self._in_flight = {t for t in self._in_flight if not t.future.cancelled()}
+
+        if self._in_flight and not self._closed:
+            self._poll_job = self.root.after(self._poll_interval_ms, self._poll_results)
+
+    def _deliver(self, task, result, error):
+        owner_tasks = self._tasks.get(task.owner)
+        if owner_tasks is not None:
+            owner_tasks.discard(task)
+            if not owner_tasks:
+                del self._tasks[task.owner]
+
+        if task.cancelled or self._closed or not self._owner_alive(task.owner):
+            return
+        if error is not None:
+            if task.on_error:
+                task.on_error(error)
+            else:
+                print(f"Error en tarea en segundo plano: {error}")
+        elif task.on_success:
+            task.on_success(result)
+
+    @staticmethod
+    def _owner_alive(owner):
+        if owner is None:
+            return True
+        try:
+            return bool(owner.winfo_exists())
+        except Exception:
+            return False
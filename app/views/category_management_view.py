@@ -3,6 +3,7 @@
 import customtkinter as ctk
 from CTkMessagebox import CTkMessagebox
 import tkinter.ttk as ttk
+from app.views.table_binding import TreeviewBinding
 
 class CategoryManagementView(ctk.CTkFrame):
     def __init__(self, master, category_controller, user_controller, user_info):
@@ -35,6 +36,8 @@ class CategoryManagementView(ctk.CTkFrame):
         self.category_table.column("Nombre", width=250, anchor="w")
         self.category_table.column("Descripción", width=400, anchor="w")
         self.category_table.grid(row=0, column=0, sticky="nsew")
+        self.table_binding = TreeviewBinding(self.category_table, lambda cat: (
+            cat['id'], cat['nombre_categoria'], cat.get('descripcion', '')))
 
         button_frame = ctk.CTkFrame(self, fg_color="transparent")
         button_frame.grid(row=2, column=0, pady=20)
@@ -44,11 +47,15 @@ class CategoryManagementView(ctk.CTkFrame):
         ctk.CTkButton(button_frame, text="Volver al Panel", command=self._go_back_to_admin_panel).pack(side="left", padx=5)
 
     def _load_categories(self):
-        for item in self.category_table.get_children():
-            self.category_table.delete(item)
-        categories = self.category_controller.get_all_categories()
-        for cat in categories:
-            self.category_table.insert("", "end", values=(cat['id'], cat['nombre_categoria'], cat.get('descripcion', '')))
+        self.master.executor.submit(self, self.category_controller.get_all_categories,
+                                    on_success=self.table_binding.sync, on_error=self._on_load_error)
+
+    def on_show(self):
+        # La tabla solo aplica las diferencias con lo que ya muestra
+        self._load_categories()
+
+    def _on_load_error(self, error):
+        CTkMessagebox(title="Error", message=f"No se pudieron cargar las categorías: {error}", icon="cancel")
 
     def _open_create_dialog(self):
         self._show_form_dialog(mode="create")
@@ -100,7 +107,13 @@ class CategoryManagementView(ctk.CTkFrame):
 
             if success:
                 CTkMessagebox(title="Éxito", message=message, icon="check")
-                self._load_categories()
+                # Solo se refresca la fila de la categoría guardada
+                if mode == "create":
+                    category = self.category_controller.get_category_by_name(name)
+                else:
+                    category = self.category_controller.get_category_by_id(category_data['id'])
+                if category:
+                    self.table_binding.upsert(category)
                 dialog.destroy()
             else:
                 message_label.configure(text=message)
@@ -126,7 +139,7 @@ class CategoryManagementView(ctk.CTkFrame):
             success, message = self.category_controller.delete_category(category_id)
             if success:
                 CTkMessagebox(title="Éxito", message=message, icon="check")
-                self._load_categories()
+                self.table_binding.remove(category_id)
             else:
                 CTkMessagebox(title="Error", message=message, icon="cancel")
 
@@ -1,6 +1,10 @@
 # app/views/dashboard_view.py
 
 import customtkinter as ctk
+import tkinter.ttk as ttk
+
+# Cada cuánto se actualizan los indicadores (las consultas leen índices y tablas de resumen)
+INDICATORS_POLL_MS = 60000
 
 class DashboardView(ctk.CTkFrame):
     """
@@ -11,8 +15,13 @@ class DashboardView(ctk.CTkFrame):
         self.master = master # Referencia a MainAppView
         self.user_controller = user_controller # El UserController
         self.user_info = user_info # Información del usuario autenticado (ID, nombre, rol)
+        self._indicators_job = None
 
         self._create_widgets()
+        if self.user_info['rol'] in ('administrador', 'gerente'):
+            self._create_sales_summary_widget()
+            self._create_low_stock_widget()
+            self._refresh_indicators()
 
     def _create_widgets(self):
         # Configurar la rejilla del frame para centrar y expandir
@@ -23,22 +32,109 @@ class DashboardView(ctk.CTkFrame):
                                      font=("Arial", 28, "bold"))
         welcome_label.grid(row=1, column=1, pady=20, sticky="nsew")
 
+        # Contenedor para los botones de navegación
+        nav_frame = ctk.CTkFrame(self, fg_color="transparent")
+        nav_frame.grid(row=2, column=1, pady=10)
+
+        # Botón para ir al punto de venta (todos los roles)
+        sales_button = ctk.CTkButton(nav_frame, text="Punto de Venta",
+                                     command=lambda: self.master.show_sales_frame(self.user_info))
+        sales_button.pack(pady=5)
+
         # Botón para ir al panel de administración (solo si es administrador)
         if self.user_info['rol'] == 'administrador':
             from app.views.admin_panel_view import AdminPanelView # Importación tardía
-            admin_button = ctk.CTkButton(self, text="Panel de Administración", 
+            admin_button = ctk.CTkButton(nav_frame, text="Panel de Administración", 
                                         command=lambda: self.master.show_admin_panel_frame(self.user_info))
-            admin_button.grid(row=2, column=1, pady=10)
+            admin_button.pack(pady=5)
 
         # Botón de Cerrar Sesión
         logout_button = ctk.CTkButton(self, text="Cerrar Sesión", command=self._on_logout)
         logout_button.grid(row=3, column=1, pady=20)
 
+    def _create_low_stock_widget(self):
+        low_stock_frame = ctk.CTkFrame(self)
+        low_stock_frame.grid(row=1, column=2, rowspan=2, padx=20, pady=10, sticky="nsew")
+        low_stock_frame.grid_rowconfigure(1, weight=1)
+        low_stock_frame.grid_columnconfigure(0, weight=1)
+
+        self.low_stock_label = ctk.CTkLabel(low_stock_frame, text="Stock bajo: cargando...", font=("Arial", 16, "bold"))
+        self.low_stock_label.grid(row=0, column=0, pady=5, sticky="w", padx=10)
+
+        columns = ("Producto", "Stock", "Mínimo")
+        self.low_stock_table = ttk.Treeview(low_stock_frame, columns=columns, show="headings", height=8)
+        for col in columns: self.low_stock_table.heading(col, text=col)
+        self.low_stock_table.column("Producto", width=200)
+        self.low_stock_table.column("Stock", width=60, anchor="center")
+        self.low_stock_table.column("Mínimo", width=60, anchor="center")
+        self.low_stock_table.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
+
+    def _create_sales_summary_widget(self):
+        summary_frame = ctk.CTkFrame(self)
+        summary_frame.grid(row=1, column=0, rowspan=2, padx=20, pady=10, sticky="nsew")
+        summary_frame.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(summary_frame, text="Ventas de hoy", font=("Arial", 16, "bold")).grid(row=0, column=0, pady=5, padx=10, sticky="w")
+        self.revenue_label = ctk.CTkLabel(summary_frame, text="Recaudado: S/ --", font=("Arial", 20, "bold"))
+        self.revenue_label.grid(row=1, column=0, padx=10, sticky="w")
+        self.tickets_label = ctk.CTkLabel(summary_frame, text="Tickets: --")
+        self.tickets_label.grid(row=2, column=0, padx=10, sticky="w")
+        self.average_label = ctk.CTkLabel(summary_frame, text="Ticket promedio: S/ --")
+        self.average_label.grid(row=3, column=0, padx=10, sticky="w")
+        ctk.CTkLabel(summary_frame, text="Categorías más vendidas:").grid(row=4, column=0, padx=10, pady=(10, 0), sticky="w")
+        self.top_categories_label = ctk.CTkLabel(summary_frame, text="--", justify="left")
+        self.top_categories_label.grid(row=5, column=0, padx=10, pady=(0, 10), sticky="w")
+
+    def _refresh_indicators(self):
+        executor = self.master.executor
+        executor.submit(self, self.master.sale_controller.get_dashboard_summary,
+                        on_success=self._show_sales_summary, on_error=self._on_indicator_error)
+        executor.submit(self, self.master.sale_controller.get_low_stock_report,
+                        on_success=self._show_low_stock, on_error=self._on_indicator_error)
+        self._indicators_job = self.after(INDICATORS_POLL_MS, self._refresh_indicators)
+
+    def _show_sales_summary(self, summary):
+        self.revenue_label.configure(text=f"Recaudado: S/ {summary['total']:.2f}")
+        self.tickets_label.configure(text=f"Tickets: {summary['tickets']}")
+        self.average_label.configure(text=f"Ticket promedio: S/ {summary['ticket_promedio']:.2f}")
+        lines = [f"{cat['nombre_categoria'] or 'Sin categoría'}: S/ {cat['total']:.2f}" for cat in summary['top_categorias']]
+        self.top_categories_label.configure(text="\n".join(lines) if lines else "Sin ventas todavía")
+
+    def _show_low_stock(self, report):
+        total, products = report
+        self.low_stock_label.configure(text=f"Stock bajo: {total} productos",
+                                       text_color="orange" if total else ("gray10", "gray90"))
+        self.low_stock_table.delete(*self.low_stock_table.get_children())
+        for prod in products:
+            self.low_stock_table.insert("", "end", values=(prod['nombre_producto'], prod['stock_actual'], prod['stock_minimo']))
+
+    def _on_indicator_error(self, error):
+        print(f"Error al actualizar los indicadores del dashboard: {error}")
+
+    def _stop_indicators(self):
+        if self._indicators_job is not None:
+            self.after_cancel(self._indicators_job)
+            self._indicators_job = None
+
+    def on_show(self):
+        """Al volver al dashboard (guardado en la caché de pantallas) se actualizan los indicadores."""
+        if self.user_info['rol'] in ('administrador', 'gerente'):
+            self._stop_indicators()
+            self._refresh_indicators()
+
+    def on_hide(self):
+        # Oculto no hace falta seguir consultando la base de datos
+        self._stop_indicators()
+
+    def destroy(self):
+        # El sondeo periódico no debe seguir llamando a una vista ya destruida
+        self._stop_indicators()
+        super().destroy()
+
     def _on_logout(self):
         """
         Maneja el evento de clic en el botón de cerrar sesión.
         Vuelve a la vista de inicio de sesión.
         """
         print("Cerrando sesión...")
-        from app.views.login_view import LoginView # Importación tardía para evitar circular
-        self.master.show_frame(LoginView, self.user_controller) # Volver a la vista de login
\ No newline at end of file
+        self.master.show_login_frame() # Volver a la vista de login (descarta las pantallas guardadas)
\ No newline at end of file
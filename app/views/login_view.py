@@ -7,13 +7,21 @@ class LoginView(ctk.CTkFrame):
     Vista para la pantalla de inicio de sesión.
     Permite al usuario introducir su nombre de usuario y contraseña.
     """
-    def __init__(self, master, controller):
+    cache_frame = False # No se guarda oculta: conservaría la contraseña escrita
+    def __init__(self, master, controller=None):
         super().__init__(master)
         self.master = master # Referencia a la ventana principal (MainAppView)
-        self.controller = controller # El UserController que gestionará la autenticación
+        self._controller = controller # El UserController; si es None se pide a la ventana principal al usarlo
 
         self._create_widgets()
 
+    @property
+    def controller(self):
+        """UserController que gestiona la autenticación (al iniciar la app se crea en segundo plano)."""
+        if self._controller is None:
+            self._controller = self.master.user_controller
+        return self._controller
+
     def _create_widgets(self):
         """
         Crea y posiciona los widgets de la interfaz de inicio de sesión.
@@ -50,8 +58,8 @@ class LoginView(ctk.CTkFrame):
         self.message_label.grid(row=3, column=0, columnspan=2, pady=10)
 
         # Botón de Iniciar Sesión
-        login_button = ctk.CTkButton(login_frame, text="Ingresar", command=self._on_login)
-        login_button.grid(row=4, column=0, columnspan=2, pady=20)
+        self.login_button = ctk.CTkButton(login_frame, text="Ingresar", command=self._on_login)
+        self.login_button.grid(row=4, column=0, columnspan=2, pady=20)
         
         # Asociar la tecla Enter al botón de login
         self.username_entry.bind("<Return>", lambda event: self.password_entry.focus_set())
@@ -62,6 +70,9 @@ class LoginView(ctk.CTkFrame):
         Maneja el evento de clic en el botón de iniciar sesión.
         Envía las credenciales al controlador para su autenticación.
         """
+        if self.login_button.cget("state") == "disabled":
+            return # Ya hay una autenticación en curso (p. ej. Enter pulsado dos veces)
+
         username = self.username_entry.get()
         password = self.password_entry.get()
 
@@ -69,8 +80,17 @@ class LoginView(ctk.CTkFrame):
             self.message_label.configure(text="Por favor, ingrese usuario y contraseña.")
             return
 
-        user_info = self.controller.authenticate_user(username, password)
+        # La autenticación (consulta + bcrypt) se hace en segundo plano para no congelar la ventana
+        self.login_button.configure(state="disabled")
+        self.message_label.configure(text="Verificando...", text_color="gray")
+        self.master.executor.submit(self, self.controller.authenticate_user, username, password,
+                                    on_success=self._on_login_result, on_error=self._on_login_error)
 
+    def _on_login_result(self, user_info):
+        """
+        Recibe (en el hilo de Tk) el resultado de la autenticación.
+        """
+        self.login_button.configure(state="normal")
         if user_info:
             self.message_label.configure(text="Inicio de sesión exitoso!", text_color="green")
             print(f"Usuario {user_info['nombre_usuario']} ha iniciado sesión con rol: {user_info['rol']}")
@@ -81,4 +101,8 @@ class LoginView(ctk.CTkFrame):
         else:
             self.message_label.configure(text="Usuario o contraseña incorrectos.", text_color="red")
             self.password_entry.delete(0, ctk.END) # Limpiar campo de contraseña
-            self.username_entry.focus_set() # Poner el foco en el campo de usuario
\ No newline at end of file
+            self.username_entry.focus_set() # Poner el foco en el campo de usuario
+
+    def _on_login_error(self, error):
+        self.login_button.configure(state="normal")
+        self.message_label.configure(text=f"Error al iniciar sesión: {error}", text_color="red")
\ No newline at end of file
@@ -1,15 +1,26 @@
 # app/views/main_app_view.py
 
+import threading
+from collections import OrderedDict
 import customtkinter as ctk
-# === MEJORA: Centralizar la creación de controladores ===
-from app.controllers.user_controller import UserController 
-from app.controllers.product_controller import ProductController
-from app.controllers.category_controller import CategoryController
+from config.db_config import CACHE_CONFIG
+from app.views.background_executor import BackgroundExecutor
 
 class MainAppView(ctk.CTk):
     """
     Clase principal de la aplicación gráfica.
     Representa la ventana principal y maneja la navegación entre vistas.
+
+    Los controladores (y sus modelos) se crean la primera vez que se usan: la ventana de
+    inicio de sesión se muestra sin esperar a la base de datos, que se conecta y se
+    prepara en segundo plano. Los módulos de administración (productos, categorías) no
+    se importan hasta que se abre el panel de administración.
+
+    Las pantallas ya construidas se ocultan (grid_remove) en lugar de destruirse y se
+    guardan en una caché LRU de CACHE_CONFIG['frame_cache_size'] pantallas. Al volver a
+    una, se llama a su método on_show() (si lo tiene) para que se actualice solo con lo
+    que cambió; on_hide() se llama al ocultarla. Una vista puede excluirse de la caché
+    con el atributo de clase cache_frame = False.
     """
     def __init__(self):
         super().__init__()
@@ -20,37 +31,189 @@ class MainAppView(ctk.CTk):
         ctk.set_appearance_mode("dark") 
         ctk.set_default_color_theme("blue") 
 
-        # === MEJORA: Instanciar todos los controladores aquí para que sean persistentes ===
-        self.user_controller = UserController()
-        self.product_controller = ProductController()
-        self.category_controller = CategoryController()
+        # === MEJORA: Controladores persistentes, creados al primer uso ===
+        self._controllers = {}
+        self._controllers_lock = threading.RLock() # La interfaz y los hilos de trabajo pueden pedirlos a la vez
+
+        # Ejecutor compartido para que las vistas consulten la BD sin bloquear la ventana
+        self.executor = BackgroundExecutor(self)
 
         self.current_frame = None 
+        self._frames = OrderedDict() # Clase de la vista -> (frame, argumentos con que se construyó)
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
         self.show_login_frame() 
 
+        # Conexión, migraciones y precarga de cachés mientras el usuario escribe su contraseña;
+        # al terminar empieza el sondeo periódico de cambios de otras terminales
+        self.executor.submit(None, self._warm_up,
+                             on_success=lambda _: self._schedule_cache_refresh(),
+                             on_error=self._on_warm_up_error)
+
+    def _get_controller(self, name, factory):
+        controller = self._controllers.get(name)
+        if controller is None:
+            with self._controllers_lock:
+                controller = self._controllers.get(name)
+                if controller is None:
+                    controller = self._controllers[name] = factory()
+        return controller
+
+    @property
+    def user_controller(self):
+        def create():
+            from app.controllers.user_controller import UserController
+            return UserController()
+        return self._get_controller('user', create)
+
+    @property
+    def sale_controller(self):
+        def create():
+            from app.controllers.sale_controller import SaleController
+            return SaleController()
+        return self._get_controller('sale', create)
+
+    @property
+    def product_controller(self):
+        def create():
+            from app.controllers.product_controller import ProductController
+            return ProductController()
+        return self._get_controller('product', create)
+
+    @property
+    def category_controller(self):
+        def create():
+            from app.controllers.category_controller import CategoryController
+            return CategoryController()
+        return self._get_controller('category', create)
+
+    @property
+    def sync_controller(self):
+        def create():
+            from app.controllers.sync_controller import SyncController
+            # Escrituras hechas sin conexión con el servidor, que se aplican al reconectar.
+            # Los ajustes de stock solo cargan el controlador de productos si hay alguno pendiente.
+            return SyncController({
+                'venta': self.sale_controller.apply_offline_sale,
+                'ajuste_stock': lambda data: self.product_controller.apply_offline_stock_adjustment(data),
+            })
+        return self._get_controller('sync', create)
+
+    def _warm_up(self):
+        """Se ejecuta en un hilo de trabajo al iniciar: deja lista la base de datos y las cachés del punto de venta."""
+        from app.database.db_connection import get_db_connection
+        from app.database.migrations import run_migrations
+        db = get_db_connection()
+        if not db.connect():
+            raise ConnectionError("No se pudo conectar a la base de datos.")
+        # Verificar (una sola vez) que el esquema esté al día
+        if not run_migrations(db):
+            print("Advertencia: el esquema de la base de datos no está completo.")
+        self.user_controller # Se crea aquí (importa bcrypt) para que "Ingresar" no lo haga en la interfaz
+        # Precarga de la caché de códigos de barras y del índice de autocompletado
+        self.sale_controller.preload_product_cache()
+        self.sale_controller.build_product_index()
+
+    def _on_warm_up_error(self, error):
+        print(f"Error al preparar la base de datos en segundo plano: {error}")
+        # El sondeo igual se programa: reintenta la conexión y aplica el diario sin conexión
+        self._schedule_cache_refresh()
+
     def _on_closing(self):
         print("Cerrando aplicación. Desconectando base de datos...")
-        self.user_controller.disconnect_db() 
+        self.executor.shutdown()
+        from app.database.db_connection import get_db_connection
+        get_db_connection().disconnect()
         self.destroy() 
 
+    def _schedule_cache_refresh(self):
+        self.after(CACHE_CONFIG['refresh_interval_ms'], self._refresh_caches)
+
+    def _refresh_caches(self):
+        def refresh():
+            # Primero lo vendido sin conexión, para que las cachés ya reflejen ese stock
+            if self.sync_controller.pending_count():
+                self.sync_controller.replay_pending()
+            self.sale_controller.refresh_product_cache()
+            self.sale_controller.refresh_product_index()
+            # Las categorías solo se sincronizan si ya se abrió la administración
+            if 'category' in self._controllers:
+                self.category_controller.sync_categories()
+        # El siguiente sondeo se programa al terminar este, así nunca se solapan
+        self.executor.submit(None, refresh,
+                             on_success=lambda _: self._schedule_cache_refresh(),
+                             on_error=lambda _: self._schedule_cache_refresh())
+
     def show_frame(self, new_frame_class, *args, **kwargs):
         if self.current_frame:
-            self.current_frame.destroy() 
-        
-        # === MEJORA: Los controladores se pasan desde aquí ===
-        self.current_frame = new_frame_class(self, *args, **kwargs) 
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-        self.current_frame.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
-        self.current_frame.tkraise() 
+            self._hide_frame(self.current_frame)
+
+        # === MEJORA: Se reutiliza la pantalla si ya estaba construida con los mismos argumentos ===
+        frame = None
+        cached = self._frames.pop(new_frame_class, None)
+        if cached is not None:
+            frame, built_with = cached
+            if built_with != (args, kwargs):
+                # Otro usuario u otros controladores: la pantalla guardada ya no sirve
+                self._drop_frame(frame)
+                frame = None
+
+        if frame is None:
+            # === MEJORA: Los controladores se pasan desde aquí ===
+            frame = new_frame_class(self, *args, **kwargs)
+            self.grid_rowconfigure(0, weight=1)
+            self.grid_columnconfigure(0, weight=1)
+            frame.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
+        else:
+            frame.grid() # Vuelve a la posición que tenía antes de grid_remove()
+            if hasattr(frame, 'on_show'):
+                frame.on_show()
+        frame.tkraise()
+        self.current_frame = frame
+
+        if getattr(new_frame_class, 'cache_frame', True):
+            self._frames[new_frame_class] = (frame, (args, kwargs))
+            # Límite de memoria: se destruyen las pantallas usadas hace más tiempo
+            while len(self._frames) > CACHE_CONFIG['frame_cache_size']:
+                _, (oldest, _) = self._frames.popitem(last=False)
+                self._drop_frame(oldest)
+
+    def _is_cached(self, frame):
+        return any(cached is frame for cached, _ in self._frames.values())
+
+    def _hide_frame(self, frame):
+        if not self._is_cached(frame):
+            self._drop_frame(frame)
+            return
+        if hasattr(frame, 'on_hide'):
+            frame.on_hide()
+        frame.grid_remove()
+
+    def _drop_frame(self, frame):
+        # El trabajo pendiente de la vista que se destruye ya no es necesario
+        self.executor.cancel_owner(frame)
+        frame.destroy()
+
+    def clear_frame_cache(self):
+        """Destruye todas las pantallas guardadas (p. ej. al cerrar sesión)."""
+        frames = [frame for frame, _ in self._frames.values()]
+        self._frames.clear()
+        for frame in frames:
+            if frame is self.current_frame:
+                self.current_frame = None
+            self._drop_frame(frame)
 
     def show_login_frame(self):
         from app.views.login_view import LoginView
-        # Pasa solo el controlador que necesita
-        self.show_frame(LoginView, self.user_controller)
+        # Las pantallas del usuario anterior no deben quedar guardadas tras cerrar sesión
+        self.clear_frame_cache()
+        # La vista pide el UserController al autenticar, cuando el arranque en segundo plano ya lo creó
+        self.show_frame(LoginView)
 
     def show_admin_panel_frame(self, user_info):
         from app.views.admin_panel_view import AdminPanelView
         # Pasa todos los controladores y la info del usuario al panel de admin
-        self.show_frame(AdminPanelView, user_info, self.user_controller, self.product_controller, self.category_controller)
\ No newline at end of file
+        self.show_frame(AdminPanelView, user_info, self.user_controller, self.product_controller, self.category_controller)
+
+    def show_sales_frame(self, user_info):
+        from app.views.sales_view import SalesView
+        self.show_frame(SalesView, self.sale_controller, self.user_controller, user_info)
@@ -3,8 +3,9 @@
 import customtkinter as ctk
 from CTkMessagebox import CTkMessagebox
 import tkinter.ttk as ttk
+from tkinter import filedialog
 from app.controllers.product_controller import ProductController
-from app.models.category_model import CategoryModel
+from app.views.table_binding import TreeviewBinding
 
 class ProductManagementView(ctk.CTkFrame):
     def __init__(self, master, product_controller: ProductController, user_controller, user_info): 
@@ -13,20 +14,36 @@ class ProductManagementView(ctk.CTkFrame):
         self.product_controller = product_controller
         self.user_controller = user_controller 
         self.user_info = user_info 
-        self.category_model = CategoryModel()
+
+        # Estado de la paginación: las páginas se piden a medida que el usuario se desplaza
+        self.page_size = 200
+        self._next_cursor = None
+        self._has_more = False
+        self._loading_page = False
+        self._total_estimate = 0
+        self._search_job = None # after() pendiente de la búsqueda (debounce)
+        self._table_tasks = [] # Cargas de páginas y búsquedas en curso (no incluye la importación de CSV)
+        self._search_term = ""
+        self._high_water = None # Marca de agua de la primera página, para refrescar solo los cambios
 
         self._create_widgets()
         self._load_products()
 
     def _create_widgets(self):
-        self.grid_rowconfigure(1, weight=1)
+        self.grid_rowconfigure(2, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
         title_label = ctk.CTkLabel(self, text="Gestión de Productos", font=("Arial", 24, "bold"))
         title_label.grid(row=0, column=0, pady=20, sticky="ew")
 
+        # Búsqueda por nombre, descripción o código: se consulta al dejar de escribir
+        self.search_entry = ctk.CTkEntry(self, placeholder_text="Buscar por nombre, descripción o código de barras")
+        self.search_entry.grid(row=1, column=0, padx=20, pady=(0, 5), sticky="ew")
+        self.search_entry.bind("<KeyRelease>", lambda event: self._schedule_search())
+        self.search_entry.bind("<Return>", lambda event: self._run_search())
+
         table_frame = ctk.CTkFrame(self)
-        table_frame.grid(row=1, column=0, padx=20, pady=10, sticky="nsew")
+        table_frame.grid(row=2, column=0, padx=20, pady=10, sticky="nsew")
         table_frame.grid_rowconfigure(0, weight=1)
         table_frame.grid_columnconfigure(0, weight=1)
         
@@ -35,22 +52,172 @@ class ProductManagementView(ctk.CTkFrame):
         self.product_table.grid(row=0, column=0, sticky="nsew")
         
         for col in columns: self.product_table.heading(col, text=col)
+        self.table_binding = TreeviewBinding(self.product_table, self._product_row_values)
+
+        # Al acercarse al final de la tabla se carga la siguiente página
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.product_table.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        def on_table_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) > 0.9:
+                self._load_next_page()
+        self.product_table.configure(yscrollcommand=on_table_scroll)
+
+        self.count_label = ctk.CTkLabel(table_frame, text="")
+        self.count_label.grid(row=1, column=0, columnspan=2, sticky="e")
 
         button_frame = ctk.CTkFrame(self, fg_color="transparent")
-        button_frame.grid(row=2, column=0, pady=20)
+        button_frame.grid(row=3, column=0, pady=20)
         ctk.CTkButton(button_frame, text="Crear Producto", command=self._open_create_product_dialog).pack(side="left", padx=5)
         ctk.CTkButton(button_frame, text="Editar Producto", command=self._open_edit_product_dialog).pack(side="left", padx=5)
+        self.import_button = ctk.CTkButton(button_frame, text="Importar CSV", command=self._import_products_csv)
+        self.import_button.pack(side="left", padx=5)
         ctk.CTkButton(button_frame, text="Volver al Panel", command=self._go_back_to_admin_panel).pack(side="left", padx=5)
 
     def _load_products(self):
-        for item in self.product_table.get_children(): self.product_table.delete(item)
-        products = self.product_controller.get_products_for_display()
-        for prod in products:
-            self.product_table.insert("", "end", values=(
-                prod['id'], prod['codigo_barras'], prod['nombre_producto'], 
-                f"{prod['stock_actual']}", f"{prod['precio_venta']:.2f}", 
-                prod['categoria'], "Sí" if prod['activo'] else "No"
-            ))
+        """Vacía la tabla y vuelve a cargar desde la primera página."""
+        self._cancel_table_tasks() # Descarta páginas de una carga anterior aún en curso
+        self.table_binding.clear()
+        self._search_term = ""
+        self.search_entry.delete(0, ctk.END)
+        self._next_cursor = None
+        self._has_more = True
+        self._loading_page = False
+        self._high_water = None
+        self._load_next_page()
+        self._submit_table_task(self.product_controller.estimate_product_count,
+                                    on_success=self._on_count_estimated)
+
+    def _load_next_page(self):
+        if self._loading_page or not self._has_more:
+            return
+        self._loading_page = True
+        self._submit_table_task(self._fetch_products_page, self._next_cursor,
+                                    on_success=self._append_products_page, on_error=self._on_load_error)
+
+    def _submit_table_task(self, func, *args, **kwargs):
+        """Pide datos para la tabla en segundo plano; _cancel_table_tasks() los descarta sin tocar otras tareas."""
+        self._table_tasks = [task for task in self._table_tasks if task.future is not None and not task.future.done()]
+        task = self.master.executor.submit(self, func, *args, **kwargs)
+        self._table_tasks.append(task)
+        return task
+
+    def _cancel_table_tasks(self):
+        # Solo las cargas de la tabla: una importación de CSV en curso debe terminar y avisar
+        for task in self._table_tasks:
+            task.cancel()
+        self._table_tasks = []
+
+    def _fetch_products_page(self, cursor):
+        """
+        Se ejecuta en un hilo de trabajo. Antes de la primera página se toma la marca de agua,
+        así al volver a la vista se piden solo los productos modificados desde entonces.
+        """
+        high_water = None
+        if cursor is None:
+            _, high_water = self.product_controller.get_product_changes_for_display(None)
+        products, next_cursor = self.product_controller.get_products_page_for_display(cursor, self.page_size)
+        return products, next_cursor, high_water
+
+    def _append_products_page(self, result):
+        products, next_cursor, high_water = result
+        if high_water is not None:
+            self._high_water = high_water
+        self._loading_page = False
+        self._next_cursor = next_cursor
+        self._has_more = next_cursor is not None
+        self.table_binding.append(products)
+        self._update_count_label()
+
+    def on_show(self):
+        """
+        Al volver a la vista (guardada en la caché de pantallas) no se recarga la tabla: se
+        piden solo los productos modificados desde la última lectura, por cualquier terminal.
+        """
+        if self._search_term:
+            self._search_term = "" # Fuerza a repetir la búsqueda en curso
+            self._run_search()
+            return
+        if self._high_water is None:
+            self._load_products()
+            return
+        self._submit_table_task(self.product_controller.get_product_changes_for_display, self._high_water,
+                                    on_success=self._apply_product_changes, on_error=self._on_load_error)
+
+    def _apply_product_changes(self, result):
+        products, high_water = result
+        self._high_water = high_water
+        for product in products:
+            # Igual que en _refresh_product_row: los nuevos llegan con la última página si aún faltan
+            if self.table_binding.contains(product['id']) or not self._has_more:
+                self.table_binding.upsert(product)
+        self._update_count_label()
+
+    def _schedule_search(self, delay_ms=300):
+        """Espera a que el usuario deje de escribir antes de consultar (una consulta por pausa, no por tecla)."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(delay_ms, self._run_search)
+
+    def _run_search(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        term = self.search_entry.get().strip()
+        if term == self._search_term:
+            return
+        self._search_term = term
+        if not term:
+            self._load_products() # Sin texto se vuelve al listado paginado
+            return
+        # Descarta búsquedas y páginas anteriores que sigan en curso para que no pisen este resultado
+        self._cancel_table_tasks()
+        self._has_more = False
+        self._loading_page = False
+        self._submit_table_task(self.product_controller.search_products_for_display, term,
+                                    on_success=self._show_search_results, on_error=self._on_load_error)
+
+    def _show_search_results(self, products):
+        self.table_binding.sync(products)
+        self._update_count_label()
+
+    def _on_count_estimated(self, total):
+        self._total_estimate = total
+        self._update_count_label()
+
+    def _update_count_label(self):
+        if self._search_term:
+            self.count_label.configure(text=f"{len(self.table_binding)} resultados para '{self._search_term}'")
+            return
+        loaded = len(self.table_binding)
+        total = max(self._total_estimate, loaded)
+        self.count_label.configure(text=f"Mostrando {loaded} de ~{total} productos")
+
+    @staticmethod
+    def _product_row_values(prod):
+        return (
+            prod['id'], prod['codigo_barras'], prod['nombre_producto'], 
+            f"{prod['stock_actual']}", f"{prod['precio_venta']:.2f}", 
+            prod['categoria'], "Sí" if prod['activo'] else "No"
+        )
+
+    def _refresh_product_row(self, product_id=None, barcode=None):
+        """Vuelve a leer un solo producto y actualiza (o añade) solo su fila."""
+        if product_id is not None:
+            product = self.product_controller.get_product_for_display(product_id)
+        else:
+            product = self.product_controller.get_product_for_display_by_barcode(barcode)
+        if not product:
+            return
+        # Un producto nuevo tiene el id más alto: si faltan páginas por cargar, llegará con la última
+        if not self.table_binding.contains(product['id']) and self._has_more:
+            return
+        self.table_binding.upsert(product)
+        self._update_count_label()
+
+    def _on_load_error(self, error):
+        self._loading_page = False
+        CTkMessagebox(title="Error", message=f"No se pudieron cargar los productos: {error}", icon="cancel")
 
     def _open_create_product_dialog(self):
         self._show_product_form_dialog(mode="create")
@@ -84,8 +251,7 @@ class ProductManagementView(ctk.CTkFrame):
             if label_text == "Categoría:":
                 # === CORRECCIÓN AQUÍ ===
                 # Nos aseguramos de que solo nombres de categoría válidos (no nulos o vacíos) se añadan a la lista.
-                all_cats = self.category_model.get_all_categories()
-                valid_categories = [cat['nombre_categoria'] for cat in all_cats if cat and cat.get('nombre_categoria')]
+                valid_categories = self.product_controller.get_category_names()
                 entry = ctk.CTkComboBox(dialog, values=valid_categories, width=250)
                 if not valid_categories:
                     entry.set("No hay categorías") # Mensaje si no hay categorías
@@ -149,7 +315,10 @@ class ProductManagementView(ctk.CTkFrame):
             
             if success:
                 CTkMessagebox(title="Éxito", message=message, icon="check")
-                self._load_products()
+                if mode == "create":
+                    self._refresh_product_row(barcode=form_data["barcode"])
+                else:
+                    self._refresh_product_row(product_id=product_data['id'])
                 dialog.destroy()
             else:
                 message_label.configure(text=message)
@@ -159,5 +328,30 @@ class ProductManagementView(ctk.CTkFrame):
         ctk.CTkButton(button_frame, text="Guardar", command=on_submit).pack(side="left", padx=10)
         ctk.CTkButton(button_frame, text="Cancelar", command=dialog.destroy).pack(side="left", padx=10)
 
+    def _import_products_csv(self):
+        file_path = filedialog.askopenfilename(parent=self, title="Seleccionar catálogo CSV",
+                                               filetypes=[("Archivos CSV", "*.csv"), ("Todos los archivos", "*.*")])
+        if not file_path:
+            return
+        self.import_button.configure(state="disabled", text="Importando...")
+        self.master.executor.submit(self, self.product_controller.import_products_from_csv, file_path,
+                                    on_success=self._on_import_finished, on_error=self._on_import_error)
+
+    def _on_import_finished(self, result):
+        success, message, rejected = result
+        self.import_button.configure(state="normal", text="Importar CSV")
+        if rejected:
+            # Solo mostramos los primeros rechazos para no desbordar el mensaje
+            details = "\n".join(f"Línea {r['linea']} ({r['codigo_barras']}): {r['motivo']}" for r in rejected[:10])
+            if len(rejected) > 10:
+                details += f"\n... y {len(rejected) - 10} más."
+            message = f"{message}\n\n{details}"
+        CTkMessagebox(title="Importación" if success else "Error", message=message, icon="check" if success else "warning")
+        self._load_products()
+
+    def _on_import_error(self, error):
+        self.import_button.configure(state="normal", text="Importar CSV")
+        CTkMessagebox(title="Error", message=f"Fallo al importar el CSV: {error}", icon="cancel")
+
     def _go_back_to_admin_panel(self):
         self.master.show_admin_panel_frame(self.user_info)
\ No newline at end of file
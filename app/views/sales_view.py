@@ -0,0 +1,231 @@
+# app/views/sales_view.py
+
+import customtkinter as ctk
+from CTkMessagebox import CTkMessagebox
+import tkinter as tk
+import tkinter.ttk as ttk
+
+class SalesView(ctk.CTkFrame):
+    """
+    Vista del punto de venta (caja): escaneo de productos, carrito y cobro.
+    """
+    def __init__(self, master, sale_controller, user_controller, user_info):
+        super().__init__(master)
+        self.master = master
+        self.sale_controller = sale_controller
+        self.user_controller = user_controller
+        self.user_info = user_info
+        self._suggestions = [] # Productos mostrados en la lista de autocompletado
+        self._checking_out = False # Mientras se cobra, el carrito no se puede modificar
+
+        self._create_widgets()
+        self._refresh_cart()
+
+    def _create_widgets(self):
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        title_label = ctk.CTkLabel(self, text="Punto de Venta", font=("Arial", 24, "bold"))
+        title_label.grid(row=0, column=0, pady=20, sticky="ew")
+
+        # Entrada del lector de códigos de barras
+        scan_frame = ctk.CTkFrame(self, fg_color="transparent")
+        scan_frame.grid(row=1, column=0, padx=20, pady=5, sticky="ew")
+        scan_frame.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(scan_frame, text="Código de Barras:").grid(row=0, column=0, padx=(0, 10))
+        self.barcode_entry = ctk.CTkEntry(scan_frame, placeholder_text="Escanee o escriba el código")
+        self.barcode_entry.grid(row=0, column=1, sticky="ew")
+        self.barcode_entry.bind("<Return>", lambda event: self._on_scan())
+        self.barcode_entry.bind("<KeyRelease>", self._on_entry_key)
+        self.barcode_entry.bind("<Down>", lambda event: self._focus_suggestions())
+        self.message_label = ctk.CTkLabel(scan_frame, text="", text_color="red")
+        self.message_label.grid(row=1, column=0, columnspan=2, sticky="w")
+
+        # Autocompletado por nombre para productos sin código (a granel, frutas...); se muestra solo con sugerencias
+        self.suggestion_list = tk.Listbox(scan_frame, height=6, activestyle="dotbox")
+        self.suggestion_list.grid(row=2, column=1, sticky="ew")
+        self.suggestion_list.grid_remove()
+        self.suggestion_list.bind("<Return>", lambda event: self._pick_suggestion())
+        self.suggestion_list.bind("<Double-Button-1>", lambda event: self._pick_suggestion())
+        self.suggestion_list.bind("<Escape>", lambda event: self._hide_suggestions())
+
+        table_frame = ctk.CTkFrame(self)
+        table_frame.grid(row=2, column=0, padx=20, pady=10, sticky="nsew")
+        table_frame.grid_rowconfigure(0, weight=1)
+        table_frame.grid_columnconfigure(0, weight=1)
+
+        columns = ("Código", "Producto", "Cantidad", "P. Unitario", "Subtotal")
+        self.cart_table = ttk.Treeview(table_frame, columns=columns, show="headings")
+        for col in columns: self.cart_table.heading(col, text=col)
+        self.cart_table.column("Producto", width=300)
+        self.cart_table.grid(row=0, column=0, sticky="nsew")
+
+        bottom_frame = ctk.CTkFrame(self, fg_color="transparent")
+        bottom_frame.grid(row=3, column=0, padx=20, pady=10, sticky="ew")
+        bottom_frame.grid_columnconfigure(0, weight=1)
+        self.total_label = ctk.CTkLabel(bottom_frame, text="Total: S/ 0.00", font=("Arial", 22, "bold"))
+        self.total_label.grid(row=0, column=0, sticky="w")
+        self.payment_combo = ctk.CTkComboBox(bottom_frame, values=["Efectivo", "Tarjeta", "Yape/Plin"], width=150)
+        self.payment_combo.set("Efectivo")
+        self.payment_combo.grid(row=0, column=1, padx=10)
+
+        button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        button_frame.grid(row=4, column=0, pady=10)
+        self.remove_button = ctk.CTkButton(button_frame, text="Quitar Ítem", command=self._remove_selected_line)
+        self.remove_button.pack(side="left", padx=5)
+        self.cancel_button = ctk.CTkButton(button_frame, text="Cancelar Venta", command=self._cancel_sale)
+        self.cancel_button.pack(side="left", padx=5)
+        self.checkout_button = ctk.CTkButton(button_frame, text="Cobrar", command=self._on_checkout)
+        self.checkout_button.pack(side="left", padx=5)
+        self.back_button = ctk.CTkButton(button_frame, text="Volver al Dashboard", command=self._go_back_to_dashboard)
+        self.back_button.pack(side="left", padx=5)
+
+        self.barcode_entry.focus_set()
+
+    def _refresh_cart(self):
+        for item in self.cart_table.get_children(): self.cart_table.delete(item)
+        for line in self.sale_controller.get_cart_lines():
+            self.cart_table.insert("", "end", iid=line['codigo_barras'], values=(
+                line['codigo_barras'], line['nombre_producto'], line['cantidad'],
+                f"{line['precio_unitario']:.2f}", f"{line['subtotal']:.2f}"
+            ))
+        self.total_label.configure(text=f"Total: S/ {self.sale_controller.get_cart_total():.2f}")
+
+    def _on_entry_key(self, event):
+        if event.keysym in ("Return", "Down", "Up", "Escape"):
+            return
+        # El índice está en memoria: se puede consultar en cada tecla sin ir a la BD
+        self._suggestions = self.sale_controller.suggest_products(self.barcode_entry.get())
+        if not self._suggestions:
+            self._hide_suggestions()
+            return
+        self.suggestion_list.delete(0, tk.END)
+        for product in self._suggestions:
+            self.suggestion_list.insert(tk.END, f"{product['nombre_producto']}  ({product['codigo_barras']})  S/ {product['precio_venta']:.2f}")
+        self.suggestion_list.grid()
+
+    def _focus_suggestions(self):
+        if self._suggestions:
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, tk.END)
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+
+    def _pick_suggestion(self):
+        if self._checking_out:
+            return
+        selection = self.suggestion_list.curselection()
+        if not selection:
+            return
+        barcode = self._suggestions[selection[0]]['codigo_barras']
+        self.barcode_entry.delete(0, ctk.END)
+        self._hide_suggestions()
+        self.barcode_entry.focus_set()
+        self._add_by_barcode(barcode)
+
+    def _hide_suggestions(self):
+        self._suggestions = []
+        self.suggestion_list.delete(0, tk.END)
+        self.suggestion_list.grid_remove()
+
+    def _on_scan(self):
+        if self._checking_out:
+            return
+        barcode = self.barcode_entry.get().strip()
+        self.barcode_entry.delete(0, ctk.END)
+        self._hide_suggestions()
+        if not barcode:
+            return
+        self._add_by_barcode(barcode)
+
+    def _add_by_barcode(self, barcode):
+        # Si el producto está en la caché en memoria se muestra al instante, sin ir a la BD
+        product, error = self.sale_controller.find_product_for_sale(barcode, cache_only=True)
+        if product or error:
+            self._on_product_found((product, error))
+            return
+        # Si no, la búsqueda va a un hilo de trabajo; el carrito solo se modifica en el hilo de Tk
+        self.master.executor.submit(self, self.sale_controller.find_product_for_sale, barcode,
+                                    on_success=self._on_product_found, on_error=self._on_task_error)
+
+    def _on_product_found(self, result):
+        if self._checking_out:
+            # La búsqueda terminó durante el cobro: no se agrega a una venta que ya se está guardando
+            self.message_label.configure(text="Producto no agregado: se estaba cobrando la venta. Escanéelo de nuevo.",
+                                         text_color="red")
+            return
+        product, error = result
+        if error:
+            self.message_label.configure(text=error, text_color="red")
+            return
+        success, message = self.sale_controller.add_to_cart(product)
+        self.message_label.configure(text=message, text_color="green" if success else "red")
+        self._refresh_cart()
+
+    def _remove_selected_line(self):
+        if self._checking_out:
+            return
+        selected_item = self.cart_table.focus()
+        if not selected_item:
+            CTkMessagebox(title="Error", message="Seleccione un ítem para quitar.", icon="warning")
+            return
+        self.sale_controller.remove_from_cart(selected_item)
+        self._refresh_cart()
+
+    def on_show(self):
+        """Al volver a la caja (guardada en la caché de pantallas) se redibuja el carrito y se enfoca el lector."""
+        self._hide_suggestions()
+        self.message_label.configure(text="")
+        self._refresh_cart()
+        self.barcode_entry.focus_set()
+
+    def _cancel_sale(self):
+        if self._checking_out:
+            return
+        self.sale_controller.clear_cart()
+        self.message_label.configure(text="")
+        self._refresh_cart()
+
+    def _on_checkout(self):
+        if self._checking_out:
+            return
+        # Las líneas se copian aquí, en el hilo de Tk: el hilo de trabajo nunca lee ni vacía el carrito
+        lines = self.sale_controller.get_cart_lines()
+        # Se bloquea todo lo que modifica el carrito mientras la venta se guarda
+        self._set_checking_out(True)
+        self.master.executor.submit(self, self.sale_controller.checkout, self.user_info['id'], self.payment_combo.get(), lines,
+                                    on_success=self._on_checkout_finished, on_error=self._on_checkout_error)
+
+    def _set_checking_out(self, checking_out):
+        self._checking_out = checking_out
+        if checking_out:
+            self._hide_suggestions() # Antes de deshabilitar la lista: deshabilitada no se puede vaciar
+        state = "disabled" if checking_out else "normal"
+        for widget in (self.checkout_button, self.remove_button, self.cancel_button, self.back_button,
+                       self.barcode_entry, self.payment_combo):
+            widget.configure(state=state)
+        self.suggestion_list.configure(state=state)
+
+    def _on_checkout_finished(self, result):
+        success, message, sale_id = result
+        self._set_checking_out(False)
+        if success:
+            # Se vacía en el hilo de Tk; durante el cobro nada pudo cambiarlo
+            self.sale_controller.clear_cart()
+            CTkMessagebox(title="Venta registrada", message=message, icon="check")
+            self.message_label.configure(text="")
+        else:
+            CTkMessagebox(title="Error", message=message, icon="cancel")
+        self._refresh_cart()
+        self.barcode_entry.focus_set()
+
+    def _on_checkout_error(self, error):
+        self._set_checking_out(False)
+        self._on_task_error(error)
+
+    def _on_task_error(self, error):
+        self.message_label.configure(text=f"Error: {error}", text_color="red")
+
+    def _go_back_to_dashboard(self):
+        from app.views.dashboard_view import DashboardView
+        self.master.show_frame(DashboardView, self.user_controller, self.user_info)
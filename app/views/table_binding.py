@@ -0,0 +1,65 @@
+# app/views/table_binding.py
+
+class TreeviewBinding:
+    """
+    Enlaza un ttk.Treeview con una lista de filas (diccionarios) identificadas por su id.
+    Cada fila se inserta con iid = str(id), así que las altas, cambios y bajas se aplican
+    solo sobre las filas afectadas en lugar de vaciar y rellenar toda la tabla.
+    `to_values` convierte una fila en la tupla de valores de las columnas.
+    """
+    def __init__(self, tree, to_values, key='id'):
+        self.tree = tree
+        self.to_values = to_values
+        self.key = key
+        self._values = {} # iid -> tupla mostrada, para no tocar las filas que no cambiaron
+
+    def _iid(self, row):
+        return str(row[self.key])
+
+    def sync(self, rows):
+        """
+        Deja la tabla igual que `rows` aplicando solo las diferencias con lo que ya se muestra:
+        borra las filas que faltan, actualiza las que cambiaron e inserta las nuevas.
+        """
+        wanted = [self._iid(row) for row in rows]
+        wanted_set = set(wanted)
+        for iid in [iid for iid in self._values if iid not in wanted_set]:
+            self.remove(iid)
+        for row in rows:
+            self.upsert(row)
+        # Solo se reordena si el orden recibido difiere del actual (poco habitual)
+        if list(self.tree.get_children()) != wanted:
+            for index, iid in enumerate(wanted):
+                self.tree.move(iid, "", index)
+
+    def append(self, rows):
+        """Añade una página de filas al final; las que ya estaban solo se actualizan."""
+        for row in rows:
+            self.upsert(row)
+
+    def upsert(self, row, index="end"):
+        """Inserta la fila o, si ya existe, actualiza sus valores solo cuando cambiaron."""
+        iid = self._iid(row)
+        values = tuple(self.to_values(row))
+        current = self._values.get(iid)
+        if current is None:
+            self.tree.insert("", index, iid=iid, values=values)
+        elif current != values:
+            self.tree.item(iid, values=values)
+        self._values[iid] = values
+
+    def remove(self, key):
+        """Quita la fila con ese id (si está en la tabla)."""
+        iid = str(key)
+        if self._values.pop(iid, None) is not None:
+            self.tree.delete(iid)
+
+    def contains(self, key):
+        return str(key) in self._values
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
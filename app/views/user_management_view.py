@@ -3,6 +3,7 @@
 import customtkinter as ctk
 from CTkMessagebox import CTkMessagebox
 from app.views.base_view import BaseView
+from app.views.table_binding import TreeviewBinding
 import tkinter.ttk as ttk
 
 class UserManagementView(BaseView):
@@ -31,6 +32,8 @@ class UserManagementView(BaseView):
         self.user_table.heading("Rol", text="Rol")
         self.user_table.heading("Activo", text="Activo")
         self.user_table.grid(row=0, column=0, sticky="nsew")
+        self.table_binding = TreeviewBinding(self.user_table, lambda user: (
+            user.get('id'), user.get('nombre_usuario'), user.get('rol'), user.get('activo')))
         
         self.user_table.bind("<<TreeviewSelect>>", self._on_user_select)
 
@@ -45,14 +48,21 @@ class UserManagementView(BaseView):
         ctk.CTkButton(self.button_frame, text="Volver al Panel", command=self._go_back_to_admin_panel).pack(side="left", padx=10)
 
     def load_users(self):
-        for item in self.user_table.get_children():
-            self.user_table.delete(item)
-        users = self.controller.get_all_users_for_display()
-        for user in users:
-            self.user_table.insert("", "end", values=(
-                user.get('id'), user.get('nombre_usuario'), 
-                user.get('rol'), user.get('activo')
-            ))
+        self.master.executor.submit(self, self.controller.get_all_users_for_display,
+                                    on_success=self.table_binding.sync, on_error=self._on_load_error)
+
+    def on_show(self):
+        # La tabla solo aplica las diferencias con lo que ya muestra
+        self.load_users()
+
+    def _refresh_user_row(self, user_id=None, username=None):
+        """Vuelve a leer un solo usuario y actualiza (o añade) solo su fila."""
+        user = self.controller.get_user_for_display(user_id=user_id, username=username)
+        if user:
+            self.table_binding.upsert(user)
+
+    def _on_load_error(self, error):
+        CTkMessagebox(title="Error", message=f"No se pudieron cargar los usuarios: {error}", icon="cancel")
 
     def _on_user_select(self, event):
         selected_item = self.user_table.focus()
@@ -121,7 +131,10 @@ class UserManagementView(BaseView):
 
             if success:
                 CTkMessagebox(title="Éxito", message=message, icon="check")
-                self.load_users()
+                if mode == "create":
+                    self._refresh_user_row(username=username)
+                else:
+                    self._refresh_user_row(user_id=self.selected_user_id)
                 dialog.destroy()
             else:
                 message_label.configure(text=message)
@@ -141,7 +154,7 @@ class UserManagementView(BaseView):
             return
         if self.controller.set_user_active_status(self.selected_user_id, False): 
             CTkMessagebox(title="Éxito", message=f"Usuario ID {self.selected_user_id} desactivado.", icon="check")
-            self.load_users()
+            self._refresh_user_row(user_id=self.selected_user_id)
         else:
             CTkMessagebox(title="Error", message="Fallo al desactivar el usuario.", icon="cancel")
 
@@ -151,7 +164,7 @@ class UserManagementView(BaseView):
             return
         if self.controller.set_user_active_status(self.selected_user_id, True): 
             CTkMessagebox(title="Éxito", message=f"Usuario ID {self.selected_user_id} activado.", icon="check")
-            self.load_users()
+            self._refresh_user_row(user_id=self.selected_user_id)
         else:
             CTkMessagebox(title="Error", message="Fallo al activar el usuario.", icon="cancel")
 
@@ -0,0 +1,270 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks reproducibles de modelos y controladores.
+
+Llena una base de datos de pruebas (¡nunca la de producción!) con catálogos de distintos
+tamaños y mide cada operación pública importante: búsqueda por código de barras, listados,
+alta/edición de productos, login, resolución de categorías, cobro, reportes...
+Los resultados se guardan en JSON para compararlos entre ejecuciones:
+
+    python -m benchmarks.run_benchmarks --sizes 1000,100000 --output resultados.json
+    python -m benchmarks.run_benchmarks --sizes 1000 --compare resultados.json --threshold 0.15
+
+Con --compare el proceso termina con código 1 si alguna operación empeoró más que el umbral,
+para poder usarlo como control antes de aceptar un cambio de rendimiento.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+from config.db_config import DB_BACKEND, DB_CONFIG, SQLITE_CONFIG
+
+SEED_CHUNK = 5000
+BENCH_PASSWORD = "bench123"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de modelos y controladores del POS.")
+    parser.add_argument("--sizes", default="1000,100000",
+                        help="Tamaños de catálogo separados por coma (p. ej. 1000,100000,1000000).")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="Repeticiones de las operaciones rápidas (las lentas usan menos).")
+    parser.add_argument("--database", default="pos_benchmark",
+                        help="Base de datos de pruebas que se vacía y se llena (no usar la de producción). "
+                             "Con el motor SQLite es el nombre del archivo, sin extensión.")
+    parser.add_argument("--output", default="bench_results.json", help="Archivo JSON de resultados.")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior contra el que comparar.")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Empeoramiento relativo de la mediana que se considera regresión (0.15 = 15 %%).")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla aleatoria (para repetir la misma carga).")
+    return parser.parse_args(argv)
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    count = len(ordered)
+    def percentile(fraction):
+        return ordered[min(count - 1, int(round(fraction * (count - 1))))]
+    return {
+        'iterations': count,
+        'mean_ms': sum(ordered) / count,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'min_ms': ordered[0],
+        'max_ms': ordered[-1],
+    }
+
+def measure(func, iterations, setup=None, warmup=1):
+    """Ejecuta func() `iterations` veces y retorna el resumen de latencias; setup() no se cronometra."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+class BenchmarkSuite:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.product_count = 0
+        self.category_names = [f"Categoria {i:03d}" for i in range(50)]
+        self.usernames = [f"bench_user_{i}" for i in range(5)]
+        self._new_barcode = 0
+
+    def setup_database(self):
+        # Se importan después de cambiar el nombre de la base de datos
+        from app.database.db_connection import get_db_connection
+        from app.database.migrations import run_migrations
+        self.db = get_db_connection()
+        if not self.db.connect():
+            sys.exit(f"No se pudo conectar a la base de datos de pruebas '{self.args.database}'.")
+        if not run_migrations(self.db):
+            sys.exit("No se pudo preparar el esquema de la base de datos de pruebas.")
+        # Se vacía en orden inverso a las claves foráneas y se reinician los autoincrementos,
+        # para que cada corrida tenga los mismos ids (get_product_by_id los elige al azar de 1 a N)
+        for table in ("DetalleVentas", "Ventas", "ResumenVentasCategoria", "ResumenVentasCajero",
+                      "Productos", "Categorias", "Usuarios"):
+            self.db.execute_query(f"DELETE FROM {table}")
+            if self.db.dialect == 'sqlite':
+                self.db.execute_query("DELETE FROM sqlite_sequence WHERE name = %s", (table,))
+            else:
+                self.db.execute_query(f"ALTER TABLE {table} AUTO_INCREMENT = 1")
+
+        from app.models.category_model import CategoryModel
+        from app.models.user_model import UserModel
+        CategoryModel().create_categories(self.category_names)
+        user_model = UserModel()
+        for username in self.usernames:
+            user_model.create_user(username, BENCH_PASSWORD, "cajero")
+        self.user_id = user_model.get_user_by_username(self.usernames[0])['id']
+
+        from app.controllers.product_controller import ProductController
+        from app.controllers.category_controller import CategoryController
+        from app.controllers.user_controller import UserController
+        from app.controllers.sale_controller import SaleController
+        self.product_controller = ProductController()
+        self.category_controller = CategoryController()
+        self.user_controller = UserController()
+        self.sale_controller = SaleController()
+        self.product_model = self.product_controller.product_model
+        self.category_model = self.category_controller.category_model
+        self.category_model.refresh_categories()
+        self.category_ids = [cat['id'] for cat in self.category_model.get_all_categories()]
+
+    def grow_catalog(self, target):
+        """Agrega productos hasta llegar a `target` (los tamaños se miden de menor a mayor)."""
+        words = ("arroz", "azúcar", "aceite", "leche", "pan", "café", "galletas", "fideos", "atún",
+                 "jabón", "detergente", "gaseosa", "agua", "yogur", "queso", "harina", "avena", "sal")
+        start = time.perf_counter()
+        while self.product_count < target:
+            chunk = []
+            for i in range(self.product_count, min(target, self.product_count + SEED_CHUNK)):
+                name = f"{self.random.choice(words)} {self.random.choice(words)} marca {i % 997}"
+                stock_min = self.random.randint(1, 20)
+                # Uno de cada 50 productos queda bajo su mínimo, para el reporte de stock bajo
+                stock = stock_min - 1 if i % 50 == 0 else 1_000_000
+                chunk.append((f"B{i:012d}", name, "Producto de prueba", self.random.choice(self.category_ids),
+                              round(self.random.uniform(0.5, 200), 2), 0.5, stock, stock_min, "Unidad"))
+            with self.db.transaction():
+                self.product_model.create_products_bulk(chunk)
+            self.product_count += len(chunk)
+        self.db.execute_query("ANALYZE TABLE Productos")
+        print(f"Catálogo con {self.product_count} productos ({time.perf_counter() - start:.1f} s de carga).")
+
+    def random_barcode(self):
+        return f"B{self.random.randrange(self.product_count):012d}"
+
+    def run_size(self, size):
+        fast = self.args.iterations
+        slow = max(3, fast // 20)
+        results = {}
+        def bench(name, func, iterations=fast, setup=None):
+            results[name] = measure(func, iterations, setup)
+            row = results[name]
+            print(f"  {name:<45} p50 {row['p50_ms']:9.3f} ms   p95 {row['p95_ms']:9.3f} ms")
+
+        pm, pc, cc, uc, sc = self.product_model, self.product_controller, self.category_controller, self.user_controller, self.sale_controller
+        print(f"Tamaño {size}:")
+
+        # Búsqueda por código de barras: sin caché (consulta a la BD) y con caché caliente
+        barcode = self.random_barcode()
+        bench("ProductModel.get_product_by_barcode (BD)", lambda: pm.get_product_by_barcode(self.random_barcode()),
+              setup=pm.barcode_cache.clear)
+        pm.get_product_by_barcode(barcode)
+        bench("ProductModel.get_product_by_barcode (caché)", lambda: pm.get_product_by_barcode(barcode))
+        bench("ProductModel.get_product_by_id", lambda: pm.get_product_by_id(self.random.randint(1, self.product_count)))
+
+        # Listados
+        bench("ProductController.get_products_for_display", pc.get_products_for_display, iterations=slow)
+        bench("ProductController.get_products_page_for_display", lambda: pc.get_products_page_for_display(None, 200))
+        bench("ProductModel.get_products_page (por nombre)", lambda: pm.get_products_page(None, 200, order_by="nombre"))
+        bench("ProductModel.search_products", lambda: pm.search_products("leche mar", 50))
+        bench("ProductModel.get_low_stock_products", lambda: pm.get_low_stock_products(100))
+
+        # Autocompletado en memoria
+        bench("ProductModel.build_product_index", pm.build_product_index, iterations=slow)
+        bench("ProductModel.lookup_products", lambda: pm.lookup_products("gal avena", 10))
+
+        # Escrituras
+        def add_product():
+            self._new_barcode += 1
+            pc.add_product(f"N{size}-{self._new_barcode:09d}", "producto nuevo", "", self.category_names[0],
+                           10.0, 5.0, 100, 5, "Unidad")
+        bench("ProductController.add_product", add_product, iterations=slow * 5)
+        product = pm.get_product_by_barcode(barcode)
+        bench("ProductController.update_product_details", lambda: pc.update_product_details(
+            product['id'], barcode, product['nombre_producto'], "editado", product['nombre_categoria'],
+            float(product['precio_venta']), float(product['costo_unitario']), product['stock_actual'],
+            product['stock_minimo'], product['unidad_medida'], True), iterations=slow * 5)
+
+        # Categorías
+        bench("CategoryModel.get_category_by_name", lambda: self.category_model.get_category_by_name(self.random.choice(self.category_names)))
+        bench("CategoryModel.get_categories_by_names", lambda: self.category_model.get_categories_by_names(self.category_names[:20]))
+        bench("CategoryController.get_all_categories", cc.get_all_categories)
+
+        # Usuarios (el login está dominado por bcrypt, a propósito)
+        bench("UserController.authenticate_user", lambda: uc.authenticate_user(self.usernames[1], BENCH_PASSWORD), iterations=slow)
+        bench("UserController.get_all_users_for_display", uc.get_all_users_for_display)
+
+        # Venta completa de 3 líneas y lectura del dashboard
+        def fill_cart():
+            sc.clear_cart()
+            for _ in range(3):
+                sc.add_to_cart(pm.get_product_by_barcode(self.random_barcode()))
+        bench("SaleController.checkout (3 líneas)", lambda: sc.checkout(self.user_id), iterations=slow * 5, setup=fill_cart)
+        bench("SaleController.get_dashboard_summary", sc.get_dashboard_summary)
+        return results
+
+    def run(self):
+        sizes = sorted(int(size) for size in self.args.sizes.split(","))
+        self.setup_database()
+        report = {
+            'meta': {
+                'fecha': datetime.now().isoformat(timespec="seconds"),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'motor': DB_BACKEND,
+                'base_de_datos': self.args.database,
+                'iteraciones': self.args.iterations,
+                'semilla': self.args.seed,
+            },
+            'results': {},
+        }
+        for size in sizes:
+            self.grow_catalog(size)
+            report['results'][str(size)] = self.run_size(size)
+        return report
+
+def compare(current, baseline, threshold):
+    """Imprime la comparación de medianas y retorna la lista de regresiones."""
+    regressions = []
+    print(f"\nComparación contra {baseline['meta'].get('fecha', '?')} (umbral {threshold:.0%}):")
+    for size, benches in current['results'].items():
+        old_benches = baseline['results'].get(size, {})
+        for name, row in benches.items():
+            old = old_benches.get(name)
+            if not old:
+                continue
+            ratio = row['p50_ms'] / old['p50_ms'] if old['p50_ms'] else 1.0
+            # Diferencias de menos de 0.05 ms son ruido de medición
+            regressed = ratio > 1 + threshold and row['p50_ms'] - old['p50_ms'] > 0.05
+            mark = "REGRESIÓN" if regressed else ""
+            print(f"  [{size}] {name:<45} {old['p50_ms']:9.3f} -> {row['p50_ms']:9.3f} ms ({ratio - 1:+.0%}) {mark}")
+            if regressed:
+                regressions.append((size, name, old['p50_ms'], row['p50_ms']))
+    return regressions
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.database == "pos_minimarket_db":
+        sys.exit("Los benchmarks vacían la base de datos: use una base de datos de pruebas.")
+    DB_CONFIG['database'] = args.database
+    SQLITE_CONFIG['path'] = f"{args.database}.db"
+
+    report = BenchmarkSuite(args).run()
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} operaciones empeoraron más de {args.threshold:.0%}.")
+            return 1
+        print("\nSin regresiones.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,50 @@
 # config/db_config.py
 
+# Motor de base de datos: 'mysql' (servidor MySQL/MariaDB compartido por varias cajas)
+# o 'sqlite' (archivo local, para tiendas de una sola caja sin servidor)
+DB_BACKEND = 'mysql'
+
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'root',
     'password': '123456', # ¡Cámbiala!
     'database': 'pos_minimarket_db',    # La crearemos en el siguiente paso
     'port': 3306 # Puerto por defecto de MySQL/MariaDB
-}
\ No newline at end of file
+}
+
+# Base de datos embebida (solo con DB_BACKEND = 'sqlite')
+SQLITE_CONFIG = {
+    'path': 'data/pos_minimarket.db', # Archivo de la base de datos (se crea si no existe)
+    'busy_timeout_ms': 5000,          # Espera máxima por el bloqueo de escritura antes de fallar
+    'synchronous': 'NORMAL',          # En modo WAL, NORMAL no arriesga la integridad del archivo
+    'cache_size_kb': 65536,           # Caché de páginas por conexión
+    'mmap_size': 268435456            # Bytes del archivo leídos por mapeo de memoria (0 = desactivado)
+}
+
+# Pool de conexiones compartido por modelos, vistas y tareas en segundo plano
+POOL_CONFIG = {
+    'pool_size': 5,      # Número máximo de conexiones abiertas a la vez
+    'pool_timeout': 10,  # Segundos que se espera por una conexión libre antes de fallar
+    'keepalive_interval': 60 # Segundos de inactividad tras los que se hace ping a una conexión libre (0 = nunca)
+}
+
+# Cachés en memoria de la terminal
+CACHE_CONFIG = {
+    'barcode_cache_size': 20000,     # Productos máximos en la caché de códigos de barras
+    'refresh_interval_ms': 15000,    # Cada cuánto se consultan cambios hechos por otras terminales
+    'frame_cache_size': 4            # Pantallas que se mantienen construidas (ocultas) para volver a ellas al instante
+}
+
+# Métricas de consultas y log de consultas lentas
+QUERY_LOG_CONFIG = {
+    'slow_query_ms': 200,                     # Umbral para registrar una consulta como lenta (0 = no registrar)
+    'log_file': 'logs/consultas_lentas.log',  # Archivo rotativo del log de consultas lentas
+    'max_bytes': 1_000_000,                   # Tamaño máximo de cada archivo antes de rotar
+    'backup_count': 5                         # Archivos antiguos que se conservan
+}
+
+# Diario local de escrituras (ventas, ajustes de stock) hechas sin conexión con el servidor
+JOURNAL_CONFIG = {
+    'path': 'data/diario_sin_conexion.jsonl', # Archivo del diario (solo se agrega al final)
+    'replay_batch_size': 500                  # Operaciones aplicadas por transacción al reconectar
+}
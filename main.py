@@ -1,28 +1,29 @@
 # main.py
 
+import time
+_start = time.perf_counter() # Para medir cuánto tarda en aparecer la ventana de inicio de sesión
+
 import customtkinter as ctk
 from app.views.main_app_view import MainAppView
-from app.database.db_connection import get_db_connection
+from app.database.db_connection import get_db_connection # No carga el conector del motor hasta conectar
 
 if __name__ == "__main__":
     ctk.set_appearance_mode("System")
     ctk.set_default_color_theme("blue")
 
     # === MEJORA: Gestionar el ciclo de vida de la conexión explícitamente ===
-    db = None
+    app = None
     try:
-        # 1. Conectar a la base de datos al iniciar la app
-        db = get_db_connection()
-        db.connect()
-
-        # 2. Iniciar la aplicación
-        app = MainAppView() 
+        # 1. Iniciar la aplicación: la ventana crea la conexión a la base de datos y
+        #    verifica el esquema en segundo plano, sin demorar el inicio de sesión
+        app = MainAppView()
+        app.after_idle(lambda: print(f"Inicio de sesión en pantalla en {(time.perf_counter() - _start) * 1000:.0f} ms."))
         app.mainloop()
 
     except Exception as e:
         print(f"Ha ocurrido un error en la aplicación: {e}")
     finally:
-        # 3. Desconectar de la base de datos al cerrar la app
-        if db:
-            db.disconnect()
-            print("Aplicación cerrada. Conexión a la base de datos finalizada.")
\ No newline at end of file
+        # 2. Desconectar de la base de datos al cerrar la app
+        if app is not None:
+            get_db_connection().disconnect()
+            print("Aplicación cerrada. Conexión a la base de datos finalizada.")